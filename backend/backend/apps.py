@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+from django.conf import settings
+
+
+class BackendConfig(AppConfig):
+    name = 'backend'
+
+    def ready(self):
+        if settings.SERIALIZER_TIMING:
+            from .instrumentation import instrument_serializers
+            instrument_serializers()
@@ -0,0 +1,74 @@
+import asyncio
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from rest_framework.views import APIView
+from .instrumentation import current_request_metrics
+
+
+# Bounds the connections `gather` opens per process, whatever the loop's default executor allows
+query_executor = ThreadPoolExecutor(max_workers=settings.ASYNC_QUERY_THREADS, thread_name_prefix='gather')
+
+
+def run_query(query):
+    """
+    Run `query` on the database connection of the current worker thread and hand that
+    connection back the way a request would, so CONN_MAX_AGE applies to it too.
+    """
+    metrics = current_request_metrics()
+    try:
+        if metrics is None:
+            return query()
+        with connection.execute_wrapper(metrics):
+            return query()
+    finally:
+        close_old_connections()
+
+
+class AsyncAPIView(APIView):
+    """
+    An APIView whose handlers are coroutines, served natively under ASGI.
+    Authentication, permissions and throttling stay synchronous and run in the
+    request's database thread; `gather` runs independent ORM queries concurrently.
+    """
+    parallel_queries = True
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        # Other connections cannot see what an open transaction of this one wrote (tests, ATOMIC_REQUESTS)
+        self.parallel_queries = self.parallel_queries and not transaction.get_connection().in_atomic_block
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+            response = handler(request, *args, **kwargs)
+            # OPTIONS and the not-allowed handler are inherited synchronous methods
+            if inspect.isawaitable(response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def gather(self, *queries):
+        """
+        Evaluate the callables in `queries` concurrently, each on its own worker thread and connection.
+        Django's async ORM methods all share one thread per request, which would run them one by one.
+        """
+        if not self.parallel_queries:
+            return [await sync_to_async(query)() for query in queries]
+        run = sync_to_async(run_query, thread_sensitive=False, executor=query_executor)
+        return await asyncio.gather(*(run(query) for query in queries))
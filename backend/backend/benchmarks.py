@@ -0,0 +1,295 @@
+"""
+Microbenchmarks of the hot Python paths: serializers, permission checks, the itinerary summary,
+and the JSON and MessagePack renderers and parsers on serialized trips and expenses.
+Run them with `python manage.py run_microbenchmarks`, which builds the fixture in an in-memory SQLite database.
+"""
+import gc
+import io
+import json
+import statistics
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from io import StringIO
+from types import SimpleNamespace
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, force_authenticate
+from checklist.models import ChecklistItem, get_checklist_category
+from checklist.permissions import IsChecklistItemAccessible
+from expenses.models import Expense, ExpenseCategory, ExpenseSplit
+from expenses.permissions import IsExpenseAccessible
+from expenses.serializers import ExpenseSerializer
+from expenses.views import ExpenseViewSet
+from itineraries.models import ItineraryItem
+from itineraries.permissions import IsItineraryItemAccessible
+from packing.permissions import IsPackingItemAccessible
+from trips.models import MemberRole, MemberStatus, Trip, TripMember
+from trips.permissions import IsTripAccessible, IsMemberAccessible
+from trips.serializers import TripMemberSerializer, TripSerializer
+from trips.views import TripItinerarySummaryView, TripMemberViewSet, TripViewSet
+from users.models import User
+from .parsers import MessagePackParser, ORJSONParser
+from .permissions import IsStatisticAccessible
+from .renderers import MessagePackRenderer, ORJSONRenderer
+
+LONG_TRIP_DAYS = 365
+LONG_TRIP_MEMBERS = 30
+LONG_TRIP_EXPENSES = 200
+
+
+def build_fixture():
+    """
+    1,000 small trips from `seed_benchmark_data`, plus one private year-long trip
+    with many members, expenses split between all of them, stops and tasks.
+    """
+    call_command(
+        'seed_benchmark_data', users=200, trips=1000, members=4, itinerary_items=3, expenses=2,
+        packing_items=0, checklist_items=0, prefix='microbench', stdout=StringIO(),
+    )
+    users = list(User.objects.filter(email__startswith='microbench-').order_by('email')[:LONG_TRIP_MEMBERS])
+    start_date = date(2030, 1, 1)
+    end_date = start_date + timedelta(days=LONG_TRIP_DAYS - 1)
+    trip = Trip.objects.create(
+        owner=users[0], title="Year around the archipelago", destination="Indonesia",
+        start_date=start_date, end_date=end_date, duration=LONG_TRIP_DAYS, member_spots=LONG_TRIP_MEMBERS,
+    )
+    members = TripMember.objects.bulk_create(
+        TripMember(
+            trip=trip, user=user, status=MemberStatus.ACCEPTED,
+            role=MemberRole.ORGANIZER if index == 0 else MemberRole.MEMBER,
+        )
+        for index, user in enumerate(users)
+    )
+    category = ExpenseCategory.objects.first()
+    expenses = Expense.objects.bulk_create(
+        Expense(trip=trip, title=f"Expense {index}", amount=Decimal(LONG_TRIP_MEMBERS * 10), paid_by=members[index % len(members)], category=category)
+        for index in range(LONG_TRIP_EXPENSES)
+    )
+    ExpenseSplit.objects.bulk_create(
+        ExpenseSplit(expense=expense, member=member, amount=Decimal(10), paid=member == expense.paid_by)
+        for expense in expenses for member in members
+    )
+    stops = []
+    for index in range(LONG_TRIP_DAYS * 2):
+        visit_time = timezone.make_aware(datetime.combine(start_date + timedelta(days=index // 2), datetime.min.time()) + timedelta(hours=9 + 4 * (index % 2)))
+        stop = ItineraryItem(trip=trip, name=f"Stop {index}", address=f"Address {index}", estimated_time="2 hours", visit_time=visit_time)
+        stop.update_duration()
+        stops.append(stop)
+    ItineraryItem.objects.bulk_create(stops)
+    ChecklistItem.objects.bulk_create(
+        ChecklistItem(
+            trip=trip, title=f"Task {index}", due_date=start_date + timedelta(days=index % LONG_TRIP_DAYS),
+            category=get_checklist_category(start_date + timedelta(days=index % LONG_TRIP_DAYS), start_date, end_date),
+            is_completed=index % 3 == 0, position=(index + 1) * 1024,
+        )
+        for index in range(LONG_TRIP_DAYS)
+    )
+    return SimpleNamespace(trip=trip, organizer=users[0], member=users[1], member_row=members[2])
+
+
+def api_request(user, path='/', method='get'):
+    factory_request = getattr(APIRequestFactory(), method)(path)
+    force_authenticate(factory_request, user=user)
+    request = Request(factory_request)
+    request.user = user
+    return request
+
+
+def make_view(view_class, request, action, **kwargs):
+    view = view_class()
+    view.action, view.request, view.kwargs, view.format_kwarg = action, request, kwargs, None
+    return view
+
+
+def serializer_benchmark(fixture, count):
+    request = api_request(fixture.organizer)
+    queryset = make_view(TripViewSet, request, 'retrieve').get_queryset().order_by('id')
+
+    def run():
+        return TripSerializer(queryset[:count], many=True, context={'request': request}).data
+    return run
+
+
+def expense_benchmark(fixture):
+    request = api_request(fixture.organizer)
+    view = make_view(ExpenseViewSet, request, 'list', trip_id=fixture.trip.id)
+
+    def run():
+        return ExpenseSerializer(view.get_queryset(), many=True, context=view.get_serializer_context()).data
+    return run
+
+
+def member_benchmark(fixture):
+    request = api_request(fixture.organizer)
+    view = make_view(TripMemberViewSet, request, 'list', trip_id=fixture.trip.id)
+
+    def run():
+        return TripMemberSerializer(view.get_queryset(), many=True, context=view.get_serializer_context()).data
+    return run
+
+
+def permission_benchmark(fixture, permission_class, action):
+    """A regular member of the private long trip asking for `action`"""
+    request = api_request(fixture.member)
+    view = SimpleNamespace(action=action, kwargs={'trip_id': fixture.trip.id})
+    permission = permission_class()
+
+    def run():
+        return permission.has_permission(request, view)
+    return run
+
+
+def object_permission_benchmark(fixture, permission_class, get_object):
+    request = api_request(fixture.member)
+    view = SimpleNamespace(action='retrieve', kwargs={'trip_id': fixture.trip.id})
+    permission = permission_class()
+    obj = get_object(fixture)
+
+    def run():
+        return permission.has_object_permission(request, view, obj)
+    return run
+
+
+def summary_benchmark(fixture):
+    # Throttling would reject the repeated calls; it is not what is being measured
+    view = TripItinerarySummaryView.as_view(throttle_classes=[])
+    path = f'/api/trips/{fixture.trip.id}/itineraries/summary/'
+
+    def run():
+        request = APIRequestFactory().get(path)
+        force_authenticate(request, user=fixture.member)
+        return view(request, trip_id=fixture.trip.id).data
+    return run
+
+
+PAYLOADS = {
+    'TripSerializer x1000': lambda fixture: serializer_benchmark(fixture, 1000)(),
+    f'ExpenseSerializer x{LONG_TRIP_EXPENSES}': lambda fixture: expense_benchmark(fixture)(),
+}
+RENDERERS = [JSONRenderer, ORJSONRenderer, MessagePackRenderer]
+# Each parser reads what its renderer wrote
+PARSERS = [(JSONParser, JSONRenderer), (ORJSONParser, ORJSONRenderer), (MessagePackParser, MessagePackRenderer)]
+
+
+def payload(fixture, name):
+    """Serialized data of `PAYLOADS[name]`, built once per fixture and shared by the renderer and parser benchmarks"""
+    payloads = vars(fixture).setdefault('payloads', {})
+    if name not in payloads:
+        payloads[name] = PAYLOADS[name](fixture)
+    return payloads[name]
+
+
+def render_benchmark(fixture, payload_name, renderer_class):
+    data = payload(fixture, payload_name)
+    renderer = renderer_class()
+
+    def run():
+        return renderer.render(data, renderer.media_type, {})
+    return run
+
+
+def parse_benchmark(fixture, payload_name, parser_class, renderer_class):
+    content = renderer_class().render(payload(fixture, payload_name), renderer_class.media_type, {})
+    parser = parser_class()
+
+    def run():
+        return parser.parse(io.BytesIO(content), parser.media_type, {})
+    return run
+
+
+BENCHMARKS = {
+    'TripSerializer x100': lambda fixture: serializer_benchmark(fixture, 100),
+    'TripSerializer x1000': lambda fixture: serializer_benchmark(fixture, 1000),
+    f'ExpenseSerializer x{LONG_TRIP_EXPENSES} (x{LONG_TRIP_MEMBERS} splits)': expense_benchmark,
+    f'TripMemberSerializer x{LONG_TRIP_MEMBERS}': member_benchmark,
+    'IsExpenseAccessible.has_permission list': lambda fixture: permission_benchmark(fixture, IsExpenseAccessible, 'list'),
+    'IsExpenseAccessible.has_permission create': lambda fixture: permission_benchmark(fixture, IsExpenseAccessible, 'create'),
+    'IsItineraryItemAccessible.has_permission list': lambda fixture: permission_benchmark(fixture, IsItineraryItemAccessible, 'list'),
+    'IsPackingItemAccessible.has_permission list': lambda fixture: permission_benchmark(fixture, IsPackingItemAccessible, 'list'),
+    'IsChecklistItemAccessible.has_permission list': lambda fixture: permission_benchmark(fixture, IsChecklistItemAccessible, 'list'),
+    'IsStatisticAccessible.has_permission': lambda fixture: permission_benchmark(fixture, IsStatisticAccessible, 'retrieve'),
+    'IsTripAccessible.has_object_permission': lambda fixture: object_permission_benchmark(fixture, IsTripAccessible, lambda f: f.trip),
+    'IsMemberAccessible.has_object_permission': lambda fixture: object_permission_benchmark(fixture, IsMemberAccessible, lambda f: f.member_row),
+    f'TripItinerarySummaryView ({LONG_TRIP_DAYS} days)': summary_benchmark,
+}
+for payload_name in PAYLOADS:
+    for renderer_class in RENDERERS:
+        BENCHMARKS[f'{renderer_class.__name__}.render {payload_name}'] = (
+            lambda fixture, name=payload_name, cls=renderer_class: render_benchmark(fixture, name, cls)
+        )
+    for parser_class, renderer_class in PARSERS:
+        BENCHMARKS[f'{parser_class.__name__}.parse {payload_name}'] = (
+            lambda fixture, name=payload_name, cls=parser_class, renderer=renderer_class: parse_benchmark(fixture, name, cls, renderer)
+        )
+
+
+def measure(run, min_time=1.0, min_rounds=5):
+    """
+    Time `run` for at least `min_time` seconds and `min_rounds` calls after one warm-up call; ops/sec is derived from the median call.
+    Peak traced memory and queries are taken from one extra call, outside the timed loop.
+    """
+    run()
+    gc.collect()
+    timings = []
+    while sum(timings) < min_time or len(timings) < min_rounds:
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+    # The median round is steadier than the mean on a busy machine
+    median = statistics.median(timings)
+
+    with CaptureQueriesContext(connection) as queries:
+        tracemalloc.start()
+        try:
+            run()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return {
+        'ops_per_sec': round(1 / median, 2),
+        'median_ms': round(median * 1000, 3),
+        'peak_kib': round(peak / 1024, 1),
+        'queries': len(queries),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """
+    Pair every result with its baseline entry.
+    A benchmark regresses when it runs more queries, or loses more than `tolerance` (a fraction)
+    of its ops/sec, or grows its peak memory by more than `tolerance`.
+    """
+    rows = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        row = {'name': name, **result, 'baseline': previous, 'regressions': []}
+        if previous:
+            if result['queries'] > previous['queries']:
+                row['regressions'].append(f"queries {previous['queries']} -> {result['queries']}")
+            if result['ops_per_sec'] < previous['ops_per_sec'] * (1 - tolerance):
+                row['regressions'].append(f"ops/sec {previous['ops_per_sec']} -> {result['ops_per_sec']}")
+            if result['peak_kib'] > previous['peak_kib'] * (1 + tolerance):
+                row['regressions'].append(f"peak KiB {previous['peak_kib']} -> {result['peak_kib']}")
+        rows.append(row)
+    return rows
+
+
+def load_baseline(path):
+    try:
+        with open(path) as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+
+
+def save_baseline(path, results):
+    with open(path, 'w') as file:
+        json.dump(results, file, indent=2, sort_keys=True)
+        file.write('\n')
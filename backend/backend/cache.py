@@ -0,0 +1,90 @@
+import threading
+from collections import defaultdict
+from django.core.cache.backends.db import DatabaseCache as BaseDatabaseCache
+from django.core.cache.backends.filebased import FileBasedCache as BaseFileBasedCache
+from django.core.cache.backends.locmem import LocMemCache as BaseLocMemCache
+from django.core.cache.backends.redis import RedisCache as BaseRedisCache
+from .instrumentation import current_request_metrics
+from .metrics import observe_cache
+
+_MISSING = object()
+_stats = defaultdict(lambda: {'hits': 0, 'misses': 0})
+_stats_lock = threading.Lock()
+_local = threading.local()
+
+
+def _record(label, hits, misses):
+    with _stats_lock:
+        _stats[label]['hits'] += hits
+        _stats[label]['misses'] += misses
+    observe_cache(label, hits, misses)
+    metrics = current_request_metrics()
+    if metrics is not None:
+        metrics.cache_hits += hits
+        metrics.cache_misses += misses
+
+
+def cache_stats():
+    """Hit and miss counts of this process, keyed by cache key prefix"""
+    with _stats_lock:
+        return {
+            label: {**counts, 'hit_ratio': counts['hits'] / max(counts['hits'] + counts['misses'], 1)}
+            for label, counts in _stats.items()
+        }
+
+
+def reset_cache_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+class CacheStatsMixin:
+    """
+    Counts hits and misses of `get` and `get_many` under the cache's key prefix.
+    Only the outermost call is counted, since some backends implement one through the other.
+    """
+
+    def _counting(self):
+        depth = getattr(_local, 'depth', 0)
+        _local.depth = depth + 1
+        return depth == 0
+
+    def _done(self):
+        _local.depth -= 1
+
+    def get(self, key, default=None, version=None):
+        outermost = self._counting()
+        try:
+            value = super().get(key, _MISSING, version)
+        finally:
+            self._done()
+        if outermost:
+            _record(self.key_prefix, int(value is not _MISSING), int(value is _MISSING))
+        return default if value is _MISSING else value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        outermost = self._counting()
+        try:
+            values = super().get_many(keys, version)
+        finally:
+            self._done()
+        if outermost:
+            _record(self.key_prefix, len(values), len(keys) - len(values))
+        return values
+
+
+class RedisCache(CacheStatsMixin, BaseRedisCache):
+    pass
+
+
+class FileBasedCache(CacheStatsMixin, BaseFileBasedCache):
+    pass
+
+
+class DatabaseCache(CacheStatsMixin, BaseDatabaseCache):
+    pass
+
+
+class LocMemCache(CacheStatsMixin, BaseLocMemCache):
+    pass
@@ -0,0 +1,71 @@
+import time
+from contextvars import ContextVar
+from rest_framework.serializers import BaseSerializer
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    """Counters collected while one request is handled"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.view_name = None
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.serializer_depth = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    @property
+    def duration(self):
+        return time.perf_counter() - self.started
+
+    def __call__(self, execute, sql, params, many, context):
+        """`connection.execute_wrapper` hook that times every query"""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_queries += 1
+            self.db_time += time.perf_counter() - started
+
+
+def current_request_metrics():
+    return _current.get()
+
+
+def start_request_metrics():
+    metrics = RequestMetrics()
+    return metrics, _current.set(metrics)
+
+
+def stop_request_metrics(token):
+    _current.reset(token)
+
+
+_original_serializer_data = BaseSerializer.data
+
+
+def _timed_serializer_data(self):
+    metrics = _current.get()
+    if metrics is None:
+        return _original_serializer_data.fget(self)
+    metrics.serializer_depth += 1
+    started = time.perf_counter()
+    try:
+        return _original_serializer_data.fget(self)
+    finally:
+        metrics.serializer_depth -= 1
+        if metrics.serializer_depth == 0:
+            metrics.serializer_time += time.perf_counter() - started
+
+
+def instrument_serializers():
+    """
+    Time `serializer.data` of every DRF serializer; nested serializers count towards their parent.
+    Installed once from `BackendConfig.ready`; calling it again is a no-op.
+    """
+    if BaseSerializer.data.fget is not _timed_serializer_data:
+        BaseSerializer.data = property(_timed_serializer_data)
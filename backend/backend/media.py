@@ -0,0 +1,15 @@
+from django.views.static import serve
+
+# Uploaded files never change under the same name: storages pick a fresh name for every upload
+# and avatar variants embed a digest of their original.
+MEDIA_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+def serve_media(request, path, document_root=None):
+    """
+    Serve an uploaded file with long-lived cache headers. Only mounted with DEBUG; in production
+    whatever serves MEDIA_ROOT has to send MEDIA_CACHE_CONTROL itself.
+    """
+    response = serve(request, path, document_root=document_root)
+    response['Cache-Control'] = MEDIA_CACHE_CONTROL
+    return response
@@ -0,0 +1,94 @@
+import hmac
+import os
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden, HttpResponseNotFound
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.multiprocess import MultiProcessCollector
+
+# With PROMETHEUS_MULTIPROC_DIR set, every worker writes its samples to files in that directory
+# and a scrape sums them, so any gunicorn worker can answer /metrics for all of them.
+
+REQUEST_LATENCY = Histogram(
+    'jelajah_http_request_duration_seconds',
+    'Request wall time by resolved view, method and status',
+    ['view', 'method', 'status'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+REQUEST_DB_QUERIES = Histogram(
+    'jelajah_http_request_db_queries',
+    'Database queries issued per request',
+    ['view'],
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200),
+)
+CACHE_REQUESTS = Counter(
+    'jelajah_cache_requests_total',
+    'Cache lookups by cache key prefix and result',
+    ['cache', 'result'],
+)
+THROTTLE_REJECTIONS = Counter(
+    'jelajah_throttle_rejections_total',
+    'Requests rejected by a rate throttle',
+    ['scope'],
+)
+
+
+def observe_request(metrics, method, status):
+    view = metrics.view_name or 'unresolved'
+    REQUEST_LATENCY.labels(view, method, str(status)).observe(metrics.duration)
+    REQUEST_DB_QUERIES.labels(view).observe(metrics.db_queries)
+
+
+def observe_cache(cache, hits, misses):
+    if hits:
+        CACHE_REQUESTS.labels(cache, 'hit').inc(hits)
+    if misses:
+        CACHE_REQUESTS.labels(cache, 'miss').inc(misses)
+
+
+class OutboxCollector:
+    """Reads queue depths from the database at scrape time"""
+
+    def collect(self):
+        from notifications.models import EmailOutbox, NotificationEvent, OutboxStatus
+        outbox = GaugeMetricFamily('jelajah_email_outbox_depth', 'Outbox emails by delivery status', labels=['status'])
+        for status in (OutboxStatus.PENDING, OutboxStatus.SENDING, OutboxStatus.FAILED):
+            outbox.add_metric([status.value], EmailOutbox.objects.filter(status=status).count())
+        yield outbox
+        yield GaugeMetricFamily(
+            'jelajah_notification_events_pending',
+            'Notifications waiting for the next digest',
+            value=NotificationEvent.objects.filter(digested_at__isnull=True).count(),
+        )
+
+
+def metrics_registry():
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        MultiProcessCollector(registry)
+    else:
+        registry = CollectorRegistry()
+        registry.register(_DefaultCollectors())
+    registry.register(OutboxCollector())
+    return registry
+
+
+class _DefaultCollectors:
+    """Samples of the in-process default registry, for single process servers"""
+
+    def collect(self):
+        return REGISTRY.collect()
+
+
+def metrics_view(request):
+    """
+    Prometheus text exposition, protected by `METRICS_TOKEN`.
+    Without a token it is only served with DEBUG; production answers 404 until one is set.
+    """
+    token = settings.METRICS_TOKEN
+    if not token:
+        if not settings.DEBUG:
+            return HttpResponseNotFound()
+    elif not hmac.compare_digest(request.headers.get('Authorization', '').encode(), f'Bearer {token}'.encode()):
+        return HttpResponseForbidden()
+    return HttpResponse(generate_latest(metrics_registry()), content_type=CONTENT_TYPE_LATEST)
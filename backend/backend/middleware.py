@@ -0,0 +1,125 @@
+import json
+import logging
+from contextlib import ExitStack
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from whitenoise.middleware import WhiteNoiseMiddleware
+from .metrics import observe_request
+from .instrumentation import current_request_metrics, start_request_metrics, stop_request_metrics
+
+logger = logging.getLogger('backend.requests')
+
+
+def resolve_view_name(view_func, method):
+    """`TripViewSet.list` for viewset actions, `TripStatisticsView.get` for other class based views"""
+    cls = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None)
+    if cls is None:
+        return getattr(view_func, '__qualname__', repr(view_func))
+    actions = getattr(view_func, 'actions', None) or {}
+    return f"{cls.__name__}.{actions.get(method.lower(), method.lower())}"
+
+
+def track_queries(metrics):
+    """Time the queries on this thread's connections until the returned stack is closed"""
+    stack = ExitStack()
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(metrics))
+    return stack
+
+
+class RequestMetricsMiddleware:
+    """
+    Measures wall time, database queries, serializer time and cache hits of each request.
+    The numbers are logged as one JSON line on the `backend.requests` logger and added to the
+    Prometheus metrics. They are also returned in a `Server-Timing` header, outside DEBUG only
+    to authenticated users.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics, token = start_request_metrics()
+        try:
+            with track_queries(metrics):
+                response = self.get_response(request)
+        finally:
+            stop_request_metrics(token)
+        return self.finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics, token = start_request_metrics()
+        try:
+            # Connections belong to threads, so wrap the ones of the thread that runs this request's sync code
+            queries = await sync_to_async(track_queries)(metrics)
+            try:
+                response = await self.get_response(request)
+            finally:
+                await sync_to_async(queries.close)()
+        finally:
+            stop_request_metrics(token)
+        # Reading `request.user` may load the session's user from the database
+        return await sync_to_async(self.finish)(request, response, metrics)
+
+    def finish(self, request, response, metrics):
+        duration = metrics.duration
+        observe_request(metrics, request.method, response.status_code)
+        # DRF hands the user it authenticated back to the Django request
+        user = getattr(request, 'user', None)
+        if settings.DEBUG or (user is not None and user.is_authenticated):
+            response['Server-Timing'] = ', '.join([
+                f'app;dur={duration * 1000:.1f}',
+                f'db;dur={metrics.db_time * 1000:.1f};desc="{metrics.db_queries} queries"',
+                f'serializer;dur={metrics.serializer_time * 1000:.1f}',
+                f'cache;desc="{metrics.cache_hits} hits, {metrics.cache_misses} misses"',
+            ])
+        logger.info(json.dumps({
+            'view': metrics.view_name,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'duration_ms': round(duration * 1000, 1),
+            'db_queries': metrics.db_queries,
+            'db_ms': round(metrics.db_time * 1000, 1),
+            'serializer_ms': round(metrics.serializer_time * 1000, 1),
+            'cache_hits': metrics.cache_hits,
+            'cache_misses': metrics.cache_misses,
+        }))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = current_request_metrics()
+        if metrics is not None:
+            metrics.view_name = resolve_view_name(view_func, request.method)
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """WhiteNoise that passes other requests on without adapting an async handler chain to sync"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
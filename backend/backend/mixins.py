@@ -0,0 +1,209 @@
+import uuid
+from django.db import transaction
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+from trips.revisions import bump_trip_revision, trip_revision_etag
+
+
+class NotModified(Exception):
+    def __init__(self, response):
+        self.response = response
+
+
+class TripRevisionMixin:
+    """
+    Conditional GET for trip-scoped views, keyed on the trip's revision (see `trips.revisions`).
+    A matching If-None-Match is answered with 304 right after the permission checks, before the handler runs.
+    Successful writes through the view bump the revision.
+    """
+    revision_trip_kwarg = 'trip_id'
+    revision_etag = None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        trip_id = self.kwargs.get(self.revision_trip_kwarg)
+        if trip_id and request.method in ('GET', 'HEAD'):
+            self.revision_etag = trip_revision_etag(request, trip_id)
+            if self.revision_etag:
+                not_modified = get_conditional_response(request, etag=self.revision_etag)
+                if not_modified is not None:
+                    raise NotModified(not_modified)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if self.revision_etag and response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            response['ETag'] = self.revision_etag
+            response['Cache-Control'] = 'private, no-cache'
+        elif request.method not in SAFE_METHODS and status.is_success(response.status_code):
+            bump_trip_revision(self.kwargs.get(self.revision_trip_kwarg))
+        return response
+
+
+class BulkModelMixin:
+    """
+    Adds a list-level `bulk/` endpoint to trip-scoped item viewsets:
+    - POST a list of objects to create them with one bulk_create
+    - PATCH a list of objects (each with an `id`) to update them with one bulk_update
+    - DELETE a list of ids to remove them with one filtered delete
+    The whole batch is validated before anything is written and all writes share one transaction.
+    """
+    bulk_max_size = 500
+
+    @action(detail=False, methods=['post', 'patch', 'delete'], url_path='bulk')
+    def bulk(self, request, trip_id=None):
+        data = request.data
+        if not isinstance(data, list) or not data:
+            return Response({"detail": "Expected a non-empty list of items."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(data) > self.bulk_max_size:
+            return Response({"detail": f"A batch may contain at most {self.bulk_max_size} items."}, status=status.HTTP_400_BAD_REQUEST)
+
+        if request.method == 'POST':
+            return self.bulk_create_items(data)
+        if request.method == 'PATCH':
+            return self.bulk_update_items(data)
+        return self.bulk_destroy_items(data)
+
+    def get_bulk_queryset(self):
+        """Unfiltered items of the current trip; list filters and slices do not apply to batches."""
+        model = self.get_serializer_class().Meta.model
+        return model.objects.filter(trip_id=self.kwargs.get('trip_id'))
+
+    def get_bulk_ids(self):
+        """Valid item ids referenced by a PATCH or DELETE batch."""
+        if self.request.method == 'PATCH':
+            raw_ids = [item.get('id') for item in self.request.data if isinstance(item, dict)]
+        else:
+            raw_ids = self.request.data
+        ids = []
+        for raw_id in raw_ids:
+            try:
+                ids.append(uuid.UUID(str(raw_id)))
+            except ValueError:
+                continue
+        return ids
+
+    def is_bulk_assigned_to(self, member):
+        """Whether every item touched by the batch is (or will be) assigned to `member`."""
+        data = self.request.data
+        if not isinstance(data, list):
+            return False
+
+        if self.request.method in ['POST', 'PATCH']:
+            for item in data:
+                if not isinstance(item, dict):
+                    return False
+                if self.request.method == 'POST' or 'assigned_to_id' in item:
+                    if str(item.get('assigned_to_id')) != str(member.id):
+                        return False
+        if self.request.method == 'POST':
+            return True
+
+        return not self.get_bulk_queryset().filter(id__in=self.get_bulk_ids()).exclude(assigned_to=member).exists()
+
+    def build_bulk_instance(self, validated_data):
+        """Build an unsaved model instance for bulk_create from one item's validated data."""
+        model = self.get_serializer_class().Meta.model
+        return model(trip_id=self.kwargs.get('trip_id'), **validated_data)
+
+    def prepare_bulk_update(self, instance, update_fields):
+        """Refresh fields that save() would derive, since bulk_update bypasses it; add their names to update_fields"""
+        pass
+
+    def bulk_create_items(self, data):
+        serializer = self.get_serializer(data=data, many=True)
+        serializer.is_valid(raise_exception=True)
+
+        model = self.get_serializer_class().Meta.model
+        instances = [self.build_bulk_instance(item) for item in serializer.validated_data]
+        with transaction.atomic():
+            model.objects.bulk_create(instances)
+
+        results = self.get_serializer(instances, many=True).data
+        return Response(results, status=status.HTTP_201_CREATED)
+
+    def bulk_update_items(self, data):
+        ids = self.get_bulk_ids()
+        instances = {instance.id: instance for instance in self.get_bulk_queryset().filter(id__in=ids)}
+
+        # One context for the whole batch so serializers can share lookups such as the trip
+        context = self.get_serializer_context()
+        errors = []
+        updates = []
+        seen = set()
+        for item in data:
+            if not isinstance(item, dict):
+                errors.append({"non_field_errors": ["Expected an object."]})
+                continue
+            try:
+                item_id = uuid.UUID(str(item.get('id')))
+            except ValueError:
+                errors.append({"id": ["A valid item id is required."]})
+                continue
+            if item_id in seen:
+                errors.append({"id": ["Item is duplicated in this batch."]})
+                continue
+            seen.add(item_id)
+            instance = instances.get(item_id)
+            if instance is None:
+                errors.append({"id": ["Item not found."]})
+                continue
+
+            fields = {key: value for key, value in item.items() if key != 'id'}
+            serializer = self.get_serializer(instance, data=fields, partial=True, context=context)
+            if serializer.is_valid():
+                errors.append({})
+                updates.append((instance, serializer.validated_data))
+            else:
+                errors.append(serializer.errors)
+
+        if any(errors):
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        model = self.get_serializer_class().Meta.model
+        now = timezone.now()
+        update_fields = {'updated_at'}
+        for instance, validated_data in updates:
+            for attr, value in validated_data.items():
+                setattr(instance, attr, value)
+                update_fields.add(attr)
+            instance.updated_at = now
+            self.prepare_bulk_update(instance, update_fields)
+
+        updated = [instance for instance, _ in updates]
+        with transaction.atomic():
+            model.objects.bulk_update(updated, sorted(update_fields))
+
+        results = self.get_serializer(updated, many=True).data
+        return Response(results, status=status.HTTP_200_OK)
+
+    def bulk_destroy_items(self, data):
+        errors = []
+        ids = []
+        for raw_id in data:
+            try:
+                ids.append(uuid.UUID(str(raw_id)))
+                errors.append({})
+            except ValueError:
+                errors.append({"id": ["A valid item id is required."]})
+        if any(errors):
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = self.get_bulk_queryset().filter(id__in=ids)
+        with transaction.atomic():
+            existing = set(queryset.select_for_update().values_list('id', flat=True))
+            queryset.delete()
+
+        results = [
+            {"id": str(item_id), "status": "deleted" if item_id in existing else "not_found"}
+            for item_id in ids
+        ]
+        return Response(results, status=status.HTTP_200_OK)
@@ -0,0 +1,71 @@
+"""
+orjson and MessagePack renderers, the defaults in REST_FRAMEWORK.
+Types orjson and ormsgpack do not encode natively fall back to DRF's JSONEncoder, so the output matches JSONRenderer.
+"""
+import decimal
+import orjson
+import ormsgpack
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+JSON_OPTIONS = orjson.OPT_UTC_Z
+MSGPACK_OPTIONS = ormsgpack.OPT_UTC_Z
+
+_encoder = JSONEncoder()
+
+
+def json_default(obj):
+    # The Decimal's own digits, as a JSON number; DRF's encoder would round it through float
+    if isinstance(obj, decimal.Decimal):
+        return orjson.Fragment(str(obj)) if obj.is_finite() else None
+    return _encoder.default(obj)
+
+
+def msgpack_default(obj):
+    # MessagePack has no decimal type; float64 is exact up to 15 significant digits, more than any stored amount
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    return _encoder.default(obj)
+
+
+class ORJSONRenderer(BaseRenderer):
+    """Drop-in for DRF's JSONRenderer; `indent` in the Accept header or renderer context selects two-space indentation"""
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        options = JSON_OPTIONS
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            options |= orjson.OPT_INDENT_2
+        try:
+            ret = orjson.dumps(data, default=json_default, option=options)
+        except orjson.JSONEncodeError:
+            # Non-str dict keys are rare and the option slows every dict down, so it is only used on a retry
+            ret = orjson.dumps(data, default=json_default, option=options | orjson.OPT_NON_STR_KEYS)
+        # Like JSONRenderer, escape the separators that are valid JSON but end a line in JavaScript
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+    def get_indent(self, accepted_media_type, renderer_context):
+        params = (accepted_media_type or '').partition(';')[2]
+        return 'indent=' in params or bool(renderer_context.get('indent'))
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Served to clients that send `Accept: application/msgpack` or `?format=msgpack`"""
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        try:
+            return ormsgpack.packb(data, default=msgpack_default, option=MSGPACK_OPTIONS)
+        except ormsgpack.MsgpackEncodeError:
+            return ormsgpack.packb(data, default=msgpack_default, option=MSGPACK_OPTIONS | ormsgpack.OPT_NON_STR_KEYS)
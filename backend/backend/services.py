@@ -1,25 +1,107 @@
-from django.template.loader import render_to_string
+from django.template.loader import get_template
 from django.conf import settings
-from django.core.mail import EmailMultiAlternatives
+from django.core.mail import EmailMultiAlternatives, get_connection
+from notifications.models import EmailOutbox
 
-def send_templated_email(recipient_email, subject, template_name, context):
+def build_templated_email(recipient_email, subject, template_name, context, connection=None):
     """
-    Send a templated email.
+    Render a templated email without sending it.
 
     Args:
         recipient_email: Email address of recipient
         subject: Email subject
         template_name: Name of the template to use (without .html extension)
         context: Dictionary of variables to pass to the template
+        connection: Optional email backend connection to send the message with
     """
-    if not settings.SENDGRID_API_KEY:
-        return  # Email sending is disabled
-    
     from_email = settings.DEFAULT_FROM_EMAIL
     to = [recipient_email]
-    text_content = render_to_string(f'{template_name}.txt', context)
-    html_content = render_to_string(f'{template_name}.html', context)
+    text_content = get_template(f'{template_name}.txt').render(context)
+    html_content = get_template(f'{template_name}.html').render(context)
 
-    msg = EmailMultiAlternatives(subject, text_content, from_email, to, reply_to=[from_email])
+    msg = EmailMultiAlternatives(subject, text_content, from_email, to, reply_to=[from_email], connection=connection)
     msg.attach_alternative(html_content, "text/html")
-    msg.send()
+    return msg
+
+def enqueue_email(msg):
+    """Store built emails in the outbox, one row per recipient, inside the caller's transaction"""
+    return enqueue_emails([msg])
+
+def enqueue_emails(messages):
+    rows = []
+    for msg in messages:
+        html = next((content for content, mimetype in msg.alternatives if mimetype == 'text/html'), '')
+        rows.extend(
+            EmailOutbox(
+                recipient=recipient,
+                from_email=msg.from_email or '',
+                subject=msg.subject,
+                body_text=msg.body,
+                body_html=html,
+            )
+            for recipient in msg.to
+        )
+    return EmailOutbox.objects.bulk_create(rows)
+
+def send_email_batch(messages, connection=None):
+    """
+    Send built emails over a single backend connection.
+
+    Returns one `{'recipients', 'sent', 'error'}` result per message, in input order;
+    a failing message does not stop the rest of the batch.
+    """
+    results = []
+    connection = connection or get_connection()
+    with connection:
+        for msg in messages:
+            msg.connection = connection
+            try:
+                sent = connection.send_messages([msg]) == 1
+                error = None if sent else 'Message was not accepted by the backend'
+            except Exception as exc:
+                sent, error = False, f'{type(exc).__name__}: {exc}'
+            results.append({'recipients': msg.to, 'sent': sent, 'error': error})
+    return results
+
+def send_templated_email(recipient_email, subject, template_name, context):
+    """
+    Queue a templated email in the outbox.
+    The row is written in the caller's transaction and delivered by the `run_email_worker` command,
+    so the request never waits on the email provider.
+
+    Args:
+        recipient_email: Email address of recipient
+        subject: Email subject
+        template_name: Name of the template to use (without .html extension)
+        context: Dictionary of variables to pass to the template
+    """
+    send_templated_emails([{
+        'recipient_email': recipient_email,
+        'subject': subject,
+        'template_name': template_name,
+        'context': context,
+    }])
+
+def send_templated_emails(emails):
+    """
+    Queue many templated emails with a single insert.
+
+    Args:
+        emails: Iterable of dicts with the arguments of `send_templated_email`
+    """
+    if not settings.SENDGRID_API_KEY:
+        return []  # Email sending is disabled
+
+    return enqueue_emails([build_templated_email(**email) for email in emails])
+
+def deliver_templated_emails(emails, connection=None):
+    """
+    Render and send many templated emails right away over one connection, bypassing the outbox.
+
+    Args:
+        emails: Iterable of dicts with the arguments of `send_templated_email`
+        connection: Optional email backend connection; it is closed when the batch is done
+
+    Returns the per-message results of `send_email_batch`.
+    """
+    return send_email_batch([build_templated_email(**email) for email in emails], connection)
@@ -45,17 +45,20 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'rest_framework',
     'corsheaders',
+    'backend',
     'users',
     'trips',
     'itineraries',
     'expenses',
     'packing',
     'checklist',
+    'notifications',
     'rest_framework_simplejwt',
     'rest_framework_simplejwt.token_blacklist',
 ]
 
 MIDDLEWARE = [
+    'backend.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -86,15 +89,25 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'backend.wsgi.application'
 
+TEST_RUNNER = 'backend.test_runner.TestRunner'
+
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Under ASGI every thread that runs ORM code (one per request plus the `AsyncAPIView.gather` pool)
+# would keep its own persistent connection, so connections are closed after each request there.
+SERVING_ASGI = 'uvicorn' in os.environ.get('GUNICORN_WORKER_CLASS', '').lower()
+CONN_MAX_AGE = int(os.environ.get('CONN_MAX_AGE', 0 if SERVING_ASGI else 600))
+
+# Worker threads per process that run the concurrent queries of `AsyncAPIView.gather`
+ASYNC_QUERY_THREADS = int(os.environ.get('ASYNC_QUERY_THREADS', 4))
+
 if os.environ.get('DATABASE_URL'):
     DATABASES = {
         'default': dj_database_url.config(
             default=os.environ.get('DATABASE_URL'),
-            conn_max_age=600,
+            conn_max_age=CONN_MAX_AGE,
             conn_health_checks=True,
         )
     }
@@ -112,6 +125,39 @@ else:
 
 AUTH_USER_MODEL = 'users.User'
 
+# Cache
+# CACHE_URL selects the shared backend: redis://, rediss://, file:///path or db://table_name.
+# Without it a file cache under BASE_DIR/.cache is shared by the workers of one host.
+
+CACHE_URL = os.environ.get('CACHE_URL', 'file://' + os.path.join(BASE_DIR, '.cache'))
+
+
+def cache_backend(url, namespace):
+    scheme, _, location = url.partition('://')
+    if scheme in ('redis', 'rediss'):
+        return {'BACKEND': 'backend.cache.RedisCache', 'LOCATION': url}
+    if scheme == 'db':
+        return {'BACKEND': 'backend.cache.DatabaseCache', 'LOCATION': location}
+    if scheme == 'file':
+        return {'BACKEND': 'backend.cache.FileBasedCache', 'LOCATION': os.path.join(location, namespace)}
+    raise ValueError(f'Unsupported CACHE_URL scheme: {scheme}')
+
+
+CACHES = {
+    # Application read caches
+    'default': {
+        **cache_backend(CACHE_URL, 'data'),
+        'KEY_PREFIX': 'data',
+        'TIMEOUT': 300,
+    },
+    # Rate limit counters
+    'throttle': {
+        **cache_backend(CACHE_URL, 'throttle'),
+        'KEY_PREFIX': 'throttle',
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -147,7 +193,7 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
 STATIC_URL = 'static/'
-MIDDLEWARE.insert(1, 'whitenoise.middleware.WhiteNoiseMiddleware')
+MIDDLEWARE.insert(MIDDLEWARE.index('django.middleware.security.SecurityMiddleware') + 1, 'backend.middleware.StaticFilesMiddleware')
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
@@ -164,19 +210,31 @@ CSRF_TRUSTED_ORIGINS = os.environ.get('CSRF_TRUSTED_ORIGINS', 'http://localhost:
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'backend.renderers.ORJSONRenderer',
+        'backend.renderers.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'backend.parsers.ORJSONParser',
+        'backend.parsers.MessagePackParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle",
-        "rest_framework.throttling.ScopedRateThrottle",
+        "backend.throttling.AnonRateThrottle",
+        "backend.throttling.UserRateThrottle",
+        "backend.throttling.ScopedRateThrottle",
     ],
+    # An empty THROTTLE_ANON_RATE or THROTTLE_USER_RATE disables that throttle, e.g. on a load benchmark target
     "DEFAULT_THROTTLE_RATES": {
-        "anon": "500/hour",
-        "user": "500/hour",
+        "anon": os.getenv("THROTTLE_ANON_RATE", "500/hour") or None,
+        "user": os.getenv("THROTTLE_USER_RATE", "500/hour") or None,
         "resend_set_password_email": "3/hour",
     },
 }
@@ -197,8 +255,14 @@ SIMPLE_JWT = {
     'AUTH_COOKIE_MAX_AGE': 3600 * 24,  # 1 day
     'AUTH_COOKIE_REFRESH_MAX_AGE': 3600 * 24 * 7,  # 1 week
     'AUTH_COOKIE_DOMAIN': os.getenv('AUTH_COOKIE_DOMAIN', None),
+    'TOKEN_OBTAIN_SERIALIZER': 'users.tokens.CachedTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'users.tokens.CachedTokenRefreshSerializer',
+    'TOKEN_BLACKLIST_SERIALIZER': 'users.tokens.CachedTokenBlacklistSerializer',
 }
 
+# Seconds an authenticated user stays cached between requests
+AUTH_USER_CACHE_TIMEOUT = int(os.getenv('AUTH_USER_CACHE_TIMEOUT', 300))
+
 # Media settings for user avatars and other uploads
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
@@ -222,10 +286,22 @@ LOGGING = {
         'handlers': ['console'],
         'level': 'INFO',
     },
+    'loggers': {
+        # One JSON line per request from RequestMetricsMiddleware
+        'backend.requests': {
+            'level': os.getenv('REQUEST_LOG_LEVEL', 'INFO'),
+        },
+    },
 }
 
 FRONTEND_URL = os.getenv('FRONTEND_URL', 'http://localhost:5173')
 
+# Bearer token required by the /metrics endpoint; without one it is only served with DEBUG
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# Time `serializer.data` for the Server-Timing header, request log and metrics; patches DRF's BaseSerializer once at startup
+SERIALIZER_TIMING = os.getenv('SERIALIZER_TIMING', 'True') == 'True'
+
 # Password reset token lifetime (detik)
 # Default Django: 259200 (3 days). Ubah sesuai kebutuhan.
 PASSWORD_RESET_TIMEOUT = 60 * 60 * 24  # 24 hours
@@ -0,0 +1,152 @@
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from checklist.models import ChecklistItem
+from expenses.models import Expense, ExpenseCategory, ExpenseSplit
+from itineraries.models import ItineraryItem, ItineraryType
+from packing.models import PackingCategory, PackingItem, PackingTemplate, PackingTemplateItem
+from trips.calendar import make_calendar_token
+from trips.models import MemberRole, MemberStatus, Tag, Trip, TripMember
+from users.models import User
+
+SMALL = 5
+LARGE = 50
+
+
+def seed_trip_data(size):
+    """
+    An organizer with `size` trips, and one of them with `size` members, tags,
+    expenses (split between all members), itinerary stops, packing items and checklist items.
+    """
+    owner = User.objects.create_user(email=f"owner{size}@example.com", password="Test12#$", first_name="Owner")
+    trips = [
+        Trip.objects.create(
+            owner=owner, title=f"Trip {index}", destination="Lombok", start_date=date(2030, 1, 1),
+            end_date=date(2030, 1, 10), member_spots=size + 1, budget=Decimal("1000.00"), is_public=True,
+        )
+        for index in range(size)
+    ]
+    trip = trips[0]
+    for other in trips:
+        TripMember.objects.create(trip=other, user=owner, role=MemberRole.ORGANIZER, status=MemberStatus.ACCEPTED)
+
+    members = [
+        TripMember.objects.create(
+            trip=trip, status=MemberStatus.ACCEPTED,
+            user=User.objects.create_user(email=f"member{size}-{index}@example.com", password="Test12#$"),
+        )
+        for index in range(size)
+    ]
+    trip.tags.set(Tag.objects.create(name=f"tag-{size}-{index}", slug=f"tag-{size}-{index}") for index in range(size))
+
+    expense_category = ExpenseCategory.objects.first() or ExpenseCategory.objects.create(name="Food")
+    itinerary_type = ItineraryType.objects.first() or ItineraryType.objects.create(name="Sightseeing")
+    packing_category = PackingCategory.objects.first() or PackingCategory.objects.create(name="Clothing")
+
+    for index in range(size):
+        member = members[index]
+        expense = Expense.objects.create(
+            trip=trip, title=f"Expense {index}", amount=Decimal(size * 10), paid_by=member, category=expense_category,
+        )
+        ExpenseSplit.objects.bulk_create(ExpenseSplit(expense=expense, member=split_member, amount=Decimal(10)) for split_member in members)
+        ItineraryItem.objects.create(
+            trip=trip, name=f"Stop {index}", type=itinerary_type, estimated_time="2 hours",
+            latitude=Decimal("-8.5") + Decimal(index) / 100, longitude=Decimal("116.1"),
+            visit_time=timezone.make_aware(datetime.combine(date(2030, 1, 2), time(8)) + timedelta(minutes=90 * index)),
+        )
+        PackingItem.objects.create(trip=trip, name=f"Item {index}", category=packing_category, assigned_to=member)
+        ChecklistItem.objects.create(trip=trip, title=f"Task {index}", assigned_to=member, position=(index + 1) * 1024, due_date=date(2029, 12, 20))
+
+    template = PackingTemplate.objects.create(name=f"Template {size}", owner=owner)
+    PackingTemplateItem.objects.bulk_create(
+        PackingTemplateItem(template=template, name=f"Thing {index}", category=packing_category) for index in range(size)
+    )
+
+    return {
+        "owner": owner,
+        "trip": trip,
+        "member": members[0],
+        "expense": trip.expenses.first(),
+        "itinerary": trip.itinerary_items.first(),
+        "packing": trip.packing_items.first(),
+        "checklist": trip.checklist_items.first(),
+        "template": template,
+    }
+
+
+# (name, url builder, query budget); every count must also be the same at both sizes.
+# Trip-scoped endpoints include the revision lookup behind their ETag.
+ENDPOINTS = [
+    ("trip list", lambda d: reverse("trip-list"), 5),
+    ("trip detail", lambda d: reverse("trip-detail", args=[d["trip"].id]), 6),
+    ("trip statistics", lambda d: reverse("trip-statistics"), 8),
+    ("tag list", lambda d: reverse("tag-list"), 1),
+    ("member list", lambda d: reverse("trip-member-list", args=[d["trip"].id]), 2),
+    ("member detail", lambda d: reverse("trip-member-detail", args=[d["trip"].id, d["member"].id]), 4),
+    ("member statistics", lambda d: reverse("trip-member-statistics", args=[d["trip"].id]), 3),
+    ("itinerary summary", lambda d: reverse("trip-itinerary-summary", args=[d["trip"].id]), 4),
+    ("calendar link", lambda d: reverse("trip-calendar", args=[d["trip"].id]), 1),
+    ("calendar feed", lambda d: reverse("trip-calendar-feed", args=[d["trip"].id]) + "?token=" + make_calendar_token(d["trip"].id, d["owner"].id), 5),
+    ("itinerary list", lambda d: reverse("itinerary-item-list", args=[d["trip"].id]), 3),
+    ("itinerary detail", lambda d: reverse("itinerary-item-detail", args=[d["trip"].id, d["itinerary"].id]), 3),
+    ("itinerary organized", lambda d: reverse("itinerary-organized-list", args=[d["trip"].id]), 3),
+    ("itinerary statistics", lambda d: reverse("itinerary-statistics", args=[d["trip"].id]), 3),
+    ("itinerary geo", lambda d: reverse("itinerary-geo", args=[d["trip"].id]) + "?bbox=115,-9,117,-8&zoom=8", 3),
+    ("itinerary conflicts", lambda d: reverse("itinerary-conflicts", args=[d["trip"].id]), 3),
+    ("itinerary optimize", lambda d: reverse("itinerary-optimize", args=[d["trip"].id]) + "?date=2030-01-02", 3),
+    ("itinerary types", lambda d: reverse("itinerary-type-list"), 1),
+    ("expense list", lambda d: reverse("expense-item-list", args=[d["trip"].id]), 8),
+    ("expense detail", lambda d: reverse("expense-item-detail", args=[d["trip"].id, d["expense"].id]), 8),
+    ("expense statistics", lambda d: reverse("expense-statistics", args=[d["trip"].id]), 5),
+    ("expense categories", lambda d: reverse("expense-category-list"), 1),
+    ("packing list", lambda d: reverse("packing-item-list", args=[d["trip"].id]), 4),
+    ("packing detail", lambda d: reverse("packing-item-detail", args=[d["trip"].id, d["packing"].id]), 4),
+    ("packing statistics", lambda d: reverse("packing-statistics", args=[d["trip"].id]), 4),
+    ("packing categories", lambda d: reverse("packing-category-list"), 1),
+    ("packing templates", lambda d: reverse("packing-template-list"), 3),
+    ("packing template detail", lambda d: reverse("packing-template-detail", args=[d["template"].id]), 3),
+    ("checklist list", lambda d: reverse("checklist-item-list", args=[d["trip"].id]), 6),
+    ("checklist detail", lambda d: reverse("checklist-item-detail", args=[d["trip"].id, d["checklist"].id]), 6),
+    ("checklist statistics", lambda d: reverse("checklist-statistics", args=[d["trip"].id]), 4),
+    ("current user", lambda d: reverse("user_detail"), 0),
+    ("user profile", lambda d: reverse("user_profile", args=[d["member"].user_id]), 1),
+    ("user autocomplete", lambda d: reverse("user_autocomplete") + "?q=member", 1),
+]
+
+
+class QueryBudgetTests(TestCase):
+    """
+    Every read endpoint must issue the same number of queries for a trip with 5 items per domain
+    as for one with 50, and stay within its budget.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.small = seed_trip_data(SMALL)
+        cls.large = seed_trip_data(LARGE)
+
+    def capture(self, data, url):
+        client = APIClient()
+        client.force_authenticate(user=data["owner"])
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+            b"".join(response) if response.streaming else response.content
+        self.assertEqual(response.status_code, 200, f"GET {url} returned {response.status_code}")
+        return [query["sql"] for query in queries]
+
+    def test_query_counts_do_not_grow_with_data(self):
+        for name, build_url, budget in ENDPOINTS:
+            with self.subTest(endpoint=name):
+                small = self.capture(self.small, build_url(self.small))
+                large = self.capture(self.large, build_url(self.large))
+                listing = "\n".join(f"  {index}. {sql}" for index, sql in enumerate(large, start=1))
+                self.assertEqual(
+                    len(small), len(large),
+                    f"{name}: {len(small)} queries with {SMALL} items per domain but {len(large)} with {LARGE}:\n{listing}",
+                )
+                self.assertLessEqual(len(large), budget, f"{name}: {len(large)} queries exceed the budget of {budget}:\n{listing}")
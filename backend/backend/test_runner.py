@@ -0,0 +1,24 @@
+import logging
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    """
+    Runs the suite against process-local caches, so runs never share throttle counters or data with a real cache.
+    Per-request log lines are silenced to keep the output readable.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        from django.conf import settings
+        self._cache_override = override_settings(CACHES={
+            alias: {**config, 'BACKEND': 'backend.cache.LocMemCache', 'LOCATION': alias}
+            for alias, config in settings.CACHES.items()
+        })
+        self._cache_override.enable()
+        logging.getLogger('backend.requests').setLevel(logging.WARNING)
+
+    def teardown_test_environment(self, **kwargs):
+        self._cache_override.disable()
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,215 @@
+from django.core import mail
+from django.core.cache import cache, caches
+from django.core.mail.backends import locmem
+import json
+from datetime import date
+from decimal import Decimal
+import ormsgpack
+from asgiref.sync import sync_to_async
+from django.test import AsyncClient, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from checklist.models import ChecklistItem
+from trips.models import MemberRole, MemberStatus, Trip, TripMember
+from users.models import User
+from backend.services import deliver_templated_emails
+from backend.cache import cache_stats, reset_cache_stats
+from backend.throttling import throttle_cache
+from backend.benchmarks import compare
+from backend.renderers import ORJSONRenderer
+
+
+class CacheConfigurationTests(SimpleTestCase):
+    """Tests for the namespaced cache aliases and their hit/miss stats"""
+
+    def setUp(self):
+        cache.clear()
+        throttle_cache.clear()
+        reset_cache_stats()
+
+    def test_aliases_do_not_share_keys(self):
+        cache.set("key", "data")
+        self.assertIsNone(caches["throttle"].get("key"))
+        self.assertEqual(cache.get("key"), "data")
+
+    def test_hits_and_misses_are_counted_per_alias(self):
+        cache.set("present", 1)
+        cache.get("present")
+        cache.get("absent")
+        cache.get_many(["present", "absent"])
+        throttle_cache.get("absent")
+
+        stats = cache_stats()
+        self.assertEqual((stats["data"]["hits"], stats["data"]["misses"]), (2, 2))
+        self.assertEqual(stats["data"]["hit_ratio"], 0.5)
+        self.assertEqual(stats["throttle"]["misses"], 1)
+
+
+class RejectingBackend(locmem.EmailBackend):
+    """Accepts every message except those addressed to a blocked domain"""
+    connections_opened = 0
+
+    def open(self):
+        RejectingBackend.connections_opened += 1
+        return super().open()
+
+    def send_messages(self, messages):
+        if any(address.endswith("@blocked.example") for message in messages for address in message.to):
+            raise ConnectionError("recipient rejected")
+        return super().send_messages(messages)
+
+
+@override_settings(EMAIL_BACKEND="backend.tests.RejectingBackend", DEFAULT_FROM_EMAIL="noreply@example.com")
+class BatchEmailTests(SimpleTestCase):
+    """Tests for sending many templated emails over one connection"""
+
+    def test_batch_reports_each_message_and_reuses_one_connection(self):
+        RejectingBackend.connections_opened = 0
+        emails = [
+            {
+                "recipient_email": recipient,
+                "subject": "Welcome",
+                "template_name": "welcome_email",
+                "context": {"user": {"first_name": "Ana"}, "login_url": "http://localhost/login"},
+            }
+            for recipient in ["one@example.com", "two@blocked.example", "three@example.com"]
+        ]
+
+        results = deliver_templated_emails(emails)
+
+        self.assertEqual([result["sent"] for result in results], [True, False, True])
+        self.assertIn("recipient rejected", results[1]["error"])
+        self.assertEqual([message.to for message in mail.outbox], [["one@example.com"], ["three@example.com"]])
+        self.assertEqual(RejectingBackend.connections_opened, 1)
+
+
+class RequestMetricsMiddlewareTests(TestCase):
+    """Tests for the Server-Timing header and request log line"""
+
+    def test_header_and_log_line_describe_the_request(self):
+        user = User.objects.create_user(email="timing@example.com", password="Test12#$")
+        client = APIClient()
+        client.force_authenticate(user=user)
+
+        with self.assertLogs("backend.requests", level="INFO") as logs:
+            response = client.get(reverse("trip-list"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(response["Server-Timing"], r'^app;dur=[\d.]+, db;dur=[\d.]+;desc="\d+ queries", serializer;dur=[\d.]+, cache;desc=')
+        line = json.loads(logs.records[-1].getMessage())
+        self.assertEqual((line["view"], line["status"]), ("TripViewSet.list", 200))
+        self.assertGreater(line["db_queries"], 0)
+
+    def test_header_is_withheld_from_anonymous_clients(self):
+        response = APIClient().get(reverse("itinerary-type-list"))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("Server-Timing", response)
+
+
+class MetricsEndpointTests(TestCase):
+    """Tests for the Prometheus /metrics endpoint"""
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_exports_request_histograms_and_outbox_depth(self):
+        client = APIClient()
+        client.force_authenticate(user=User.objects.create_user(email="metrics@example.com", password="Test12#$"))
+        client.get(reverse("trip-list"))
+
+        response = self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer secret")
+
+        self.assertEqual(response.status_code, 200)
+        body = response.content.decode()
+        self.assertIn('jelajah_http_request_duration_seconds_count{method="GET",status="200",view="TripViewSet.list"}', body)
+        self.assertIn('jelajah_http_request_db_queries_bucket{le="5.0",view="TripViewSet.list"}', body)
+        self.assertIn('jelajah_email_outbox_depth{status="PENDING"} 0.0', body)
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_token_is_required_when_configured(self):
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 403)
+        self.assertEqual(self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer secret").status_code, 200)
+
+    @override_settings(METRICS_TOKEN="")
+    def test_hidden_in_production_without_token(self):
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 404)
+        with self.settings(DEBUG=True):
+            self.assertEqual(self.client.get(reverse("metrics")).status_code, 200)
+
+
+class AsyncStatisticsViewTests(TransactionTestCase):
+    """Statistics served by async views, with the aggregates run on worker threads outside a transaction"""
+    serialized_rollback = True
+
+    async def test_aggregates_run_concurrently_on_committed_data(self):
+        user, trip = await sync_to_async(self.create_trip)()
+        client = AsyncClient()
+        client.cookies["access"] = str(AccessToken.for_user(user))
+
+        response = await client.get(reverse("checklist-statistics", kwargs={"trip_id": trip.id}))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.json()["total_items"], response.json()["completed_items"]), (3, 1))
+        self.assertEqual(response.json()["category_stats"], [{"category": "PRE_TRIP", "total": 3, "completed": 1}])
+
+    @override_settings(DEBUG=True)
+    async def test_middleware_chain_is_not_adapted_to_sync(self):
+        user, trip = await sync_to_async(self.create_trip)()
+        client = AsyncClient()
+        client.cookies["access"] = str(AccessToken.for_user(user))
+
+        # With DEBUG on, Django logs every handler it has to wrap for a sync-only middleware
+        with self.assertNoLogs("django.request", "DEBUG"):
+            response = await client.get(reverse("checklist-statistics", kwargs={"trip_id": trip.id}))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('"0 queries"', response["Server-Timing"])
+
+    def create_trip(self):
+        user = User.objects.create_user(email="async@example.com", password="Test12#$")
+        trip = Trip.objects.create(owner=user, title="Async", destination="Bali", start_date=date(2030, 1, 1), end_date=date(2030, 1, 5))
+        TripMember.objects.create(trip=trip, user=user, role=MemberRole.ORGANIZER, status=MemberStatus.ACCEPTED)
+        for index in range(3):
+            ChecklistItem.objects.create(trip=trip, title=f"Task {index}", is_completed=index == 0, position=(index + 1) * 1024, due_date=date(2029, 12, 1))
+        return user, trip
+
+
+class MicrobenchmarkBaselineTests(SimpleTestCase):
+    def test_flags_extra_queries_and_slowdowns_beyond_tolerance(self):
+        baseline = {
+            "steady": {"ops_per_sec": 100, "peak_kib": 10, "queries": 3},
+            "slower": {"ops_per_sec": 100, "peak_kib": 10, "queries": 3},
+        }
+        results = {
+            "steady": {"ops_per_sec": 90, "peak_kib": 11, "queries": 3},
+            "slower": {"ops_per_sec": 50, "peak_kib": 10, "queries": 4},
+            "added": {"ops_per_sec": 1, "peak_kib": 1, "queries": 1},
+        }
+
+        rows = {row["name"]: row["regressions"] for row in compare(results, baseline, tolerance=0.25)}
+
+        self.assertEqual(rows["steady"], [])
+        self.assertEqual(rows["slower"], ["queries 3 -> 4", "ops/sec 100 -> 50"])
+        self.assertEqual(rows["added"], [])
+
+
+class RendererTests(TestCase):
+    """Tests for the orjson and MessagePack renderers and parsers"""
+
+    def test_decimals_keep_their_digits(self):
+        content = ORJSONRenderer().render({"spent": Decimal("1234567890123.45"), "share": Decimal("0.10"), "line": "a\u2028b"})
+        self.assertEqual(content, b'{"spent":1234567890123.45,"share":0.10,"line":"a\\u2028b"}')
+
+    def test_messagepack_is_negotiated_for_responses_and_requests(self):
+        user = User.objects.create_user(email="msgpack@example.com", password="Test12#$")
+        client = APIClient()
+        client.force_authenticate(user=user)
+
+        response = client.patch(
+            reverse("user_detail"), ormsgpack.packb({"first_name": "Packed"}),
+            content_type="application/msgpack", HTTP_ACCEPT="application/msgpack",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/msgpack")
+        body = ormsgpack.unpackb(response.content)
+        self.assertEqual((body["email"], body["first_name"]), ("msgpack@example.com", "Packed"))
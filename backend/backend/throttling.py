@@ -0,0 +1,30 @@
+from django.utils.connection import ConnectionProxy
+from django.core.cache import caches
+from rest_framework import throttling
+from .metrics import THROTTLE_REJECTIONS
+
+# Throttle counters live in their own alias so they are shared by every worker and never evicted by data caches
+throttle_cache = ConnectionProxy(caches, 'throttle')
+
+
+class CountedThrottleMixin:
+    """Counts rejections per throttle scope for the metrics endpoint"""
+    cache = throttle_cache
+
+    def allow_request(self, request, view):
+        allowed = super().allow_request(request, view)
+        if not allowed:
+            THROTTLE_REJECTIONS.labels(self.scope).inc()
+        return allowed
+
+
+class AnonRateThrottle(CountedThrottleMixin, throttling.AnonRateThrottle):
+    pass
+
+
+class UserRateThrottle(CountedThrottleMixin, throttling.UserRateThrottle):
+    pass
+
+
+class ScopedRateThrottle(CountedThrottleMixin, throttling.ScopedRateThrottle):
+    pass
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from checklist.models import ChecklistItem
+from checklist.ranking import rebalance_positions, trips_needing_rebalance
+
+
+class Command(BaseCommand):
+    help = "Respread checklist positions of trips whose neighbouring items ran out of room between them."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--min-gap', type=int, default=8, help="Rebalance trips with neighbouring positions closer than this")
+        parser.add_argument('--all', action='store_true', help="Rebalance every trip with checklist items")
+
+    def handle(self, *args, **options):
+        if options['all']:
+            trip_ids = set(ChecklistItem.objects.values_list('trip_id', flat=True).distinct())
+        else:
+            trip_ids = trips_needing_rebalance(options['min_gap'])
+
+        updated = 0
+        for trip_id in trip_ids:
+            updated += rebalance_positions(trip_id)
+
+        self.stdout.write(self.style.SUCCESS(f"Rebalanced {len(trip_ids)} trip(s), {updated} item(s) moved."))
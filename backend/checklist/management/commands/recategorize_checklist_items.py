@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from checklist.models import ChecklistItem, recategorize_checklist_items_for_trips
+
+
+class Command(BaseCommand):
+    help = "Re-derive PRE_TRIP/DURING_TRIP/POST_TRIP checklist categories from the current trip dates."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help="Number of trips updated per statement")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        trip_ids = list(ChecklistItem.objects.order_by('trip_id').values_list('trip_id', flat=True).distinct())
+
+        updated = 0
+        for start in range(0, len(trip_ids), batch_size):
+            with transaction.atomic():
+                updated += recategorize_checklist_items_for_trips(trip_ids[start:start + batch_size])
+
+        self.stdout.write(self.style.SUCCESS(f"Recategorized {updated} item(s) across {len(trip_ids)} trip(s)."))
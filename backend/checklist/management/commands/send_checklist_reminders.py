@@ -0,0 +1,70 @@
+from collections import defaultdict
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from backend.services import deliver_templated_emails
+from checklist.models import ChecklistItem, ChecklistReminder
+from trips.models import MemberStatus, TripStatus
+
+
+class Command(BaseCommand):
+    help = "Email each assignee one digest of their incomplete checklist items that are due soon. Safe to run from cron."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=2, help="Remind about items due within this many days")
+        parser.add_argument('--dry-run', action='store_true', help="Report the digests without sending or recording them")
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+        already_sent = ChecklistReminder.objects.filter(item=OuterRef('pk'), due_date=OuterRef('due_date'))
+        items = (
+            ChecklistItem.objects
+            .filter(is_completed=False, due_date__gte=today, due_date__lte=today + timedelta(days=options['days']))
+            .filter(assigned_to__isnull=False, assigned_to__status=MemberStatus.ACCEPTED)
+            .exclude(trip__status__in=[TripStatus.DELETED, TripStatus.CANCELLED])
+            .exclude(Exists(already_sent))
+            .select_related('trip', 'assigned_to__user')
+            .order_by('due_date', 'position')
+        )
+
+        digests = defaultdict(list)
+        for item in items:
+            digests[item.assigned_to.user].append(item)
+
+        if options['dry_run']:
+            for user, user_items in digests.items():
+                self.stdout.write(f"{user.email}: {len(user_items)} item(s)")
+            return
+
+        if not settings.SENDGRID_API_KEY:
+            self.stdout.write(self.style.WARNING("Email sending is disabled; no reminders sent."))
+            return
+
+        digests = list(digests.items())
+        results = deliver_templated_emails([
+            {
+                'recipient_email': user.email,
+                'subject': f"Reminder: {len(user_items)} checklist task(s) due soon",
+                'template_name': 'checklist_reminder_digest',
+                'context': {
+                    'user': user,
+                    'items': user_items,
+                    'login_url': settings.FRONTEND_URL + '/login?redirect=/trips/my',
+                },
+            }
+            for user, user_items in digests
+        ])
+
+        reminders = []
+        failed = 0
+        for (user, user_items), result in zip(digests, results):
+            if not result['sent']:
+                failed += 1
+                self.stderr.write(f"Failed to send reminder to {user.email}: {result['error']}")
+                continue
+            reminders.extend(ChecklistReminder(item=item, due_date=item.due_date) for item in user_items)
+        ChecklistReminder.objects.bulk_create(reminders, ignore_conflicts=True)
+
+        self.stdout.write(self.style.SUCCESS(f"Sent {len(digests) - failed} reminder digest(s), {failed} failed."))
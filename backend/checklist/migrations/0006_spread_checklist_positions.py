@@ -0,0 +1,24 @@
+from django.db import migrations
+
+RANK_GAP = 1024
+
+
+def spread_checklist_positions(apps, schema_editor):
+    ChecklistItem = apps.get_model('checklist', 'ChecklistItem')
+    trip_ids = ChecklistItem.objects.values_list('trip_id', flat=True).distinct()
+    for trip_id in trip_ids:
+        items = list(ChecklistItem.objects.filter(trip_id=trip_id).order_by('position', 'created_at').only('id', 'position'))
+        for index, item in enumerate(items, start=1):
+            item.position = index * RANK_GAP
+        ChecklistItem.objects.bulk_update(items, ['position'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('checklist', '0005_alter_checklistitem_options'),
+    ]
+
+    operations = [
+        migrations.RunPython(spread_checklist_positions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.4 on 2026-10-19 17:55
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('checklist', '0006_spread_checklist_positions'),
+        ('trips', '0012_alter_tripmember_options'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChecklistReminder',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('due_date', models.DateField(help_text='Due date the reminder was sent for; a new due date gets a new reminder')),
+                ('sent_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='checklistitem',
+            index=models.Index(fields=['is_completed', 'due_date'], name='checklist_completed_due_idx'),
+        ),
+        migrations.AddField(
+            model_name='checklistreminder',
+            name='item',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reminders', to='checklist.checklistitem'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='checklistreminder',
+            unique_together={('item', 'due_date')},
+        ),
+    ]
@@ -1,6 +1,8 @@
 from django.db import models
+from django.db.models import Case, When, Value, OuterRef, Subquery
 from backend.models import BaseModel
 from trips.models import Trip, TripMember
+from trips.revisions import bump_trip_revision
 
 class ChecklistCategory(models.TextChoices):
     PRE_TRIP = 'PRE_TRIP', 'Pre-Trip'
@@ -12,6 +14,42 @@ class ChecklistPriority(models.TextChoices):
     MEDIUM = 'MEDIUM', 'Medium'
     HIGH = 'HIGH', 'High'
 
+def get_checklist_category(due_date, start_date, end_date):
+    """Determine the checklist category of a due date relative to the trip dates"""
+    if due_date:
+        if due_date < start_date:
+            return ChecklistCategory.PRE_TRIP
+        if due_date > end_date:
+            return ChecklistCategory.POST_TRIP
+    return ChecklistCategory.DURING_TRIP
+
+def checklist_category_expression(start_date, end_date):
+    """SQL CASE equivalent of get_checklist_category; the dates may be values or expressions"""
+    return Case(
+        When(due_date__lt=start_date, then=Value(ChecklistCategory.PRE_TRIP)),
+        When(due_date__gt=end_date, then=Value(ChecklistCategory.POST_TRIP)),
+        default=Value(ChecklistCategory.DURING_TRIP),
+        output_field=models.CharField(),
+    )
+
+def recategorize_checklist_items(trip):
+    """Re-derive the category of every checklist item of a trip with a single UPDATE"""
+    return ChecklistItem.objects.filter(trip_id=trip.id).update(
+        category=checklist_category_expression(trip.start_date, trip.end_date)
+    )
+
+def recategorize_checklist_items_for_trips(trip_ids):
+    """Re-derive checklist categories of several trips with a single UPDATE reading each item's trip dates"""
+    trip_dates = Trip.objects.filter(id=OuterRef('trip_id'))
+    updated = ChecklistItem.objects.filter(trip_id__in=trip_ids).update(
+        category=checklist_category_expression(
+            Subquery(trip_dates.values('start_date')[:1]),
+            Subquery(trip_dates.values('end_date')[:1]),
+        )
+    )
+    bump_trip_revision(*trip_ids)
+    return updated
+
 class ChecklistItem(BaseModel):
     """Model representing a checklist item for a trip."""
     trip = models.ForeignKey(Trip, on_delete=models.CASCADE, related_name='checklist_items')
@@ -29,3 +67,18 @@ class ChecklistItem(BaseModel):
     
     class Meta:
         ordering = ['-due_date', 'position']
+        indexes = [
+            models.Index(fields=['is_completed', 'due_date'], name='checklist_completed_due_idx'),
+        ]
+
+class ChecklistReminder(BaseModel):
+    """Record of a due-date reminder sent for a checklist item, so reruns do not resend it"""
+    item = models.ForeignKey(ChecklistItem, on_delete=models.CASCADE, related_name='reminders')
+    due_date = models.DateField(help_text="Due date the reminder was sent for; a new due date gets a new reminder")
+    sent_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.item.title} ({self.due_date})"
+
+    class Meta:
+        unique_together = ['item', 'due_date']
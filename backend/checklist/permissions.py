@@ -6,6 +6,7 @@ class IsChecklistItemAccessible(permissions.BasePermission):
     - Only trip owners or members with accepted status can view checklist items.
     - Trip owners and members with roles other than 'MEMBER' can create, update, and delete checklist items.
     - Members with 'MEMBER' role can view checklist items and create, update, delete checklist items with assigned_to themselves.
+    - The same applies to bulk batches: a MEMBER may only batch items assigned to themselves.
     """
     
     def has_permission(self, request, view):
@@ -29,7 +30,7 @@ class IsChecklistItemAccessible(permissions.BasePermission):
         if view.action in ['list', 'retrieve']:
             return trip.owner == user or is_member
 
-        if view.action in ['create', 'update', 'partial_update', 'destroy']:
+        if view.action in ['create', 'update', 'partial_update', 'destroy', 'move', 'bulk']:
             if trip.owner == user:
                 return True
             member = trip.trip_members.filter(
@@ -40,11 +41,13 @@ class IsChecklistItemAccessible(permissions.BasePermission):
                 if member.role != MemberRole.MEMBER:
                     return True
                 else:
-                    if view.action in ['update', 'partial_update', 'destroy']:
+                    if view.action in ['update', 'partial_update', 'destroy', 'move']:
                         checklist_item = view.get_object()
                         return checklist_item.assigned_to and checklist_item.assigned_to.user == user
                     elif view.action == 'create':
                         assigned_to_id = request.data.get('assigned_to')
                         return assigned_to_id == member.id
+                    elif view.action == 'bulk':
+                        return view.is_bulk_assigned_to(member)
         
         return False
@@ -0,0 +1,87 @@
+from django.db import transaction
+from django.db.models import F, Max, Q, Window
+from django.db.models.functions import Lag
+from trips.revisions import bump_trip_revision
+from .models import ChecklistItem
+
+# Distance between neighbouring positions after a rebalance; a move halves the gap it lands in
+RANK_GAP = 1024
+
+
+def next_position(trip_id):
+    """Position that places a new item after every existing item of the trip"""
+    last = ChecklistItem.objects.filter(trip_id=trip_id).aggregate(last=Max('position'))['last']
+    return (last or 0) + RANK_GAP
+
+
+@transaction.atomic
+def rebalance_positions(trip_id):
+    """Spread the positions of a trip's checklist items evenly, keeping their order"""
+    items = list(
+        ChecklistItem.objects.select_for_update().filter(trip_id=trip_id).order_by('position', 'id').only('id', 'position')
+    )
+    changed = []
+    for index, item in enumerate(items, start=1):
+        position = index * RANK_GAP
+        if item.position != position:
+            item.position = position
+            changed.append(item)
+    ChecklistItem.objects.bulk_update(changed, ['position'], batch_size=500)
+    if changed:
+        bump_trip_revision(trip_id)
+    return len(changed)
+
+
+def trips_needing_rebalance(min_gap=2):
+    """Ids of trips where two neighbouring checklist items are less than `min_gap` positions apart"""
+    items = ChecklistItem.objects.annotate(
+        previous_position=Window(
+            Lag('position'),
+            partition_by=[F('trip_id')],
+            order_by=[F('position').asc(), F('id').asc()],
+        )
+    ).filter(previous_position__isnull=False, position__lt=F('previous_position') + min_gap)
+    return set(items.values_list('trip_id', flat=True))
+
+
+def _neighbour(queryset, anchor, direction):
+    """Item directly before (direction < 0) or after (direction > 0) the anchor in position order"""
+    if direction < 0:
+        condition = Q(position__lt=anchor.position) | Q(position=anchor.position, id__lt=anchor.id)
+        ordering = ['-position', '-id']
+    else:
+        condition = Q(position__gt=anchor.position) | Q(position=anchor.position, id__gt=anchor.id)
+        ordering = ['position', 'id']
+    return queryset.filter(condition).order_by(*ordering).only('id', 'position').first()
+
+
+def _target_position(queryset, anchor, place_before):
+    if place_before:
+        previous = _neighbour(queryset, anchor, -1)
+        low, high = (previous.position if previous else 0), anchor.position
+    else:
+        following = _neighbour(queryset, anchor, 1)
+        if following is None:
+            return anchor.position + RANK_GAP
+        low, high = anchor.position, following.position
+    if high - low < 2:
+        return None
+    return (low + high) // 2
+
+
+@transaction.atomic
+def move_item(item, anchor, place_before):
+    """
+    Move `item` directly before or after `anchor` by writing only its own position.
+    When the neighbouring positions leave no room, the trip is rebalanced first.
+    """
+    queryset = ChecklistItem.objects.filter(trip_id=item.trip_id).exclude(id=item.id)
+    position = _target_position(queryset, anchor, place_before)
+    if position is None:
+        rebalance_positions(item.trip_id)
+        anchor.refresh_from_db(fields=['position'])
+        position = _target_position(queryset, anchor, place_before)
+
+    item.position = position
+    item.save(update_fields=['position', 'updated_at'])
+    return item
@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from .models import ChecklistItem, ChecklistCategory
+from .models import ChecklistItem, get_checklist_category
+from .ranking import next_position
 from trips.models import TripMember, MemberStatus, Trip
 from trips.serializers import TripMemberSerializer
 
@@ -12,6 +13,12 @@ class ChecklistItemSerializer(serializers.ModelSerializer):
         fields = ['id', 'title', 'description', 'priority', 'due_date', 'position', 'is_completed', 'category', 'assigned_to', 'assigned_to_id', 'created_at', 'updated_at']
         read_only_fields = ['id','category', 'created_at', 'updated_at']
 
+    def get_trip(self):
+        """Return the trip of this checklist, cached in the serializer context"""
+        if 'trip_instance' not in self.context:
+            self.context['trip_instance'] = Trip.objects.get(id=self.context['trip_id'])
+        return self.context['trip_instance']
+
     def validate_assigned_to_id(self, value):
         if not value:
             return value    
@@ -29,14 +36,20 @@ class ChecklistItemSerializer(serializers.ModelSerializer):
         validated_data['trip_id'] = trip_id
         
         # Determine category based on due_date
-        trip = Trip.objects.get(id=trip_id)
-        due_date = validated_data.get('due_date')
-        category = ChecklistCategory.DURING_TRIP
-        if due_date:
-            if due_date < trip.start_date:
-                category = ChecklistCategory.PRE_TRIP
-            elif due_date > trip.end_date:
-                category = ChecklistCategory.POST_TRIP
-        validated_data['category'] = category
+        trip = self.get_trip()
+        validated_data['category'] = get_checklist_category(validated_data.get('due_date'), trip.start_date, trip.end_date)
+
+        # New items go to the end of the list unless a position is given
+        if 'position' not in validated_data:
+            validated_data['position'] = next_position(trip_id)
         
         return super().create(validated_data)
+
+class ChecklistMoveSerializer(serializers.Serializer):
+    before = serializers.UUIDField(required=False)
+    after = serializers.UUIDField(required=False)
+
+    def validate(self, attrs):
+        if ('before' in attrs) == ('after' in attrs):
+            raise serializers.ValidationError("Provide exactly one of 'before' or 'after'.")
+        return attrs
@@ -1,9 +1,14 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from django.core import mail
 from rest_framework.test import APIClient, APITestCase
 from rest_framework import status
 from django.contrib.auth import get_user_model
 from datetime import date, timedelta
 from django.urls import reverse
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.core.management import call_command
+from io import StringIO
 
 from .models import ChecklistItem, ChecklistCategory, ChecklistPriority
 from trips.models import Trip, TripMember, MemberRole, MemberStatus
@@ -51,3 +56,97 @@ class ChecklistAPITests(APITestCase):
         resp = self.client.get(reverse("checklist-statistics", kwargs={"trip_id": self.trip.id}))
         self.assertEqual(resp.status_code, status.HTTP_200_OK)
         self.assertIn("total_items", resp.data)
+
+    def test_bulk_create_sets_category_and_reorders(self):
+        url = reverse("checklist-item-bulk", kwargs={"trip_id": self.trip.id})
+        data = [
+            {"title": "Book hotel", "due_date": (date.today()).isoformat(), "assigned_to_id": str(self.member.id)},
+            {"title": "Write review", "due_date": (date.today() + timedelta(days=10)).isoformat(), "assigned_to_id": str(self.member.id)},
+        ]
+        resp = self.client.post(url, data, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([item["category"] for item in resp.data], [ChecklistCategory.PRE_TRIP, ChecklistCategory.POST_TRIP])
+
+        reorder = [{"id": item["id"], "position": index} for index, item in enumerate(reversed(resp.data))]
+        resp = self.client.patch(url, reorder, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(ChecklistItem.objects.get(title="Write review").position, 0)
+
+    def test_move_writes_single_position(self):
+        items = [
+            ChecklistItem.objects.create(trip=self.trip, title=f"Task {i}", assigned_to=self.member, position=(i + 1) * 1024)
+            for i in range(4)
+        ]
+        url = reverse("checklist-item-move", kwargs={"trip_id": self.trip.id, "pk": items[3].id})
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.post(url, {"before": str(items[0].id)}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(len([query for query in queries if query["sql"].startswith('UPDATE "checklist_checklistitem"')]), 1)
+        order = list(ChecklistItem.objects.filter(trip=self.trip).order_by("position").values_list("title", flat=True))
+        self.assertEqual(order, ["Task 3", "Task 0", "Task 1", "Task 2"])
+        self.assertEqual([item.position for item in ChecklistItem.objects.filter(id__in=[i.id for i in items[:3]]).order_by("position")], [1024, 2048, 3072])
+
+    def test_list_follows_moves_across_due_dates(self):
+        soon = ChecklistItem.objects.create(trip=self.trip, title="Soon", due_date=date.today(), position=1024)
+        later = ChecklistItem.objects.create(trip=self.trip, title="Later", due_date=date.today() + timedelta(days=5), position=2048)
+        resp = self.client.post(reverse("checklist-item-move", kwargs={"trip_id": self.trip.id, "pk": soon.id}), {"after": str(later.id)}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        resp = self.client.get(reverse("checklist-item-list", kwargs={"trip_id": self.trip.id}))
+        self.assertEqual([item["title"] for item in resp.data], ["Later", "Soon"])
+
+    def test_move_rebalances_when_gap_runs_out(self):
+        first = ChecklistItem.objects.create(trip=self.trip, title="First", position=1)
+        second = ChecklistItem.objects.create(trip=self.trip, title="Second", position=2)
+        third = ChecklistItem.objects.create(trip=self.trip, title="Third", position=3)
+        resp = self.client.post(reverse("checklist-item-move", kwargs={"trip_id": self.trip.id, "pk": third.id}), {"after": str(first.id)}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        order = list(ChecklistItem.objects.filter(trip=self.trip).order_by("position").values_list("id", flat=True))
+        self.assertEqual(order, [first.id, third.id, second.id])
+
+    def test_new_items_are_appended(self):
+        data = {"title": "Last", "assigned_to_id": str(self.member.id)}
+        ChecklistItem.objects.create(trip=self.trip, title="Existing", position=5000)
+        resp = self.client.post(reverse("checklist-item-list", kwargs={"trip_id": self.trip.id}), data, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(resp.data["position"], 5000 + 1024)
+
+    def test_trip_date_change_recategorizes_items(self):
+        item = ChecklistItem.objects.create(trip=self.trip, title="Museum tickets", due_date=date.today()+timedelta(days=3), category=ChecklistCategory.DURING_TRIP)
+        data = {
+            "start_date": (date.today()+timedelta(days=5)).isoformat(),
+            "end_date": (date.today()+timedelta(days=8)).isoformat(),
+        }
+        resp = self.client.patch(reverse("trip-detail", kwargs={"pk": self.trip.id}), data, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        item.refresh_from_db()
+        self.assertEqual(item.category, ChecklistCategory.PRE_TRIP)
+
+        Trip.objects.filter(id=self.trip.id).update(start_date=date.today(), end_date=date.today()+timedelta(days=1))
+        call_command("recategorize_checklist_items", stdout=StringIO())
+        item.refresh_from_db()
+        self.assertEqual(item.category, ChecklistCategory.POST_TRIP)
+
+
+@override_settings(SENDGRID_API_KEY="test-key", EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend")
+class ChecklistReminderTests(TestCase):
+    """Tests for the due-date reminder digest command"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email="remind@example.com", password="testpass123")
+        self.trip = Trip.objects.create(owner=self.user, title="Remind Trip", destination="R", start_date=date.today()+timedelta(days=2), end_date=date.today()+timedelta(days=4))
+        self.member = TripMember.objects.create(trip=self.trip, user=self.user, role=MemberRole.ORGANIZER, status=MemberStatus.ACCEPTED)
+
+    def test_one_digest_per_assignee_and_idempotent_reruns(self):
+        ChecklistItem.objects.create(trip=self.trip, title="Exchange money", due_date=date.today()+timedelta(days=1), assigned_to=self.member)
+        ChecklistItem.objects.create(trip=self.trip, title="Print tickets", due_date=date.today(), assigned_to=self.member)
+        ChecklistItem.objects.create(trip=self.trip, title="Done already", due_date=date.today(), assigned_to=self.member, is_completed=True)
+        ChecklistItem.objects.create(trip=self.trip, title="Far away", due_date=date.today()+timedelta(days=30), assigned_to=self.member)
+
+        call_command("send_checklist_reminders", stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn("Exchange money", mail.outbox[0].body)
+        self.assertIn("Print tickets", mail.outbox[0].body)
+        self.assertNotIn("Done already", mail.outbox[0].body)
+
+        call_command("send_checklist_reminders", stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 1)
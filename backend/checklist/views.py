@@ -1,13 +1,19 @@
-from rest_framework import viewsets, generics
-from .models import ChecklistItem
-from .serializers import ChecklistItemSerializer
+from rest_framework import viewsets, generics, status
+from rest_framework.decorators import action
+from .models import ChecklistItem, get_checklist_category
+from .serializers import ChecklistItemSerializer, ChecklistMoveSerializer
+from .ranking import RANK_GAP, next_position, move_item
+from backend.async_views import AsyncAPIView
 from backend.permissions import IsStatisticAccessible
+from backend.mixins import BulkModelMixin, TripRevisionMixin
 from rest_framework.response import Response
-from django.db.models import Count, Case, When
+from django.db.models import Count, Case, When, Prefetch, Q
 from django.utils import timezone
+from django.utils.functional import cached_property
+from trips.models import Trip, TripMember
 from .permissions import IsChecklistItemAccessible
 
-class ChecklistItemViewSet(viewsets.ModelViewSet):
+class ChecklistItemViewSet(TripRevisionMixin, BulkModelMixin, viewsets.ModelViewSet):
     """Checklist items for a specific trip."""
     serializer_class = ChecklistItemSerializer
     permission_classes = [IsChecklistItemAccessible]
@@ -16,36 +22,72 @@ class ChecklistItemViewSet(viewsets.ModelViewSet):
         category = self.request.query_params.get("category")
         upcoming = self.request.query_params.get("upcoming")
         trip_id = self.kwargs.get('trip_id')
-        queryset = ChecklistItem.objects.filter(trip_id=trip_id)
+        queryset = ChecklistItem.objects.filter(trip_id=trip_id).prefetch_related(
+            Prefetch('assigned_to', queryset=TripMember.objects.with_expenses())
+        )
         if category:
             queryset = queryset.filter(category=category)
         if upcoming == 'true':
             now = timezone.now()
-            queryset = queryset.filter(is_completed=False, due_date__gte=now).order_by('due_date')[:3]
-        return queryset
+            return queryset.filter(is_completed=False, due_date__gte=now).order_by('due_date')[:3]
+        # The manual order set through `move` and bulk position updates, whatever the due dates
+        return queryset.order_by('position', 'created_at')
     
     def get_serializer_context(self):
         context = super().get_serializer_context()
         context['trip_id'] = self.kwargs.get('trip_id')
         return context
 
-class ChecklistStatisticsView(generics.RetrieveAPIView):
+    def build_bulk_instance(self, validated_data):
+        instance = super().build_bulk_instance(validated_data)
+        trip = self.bulk_trip
+        instance.category = get_checklist_category(instance.due_date, trip.start_date, trip.end_date)
+        if 'position' not in validated_data:
+            instance.position = self.bulk_next_position
+            self.bulk_next_position += RANK_GAP
+        return instance
+
+    @cached_property
+    def bulk_trip(self):
+        return Trip.objects.only('start_date', 'end_date').get(id=self.kwargs.get('trip_id'))
+
+    @cached_property
+    def bulk_next_position(self):
+        return next_position(self.kwargs.get('trip_id'))
+
+    @action(detail=True, methods=['post'])
+    def move(self, request, trip_id=None, pk=None):
+        """Place the item directly before or after another item, writing only this item's position"""
+        item = self.get_object()
+        serializer = ChecklistMoveSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        anchor_id = serializer.validated_data.get('before') or serializer.validated_data.get('after')
+        anchor = ChecklistItem.objects.filter(trip_id=trip_id, id=anchor_id).exclude(id=item.id).only('id', 'position').first()
+        if not anchor:
+            return Response({"detail": "Anchor item not found."}, status=status.HTTP_400_BAD_REQUEST)
+
+        move_item(item, anchor, place_before='before' in serializer.validated_data)
+        return Response(self.get_serializer(item).data)
+
+class ChecklistStatisticsView(TripRevisionMixin, AsyncAPIView):
     """Statistics for checklist items in a trip."""
     permission_classes = [IsStatisticAccessible]
 
-    def get(self, request, trip_id=None):
-        total_items = ChecklistItem.objects.filter(trip_id=trip_id).count()
-        completed_items = ChecklistItem.objects.filter(trip_id=trip_id, is_completed=True).count()
-        
-        # list of categories with counts of total and completed items
-        category_stats = ChecklistItem.objects.filter(trip_id=trip_id).values('category').annotate(
-            total=Count('id'),
-            completed=Count(Case(When(is_completed=True, then=1)))
+    async def get(self, request, trip_id=None):
+        items = ChecklistItem.objects.filter(trip_id=trip_id)
+        counts, category_stats = await self.gather(
+            lambda: items.aggregate(total=Count('id'), completed=Count('id', filter=Q(is_completed=True))),
+            # list of categories with counts of total and completed items
+            lambda: list(items.values('category').annotate(
+                total=Count('id'),
+                completed=Count(Case(When(is_completed=True, then=1)))
+            )),
         )
 
         return Response({
-            'total_items': total_items,
-            'completed_items': completed_items,
-            'pending_items': total_items - completed_items,
+            'total_items': counts['total'],
+            'completed_items': counts['completed'],
+            'pending_items': counts['total'] - counts['completed'],
             'category_stats': category_stats,
         })
@@ -1,10 +1,13 @@
 from rest_framework import viewsets, permissions, generics
-from .models import Expense, ExpenseCategory
+from .models import Expense, ExpenseCategory, ExpenseSplit
 from .serializers import ExpenseSerializer, ExpenseCategorySerializer
+from backend.async_views import AsyncAPIView
+from backend.mixins import TripRevisionMixin
 from backend.permissions import IsStatisticAccessible
 from rest_framework.response import Response
 from django.db import models
-from trips.models import Trip
+from django.db.models import Prefetch
+from trips.models import Trip, TripMember
 from .permissions import IsExpenseAccessible
 
 class ExpenseCategoryViewSet(viewsets.ReadOnlyModelViewSet):
@@ -13,36 +16,43 @@ class ExpenseCategoryViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = ExpenseCategorySerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
-class ExpenseViewSet(viewsets.ModelViewSet):
+class ExpenseViewSet(TripRevisionMixin, viewsets.ModelViewSet):
     """Expenses for a specific trip."""
     serializer_class = ExpenseSerializer
     permission_classes = [IsExpenseAccessible]
     
     def get_queryset(self):
         trip_id = self.kwargs.get('trip_id')
-        return Expense.objects.filter(trip_id=trip_id)
+        return Expense.objects.filter(trip_id=trip_id).select_related('category').prefetch_related(
+            Prefetch('paid_by', queryset=TripMember.objects.with_expenses()),
+            Prefetch('splits', queryset=ExpenseSplit.objects.prefetch_related(
+                Prefetch('member', queryset=TripMember.objects.with_expenses())
+            )),
+        )
     
     def get_serializer_context(self):
         context = super().get_serializer_context()
         context['trip_id'] = self.kwargs.get('trip_id')
         return context
 
-class ExpenseStatisticsView(generics.RetrieveAPIView):
+class ExpenseStatisticsView(TripRevisionMixin, AsyncAPIView):
     """Statistics for expenses in a trip."""
     permission_classes = [IsStatisticAccessible]
 
-    def get(self, request, trip_id=None):
-        trip = Trip.objects.filter(id=trip_id).first()
-        
-        trip_budget = trip.budget if trip and trip.budget else 0
-        amount_spent = Expense.objects.filter(trip_id=trip_id).aggregate(total=models.Sum('amount'))['total'] or 0
-        budget_remaining = trip_budget - amount_spent
-        
-        # list of categories with counts of expenses and total amounts
-        category_stats = Expense.objects.filter(trip_id=trip_id).values('category__name', 'category__id').annotate(
-            count=models.Count('id'),
-            amount=models.Sum('amount')
+    async def get(self, request, trip_id=None):
+        expenses = Expense.objects.filter(trip_id=trip_id)
+        trip_budget, amount_spent, category_stats = await self.gather(
+            lambda: Trip.objects.filter(id=trip_id).values_list('budget', flat=True).first(),
+            lambda: expenses.aggregate(total=models.Sum('amount'))['total'],
+            # list of categories with counts of expenses and total amounts
+            lambda: list(expenses.values('category__name', 'category__id').annotate(
+                count=models.Count('id'),
+                amount=models.Sum('amount')
+            )),
         )
+        trip_budget = trip_budget or 0
+        amount_spent = amount_spent or 0
+        budget_remaining = trip_budget - amount_spent
         
         # Transform the values to have nested category object
         category_stats = [
@@ -64,4 +74,3 @@ class ExpenseStatisticsView(generics.RetrieveAPIView):
             "budget_remaining": budget_remaining,
             "category_stats": category_stats,
         })
-
@@ -0,0 +1,20 @@
+import glob
+import os
+
+# Set to `uvicorn_worker.UvicornWorker` and serve `backend.asgi:application` to run the async views natively
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'sync')
+
+
+def on_starting(server):
+    # Samples of a previous run would otherwise be summed into the new one
+    directory = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        for path in glob.glob(os.path.join(directory, '*.db')):
+            os.remove(path)
+
+
+def child_exit(server, worker):
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,134 @@
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+GEOHASH_PRECISION = 12
+
+# Geohash length used for clustering at each web map zoom level (upper bound, precision)
+ZOOM_PRECISIONS = [
+    (2, 1),
+    (4, 2),
+    (6, 3),
+    (8, 4),
+    (11, 5),
+    (13, 6),
+    (15, 7),
+]
+MAX_CLUSTER_PRECISION = 8
+# Most geohash cells used to cover a viewport; finer covers prune more rows but add OR'd ranges
+MAX_BBOX_CELLS = 16
+
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    """Encode a coordinate into a geohash string"""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    latitude, longitude = float(latitude), float(longitude)
+
+    geohash = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(geohash) < precision:
+        if even:
+            mid = (lng_range[0] + lng_range[1]) / 2
+            if longitude >= mid:
+                bits = (bits << 1) | 1
+                lng_range[0] = mid
+            else:
+                bits = bits << 1
+                lng_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if latitude >= mid:
+                bits = (bits << 1) | 1
+                lat_range[0] = mid
+            else:
+                bits = bits << 1
+                lat_range[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            geohash.append(GEOHASH_ALPHABET[bits])
+            bits = 0
+            bit_count = 0
+    return ''.join(geohash)
+
+
+def decode_geohash_bbox(geohash):
+    """Return the (min_lng, min_lat, max_lng, max_lat) bounds of a geohash cell"""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        value = GEOHASH_ALPHABET.index(char)
+        for shift in range(4, -1, -1):
+            bit = (value >> shift) & 1
+            target = lng_range if even else lat_range
+            mid = (target[0] + target[1]) / 2
+            if bit:
+                target[0] = mid
+            else:
+                target[1] = mid
+            even = not even
+    return lng_range[0], lat_range[0], lng_range[1], lat_range[1]
+
+
+def geohash_successor(prefix):
+    """The smallest string above every geohash starting with `prefix`, or None past the last cell"""
+    prefix = prefix.rstrip(GEOHASH_ALPHABET[-1])
+    if not prefix:
+        return None
+    return prefix[:-1] + GEOHASH_ALPHABET[GEOHASH_ALPHABET.index(prefix[-1]) + 1]
+
+
+def bbox_geohash_ranges(min_lng, min_lat, max_lng, max_lat, max_cells=MAX_BBOX_CELLS):
+    """
+    Cover a viewport with geohash cells and return them as merged [start, stop) string ranges, so
+    the viewport can be filtered on the geohash index. `stop` is None for a range running to the end.
+    The cover contains every point of the viewport and may contain points around it.
+    """
+    boxes = [(min_lng, max_lng)] if min_lng <= max_lng else [(min_lng, 180.0), (-180.0, max_lng)]
+    cover = None
+    for precision in range(1, GEOHASH_PRECISION + 1):
+        lng_step = 360.0 / 2 ** ((5 * precision + 1) // 2)
+        lat_step = 180.0 / 2 ** (5 * precision // 2)
+        rows = range(int((min_lat + 90) // lat_step), min(int((max_lat + 90) // lat_step), int(180 / lat_step) - 1) + 1)
+        columns = [
+            column
+            for low, high in boxes
+            for column in range(int((low + 180) // lng_step), min(int((high + 180) // lng_step), int(360 / lng_step) - 1) + 1)
+        ]
+        if cover is not None and len(rows) * len(columns) > max_cells:
+            break
+        cover = sorted({
+            encode_geohash(-90 + (row + 0.5) * lat_step, -180 + (column + 0.5) * lng_step, precision)
+            for row in rows
+            for column in columns
+        })
+
+    ranges = []
+    for cell in cover:
+        if ranges and ranges[-1][1] == cell:
+            ranges[-1][1] = geohash_successor(cell)
+        else:
+            ranges.append([cell, geohash_successor(cell)])
+    return [tuple(bounds) for bounds in ranges]
+
+
+def precision_for_zoom(zoom):
+    """Geohash length whose cells roughly match a cluster radius at the given zoom level"""
+    for max_zoom, precision in ZOOM_PRECISIONS:
+        if zoom <= max_zoom:
+            return precision
+    return MAX_CLUSTER_PRECISION
+
+
+def parse_bbox(value):
+    """Parse a `min_lng,min_lat,max_lng,max_lat` string, raising ValueError when malformed"""
+    parts = [float(part) for part in value.split(',')]
+    if len(parts) != 4:
+        raise ValueError("Expected four comma separated numbers.")
+    min_lng, min_lat, max_lng, max_lat = parts
+    if not (-90 <= min_lat <= max_lat <= 90):
+        raise ValueError("Latitudes must be within -90 and 90 with min_lat <= max_lat.")
+    if not (-180 <= min_lng <= 180 and -180 <= max_lng <= 180):
+        raise ValueError("Longitudes must be within -180 and 180.")
+    return min_lng, min_lat, max_lng, max_lat
@@ -0,0 +1,77 @@
+# Generated by Django 5.2.4 on 2026-10-19 17:46
+
+from django.db import migrations, models
+
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+
+# Frozen copy of itineraries.geo.encode_geohash as of this migration
+def encode_geohash(latitude, longitude, precision=12):
+    """Encode a coordinate into a geohash string"""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    latitude, longitude = float(latitude), float(longitude)
+
+    geohash = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(geohash) < precision:
+        if even:
+            mid = (lng_range[0] + lng_range[1]) / 2
+            if longitude >= mid:
+                bits = (bits << 1) | 1
+                lng_range[0] = mid
+            else:
+                bits = bits << 1
+                lng_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if latitude >= mid:
+                bits = (bits << 1) | 1
+                lat_range[0] = mid
+            else:
+                bits = bits << 1
+                lat_range[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            geohash.append(GEOHASH_ALPHABET[bits])
+            bits = 0
+            bit_count = 0
+    return ''.join(geohash)
+
+
+def backfill_geohash(apps, schema_editor):
+    ItineraryItem = apps.get_model('itineraries', 'ItineraryItem')
+    items = ItineraryItem.objects.filter(latitude__isnull=False, longitude__isnull=False).only('id', 'latitude', 'longitude')
+    batch = []
+    for item in items.iterator(chunk_size=1000):
+        item.geohash = encode_geohash(item.latitude, item.longitude)
+        batch.append(item)
+        if len(batch) >= 1000:
+            ItineraryItem.objects.bulk_update(batch, ['geohash'])
+            batch = []
+    if batch:
+        ItineraryItem.objects.bulk_update(batch, ['geohash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('itineraries', '0004_alter_itineraryitem_description_and_more'),
+        ('trips', '0012_alter_tripmember_options'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='itineraryitem',
+            name='geohash',
+            field=models.CharField(blank=True, editable=False, help_text='Derived from latitude/longitude for map clustering', max_length=12),
+        ),
+        migrations.AddIndex(
+            model_name='itineraryitem',
+            index=models.Index(fields=['trip', 'geohash'], name='itinerary_trip_geohash_idx'),
+        ),
+        migrations.RunPython(backfill_geohash, migrations.RunPython.noop),
+    ]
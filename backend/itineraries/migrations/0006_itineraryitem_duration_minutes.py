@@ -0,0 +1,98 @@
+# Generated by Django 5.2.4 on 2026-10-19 17:49
+
+import re
+from django.db import migrations, models
+
+# Frozen copy of itineraries.durations as of this migration
+MINUTES_PER_UNIT = {
+    'm': 1, 'min': 1, 'mins': 1, 'minute': 1, 'minutes': 1,
+    'h': 60, 'hr': 60, 'hrs': 60, 'hour': 60, 'hours': 60, 'jam': 60,
+    'd': 480, 'day': 480, 'days': 480, 'hari': 480,
+}
+
+# Phrases used in place of a number; a travel "day" is counted as eight hours of activity
+PHRASE_MINUTES = [
+    ('half day', 240),
+    ('half-day', 240),
+    ('setengah hari', 240),
+    ('full day', 480),
+    ('full-day', 480),
+    ('whole day', 480),
+    ('all day', 480),
+    ('seharian', 480),
+    ('an hour', 60),
+    ('half an hour', 30),
+    ('half hour', 30),
+]
+
+NUMBER = r'(\d+(?:[.,]\d+)?)'
+DURATION_PATTERN = re.compile(
+    NUMBER + r'(?:\s*(?:-|–|to|~|sampai)\s*' + NUMBER + r')?\s*(' + '|'.join(
+        sorted(MINUTES_PER_UNIT, key=len, reverse=True)
+    ) + r')?\b'
+)
+
+
+def _to_float(value):
+    return float(value.replace(',', '.'))
+
+
+def parse_duration_minutes(text):
+    """
+    Parse a free text estimated time such as '2-3 hours', '1h 30m' or 'Half Day' into minutes.
+    Ranges resolve to their upper bound so that possible overlaps are not missed;
+    a bare number is read as hours. Returns None when nothing can be understood.
+    """
+    if not text:
+        return None
+    value = text.strip().lower()
+
+    for phrase, minutes in sorted(PHRASE_MINUTES, key=lambda entry: len(entry[0]), reverse=True):
+        if phrase in value:
+            return minutes
+
+    total = 0.0
+    matched = False
+    for low, high, unit in DURATION_PATTERN.findall(value):
+        amount = _to_float(high) if high else _to_float(low)
+        total += amount * MINUTES_PER_UNIT.get(unit, 60)
+        matched = True
+
+    if not matched or total <= 0:
+        return None
+    return int(round(total))
+
+
+def backfill_duration_minutes(apps, schema_editor):
+    ItineraryItem = apps.get_model('itineraries', 'ItineraryItem')
+    items = ItineraryItem.objects.exclude(estimated_time__isnull=True).exclude(estimated_time='').only('id', 'estimated_time')
+    batch = []
+    for item in items.iterator(chunk_size=1000):
+        item.duration_minutes = parse_duration_minutes(item.estimated_time)
+        batch.append(item)
+        if len(batch) >= 1000:
+            ItineraryItem.objects.bulk_update(batch, ['duration_minutes'])
+            batch = []
+    if batch:
+        ItineraryItem.objects.bulk_update(batch, ['duration_minutes'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('itineraries', '0005_itineraryitem_geohash'),
+        ('trips', '0012_alter_tripmember_options'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='itineraryitem',
+            name='duration_minutes',
+            field=models.PositiveIntegerField(blank=True, editable=False, help_text='Parsed from estimated_time', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='itineraryitem',
+            index=models.Index(fields=['trip', 'visit_time'], name='itinerary_trip_visit_time_idx'),
+        ),
+        migrations.RunPython(backfill_duration_minutes, migrations.RunPython.noop),
+    ]
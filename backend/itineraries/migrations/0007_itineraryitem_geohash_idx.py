@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 19:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('itineraries', '0006_itineraryitem_duration_minutes'),
+        ('trips', '0013_trip_revision'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='itineraryitem',
+            index=models.Index(fields=['geohash'], name='itinerary_geohash_idx'),
+        ),
+    ]
@@ -1,6 +1,8 @@
 from django.db import models
 from backend.models import BaseModel
 from trips.models import Trip
+from .geo import encode_geohash
+from .durations import parse_duration_minutes
 
 class ItineraryType(BaseModel):
     """Types for itinerary locations (e.g., Nature, Beach)"""
@@ -30,10 +32,42 @@ class ItineraryItem(BaseModel):
     notes = models.TextField(blank=True, max_length=2000)
     status = models.CharField(max_length=10, choices=ItineraryStatus.choices, default=ItineraryStatus.PLANNED)
     trip = models.ForeignKey(Trip, on_delete=models.CASCADE, related_name='itinerary_items')
+    duration_minutes = models.PositiveIntegerField(null=True, blank=True, editable=False, help_text="Parsed from estimated_time")
+    geohash = models.CharField(max_length=12, blank=True, editable=False, help_text="Derived from latitude/longitude for map clustering")
     
     
     def __str__(self):
         return f"{self.visit_time} - {self.name}"
+
+    def update_geohash(self):
+        """Recompute the geohash from the coordinates"""
+        if self.latitude is None or self.longitude is None:
+            self.geohash = ''
+        else:
+            self.geohash = encode_geohash(self.latitude, self.longitude)
+
+    def update_duration(self):
+        """Recompute the duration in minutes from the free text estimated time"""
+        self.duration_minutes = parse_duration_minutes(self.estimated_time)
+
+    def save(self, *args, **kwargs):
+        self.update_geohash()
+        self.update_duration()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if 'latitude' in update_fields or 'longitude' in update_fields:
+                update_fields.add('geohash')
+            if 'estimated_time' in update_fields:
+                update_fields.add('duration_minutes')
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
     
     class Meta:
         ordering = ['visit_time']
+        indexes = [
+            models.Index(fields=['trip', 'geohash'], name='itinerary_trip_geohash_idx'),
+            # Viewport ranges of the map across all public trips
+            models.Index(fields=['geohash'], name='itinerary_geohash_idx'),
+            models.Index(fields=['trip', 'visit_time'], name='itinerary_trip_visit_time_idx'),
+        ]
@@ -0,0 +1,71 @@
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_matrix(latitudes, longitudes):
+    """Pairwise great-circle distances in kilometres between coordinates"""
+    lat = np.radians(np.asarray(latitudes, dtype=float))
+    lng = np.radians(np.asarray(longitudes, dtype=float))
+    dlat = lat[:, None] - lat[None, :]
+    dlng = lng[:, None] - lng[None, :]
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat)[:, None] * np.cos(lat)[None, :] * np.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def route_distance(route, matrix):
+    """Total length of an open route"""
+    route = np.asarray(route)
+    if len(route) < 2:
+        return 0.0
+    return float(matrix[route[:-1], route[1:]].sum())
+
+
+def nearest_neighbour_route(matrix, start=0):
+    """Greedy open route that always moves to the closest unvisited stop"""
+    size = len(matrix)
+    visited = np.zeros(size, dtype=bool)
+    route = [start]
+    visited[start] = True
+    for _ in range(size - 1):
+        distances = np.where(visited, np.inf, matrix[route[-1]])
+        next_stop = int(np.argmin(distances))
+        route.append(next_stop)
+        visited[next_stop] = True
+    return route
+
+
+def two_opt(route, matrix, max_passes=100):
+    """
+    Improve an open route by reversing segments while that shortens it.
+    The first stop stays fixed; for each segment start every candidate end is evaluated at once.
+    """
+    size = len(route)
+    if size < 4:
+        return list(route)
+
+    # An extra zero-distance stop after the last one turns the open route into a closed one for the delta formula
+    padded = np.zeros((size + 1, size + 1))
+    padded[:size, :size] = matrix
+    route = np.append(np.asarray(route), size)
+
+    for _ in range(max_passes):
+        improved = False
+        for i in range(1, size - 1):
+            a, b = route[i - 1], route[i]
+            c = route[i + 1:size]
+            d = route[i + 2:size + 1]
+            delta = padded[a, c] + padded[b, d] - padded[a, b] - padded[c, d]
+            j = int(np.argmin(delta))
+            if delta[j] < -1e-9:
+                end = i + 1 + j
+                route[i:end + 1] = route[i:end + 1][::-1]
+                improved = True
+        if not improved:
+            break
+    return [int(stop) for stop in route[:size]]
+
+
+def optimize_route(matrix, start=0):
+    """Nearest neighbour construction followed by 2-opt improvement"""
+    return two_opt(nearest_neighbour_route(matrix, start), matrix)
@@ -0,0 +1,40 @@
+import heapq
+from datetime import timedelta
+
+
+def sweep_schedule(stops):
+    """
+    Find overlapping and free time between stops in a single pass.
+
+    `stops` are dicts with `id`, `start` and `duration_minutes`, sorted by `start`.
+    Each stop occupies `[start, start + duration)`, so stops without a duration never conflict.
+    A heap of active end times keeps the sweep at O(n log n) plus the number of reported pairs. Gaps are only reported between stops of the same day.
+    Returns a `(conflicts, gaps)` tuple.
+    """
+    conflicts = []
+    gaps = []
+    active = []  # heap of (end, sequence, stop)
+    latest_end = None
+    latest_stop = None
+
+    for sequence, stop in enumerate(stops):
+        start = stop['start']
+        end = start + timedelta(minutes=stop['duration_minutes'] or 0)
+
+        while active and active[0][0] <= start:
+            heapq.heappop(active)
+
+        if end > start:
+            for other_end, _, other in active:
+                conflicts.append((other, stop, min(other_end, end) - start))
+
+        if latest_end is not None and start > latest_end and start.date() == latest_end.date():
+            gaps.append((latest_stop, stop, latest_end, start))
+
+        if end > start:
+            heapq.heappush(active, (end, sequence, stop))
+        if latest_end is None or end > latest_end:
+            latest_end = end
+            latest_stop = stop
+
+    return conflicts, gaps
@@ -22,15 +22,21 @@ class ItineraryItemSerializer(serializers.ModelSerializer):
             'latitude',
             'longitude',
             'estimated_time',
+            'duration_minutes',
             'visit_time',
             'notes',
             'status',
             'type_id'
         ]
     
+    def get_trip(self):
+        """Trip lookup shared through the serializer context, so a batch loads it only once"""
+        if 'trip_instance' not in self.context:
+            self.context['trip_instance'] = Trip.objects.get(id=self.context['trip_id'])
+        return self.context['trip_instance']
+
     def validate_visit_time(self, value):
-        trip_id = self.context['trip_id']
-        trip = Trip.objects.get(id=trip_id)
+        trip = self.get_trip()
         if value and (value.date() < trip.start_date or value.date() > trip.end_date):
             raise serializers.ValidationError("Visit time must be within the trip's start and end dates.")
         return value
@@ -2,7 +2,7 @@ from django.test import TestCase
 from rest_framework.test import APIClient, APITestCase
 from rest_framework import status
 from django.contrib.auth import get_user_model
-from datetime import timedelta, date
+from datetime import timedelta, date, datetime, time
 from django.urls import reverse
 from django.utils import timezone
 
@@ -58,3 +58,111 @@ class ItineraryAPITests(APITestCase):
         self.assertEqual(resp.status_code, status.HTTP_200_OK)
         self.assertIn("total", resp.data)
         self.assertIn("visited", resp.data)
+
+    def test_bulk_create_update_delete(self):
+        url = reverse("itinerary-item-bulk", kwargs={"trip_id": self.trip.id})
+        visit_time = (timezone.now() + timedelta(days=6)).isoformat()
+        data = [
+            {"name": f"Stop {i}", "type_id": str(self.it_type.id), "visit_time": visit_time}
+            for i in range(3)
+        ]
+        resp = self.client.post(url, data, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(ItineraryItem.objects.filter(trip=self.trip).count(), 3)
+
+        ids = [item["id"] for item in resp.data]
+        resp = self.client.patch(url, [{"id": item_id, "status": ItineraryStatus.VISITED} for item_id in ids], format="json")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(ItineraryItem.objects.filter(trip=self.trip, status=ItineraryStatus.VISITED).count(), 3)
+
+        resp = self.client.delete(url, ids[:2], format="json")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual([item["status"] for item in resp.data], ["deleted", "deleted"])
+        self.assertEqual(ItineraryItem.objects.filter(trip=self.trip).count(), 1)
+
+    def test_bulk_create_rejects_whole_batch_on_invalid_item(self):
+        url = reverse("itinerary-item-bulk", kwargs={"trip_id": self.trip.id})
+        data = [
+            {"name": "Valid", "type_id": str(self.it_type.id)},
+            {"type_id": str(self.it_type.id)},
+        ]
+        resp = self.client.post(url, data, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(resp.data[0], {})
+        self.assertIn("name", resp.data[1])
+        self.assertFalse(ItineraryItem.objects.filter(trip=self.trip).exists())
+
+    def test_geohash_maintained_on_save(self):
+        item = ItineraryItem.objects.create(trip=self.trip, name="Tanah Lot", type=self.it_type, latitude="-8.621213", longitude="115.086807")
+        self.assertEqual(len(item.geohash), 12)
+        self.assertTrue(item.geohash.startswith("qw"))
+        item.latitude = None
+        item.save()
+        self.assertEqual(item.geohash, "")
+
+    def test_geo_clusters_points_by_zoom_and_bbox(self):
+        # Three points close together in Ubud and one in Jakarta
+        for lat, lng in [("-8.5069", "115.2625"), ("-8.5071", "115.2630"), ("-8.5080", "115.2610"), ("-6.2000", "106.8166")]:
+            item = ItineraryItem.objects.create(trip=self.trip, name="Stop", type=self.it_type, latitude=lat, longitude=lng)
+        url = reverse("itinerary-geo", kwargs={"trip_id": self.trip.id})
+
+        resp = self.client.get(url, {"zoom": 8})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual([cluster["count"] for cluster in resp.data["clusters"]], [3])
+        self.assertEqual([(point["id"], point["trip_id"]) for point in resp.data["points"]], [(item.id, self.trip.id)])
+
+        # A viewport around Jakarta only, and one crossing the antimeridian that holds nothing
+        resp = self.client.get(url, {"zoom": 8, "bbox": "106.5,-6.5,107,-6"})
+        self.assertEqual((resp.data["clusters"], len(resp.data["points"])), ([], 1))
+        resp = self.client.get(url, {"zoom": 8, "bbox": "170,-10,-170,10"})
+        self.assertEqual((resp.data["clusters"], resp.data["points"]), ([], []))
+
+        resp = self.client.get(url, {"zoom": 8, "bbox": "114,-9,116,-8"})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(resp.data["clusters"]), 1)
+        self.assertEqual(resp.data["points"], [])
+
+        resp = self.client.get(url, {"bbox": "not,a,bbox"})
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_optimize_route_for_day(self):
+        day = self.trip.start_date + timedelta(days=1)
+        base = timezone.make_aware(datetime.combine(day, time.min)) + timedelta(hours=8)
+        # Visiting west-east-west-east along a line; the optimized order walks it once
+        longitudes = ["115.10", "115.40", "115.20", "115.30"]
+        for hour, longitude in enumerate(longitudes):
+            ItineraryItem.objects.create(
+                trip=self.trip, name=f"Stop {longitude}", type=self.it_type,
+                latitude="-8.500000", longitude=longitude, visit_time=base + timedelta(hours=hour),
+            )
+        resp = self.client.get(reverse("itinerary-optimize", kwargs={"trip_id": self.trip.id}), {"date": day.isoformat()})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual([stop["longitude"] for stop in resp.data["stops"]], [115.1, 115.2, 115.3, 115.4])
+        self.assertEqual(resp.data["stops"][0]["visit_time"], base)
+        self.assertGreater(resp.data["distance_saved_km"], 0)
+
+        resp = self.client.get(reverse("itinerary-optimize", kwargs={"trip_id": self.trip.id}))
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_duration_parsed_on_save(self):
+        item = ItineraryItem.objects.create(trip=self.trip, name="Rafting", type=self.it_type, estimated_time="2-3 hours")
+        self.assertEqual(item.duration_minutes, 180)
+        item.estimated_time = "Half Day"
+        item.save(update_fields=["estimated_time"])
+        item.refresh_from_db()
+        self.assertEqual(item.duration_minutes, 240)
+
+    def test_schedule_conflicts_and_gaps(self):
+        day = self.trip.start_date + timedelta(days=1)
+        base = timezone.make_aware(datetime.combine(day, time.min)) + timedelta(hours=8)
+        first = ItineraryItem.objects.create(trip=self.trip, name="Temple", type=self.it_type, estimated_time="2 hours", visit_time=base)
+        second = ItineraryItem.objects.create(trip=self.trip, name="Lunch", type=self.it_type, estimated_time="1 hour", visit_time=base + timedelta(hours=1, minutes=30))
+        ItineraryItem.objects.create(trip=self.trip, name="Beach", type=self.it_type, estimated_time="3 hours", visit_time=base + timedelta(hours=5))
+
+        resp = self.client.get(reverse("itinerary-conflicts", kwargs={"trip_id": self.trip.id}))
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(resp.data["conflicts"]), 1)
+        conflict = resp.data["conflicts"][0]
+        self.assertEqual((conflict["first"]["id"], conflict["second"]["id"]), (first.id, second.id))
+        self.assertEqual(conflict["overlap_minutes"], 30)
+        self.assertEqual([gap["minutes"] for gap in resp.data["gaps"]], [150])
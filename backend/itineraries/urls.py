@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ItineraryTypeViewSet, ItineraryItemViewSet, ItineraryItemStatisticsView, ItineraryOrganizedListViewSet
+from .views import ItineraryTypeViewSet, ItineraryItemViewSet, ItineraryItemStatisticsView, ItineraryOrganizedListViewSet, ItineraryGeoClusterView, ItineraryRouteOptimizeView, ItineraryConflictsView
 
 router = DefaultRouter()
 router.register(r'itineraries/types', ItineraryTypeViewSet, basename='itinerary-type')
@@ -10,7 +10,11 @@ trip_router.register(r'items', ItineraryItemViewSet, basename='itinerary-item')
 trip_router.register(r'organized', ItineraryOrganizedListViewSet, basename='itinerary-organized')
 
 urlpatterns = [
+    path('itineraries/geo/', ItineraryGeoClusterView.as_view(), name='itinerary-geo-public'),
     path('', include(router.urls)),
     path('trips/<uuid:trip_id>/itineraries/', include(trip_router.urls)),
     path('trips/<uuid:trip_id>/itineraries/statistics/', ItineraryItemStatisticsView.as_view(), name='itinerary-statistics'),
+    path('trips/<uuid:trip_id>/itineraries/geo/', ItineraryGeoClusterView.as_view(), name='itinerary-geo'),
+    path('trips/<uuid:trip_id>/itineraries/optimize/', ItineraryRouteOptimizeView.as_view(), name='itinerary-optimize'),
+    path('trips/<uuid:trip_id>/itineraries/conflicts/', ItineraryConflictsView.as_view(), name='itinerary-conflicts'),
 ]
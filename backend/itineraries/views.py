@@ -1,9 +1,25 @@
-from rest_framework import viewsets, permissions, generics
+import hashlib
+import uuid
+from datetime import timedelta
+from rest_framework import viewsets, permissions, generics, status
 from rest_framework.response import Response
+from django.db.models import Avg, CharField, Count, Min, Q
+from django.db.models.functions import Cast, Substr
+from django.core.cache import cache
+from django.utils.dateparse import parse_date
+from trips.models import TripStatus
+from backend.async_views import AsyncAPIView
 from backend.permissions import IsStatisticAccessible
-from .models import ItineraryType, ItineraryItem
+from backend.mixins import BulkModelMixin, TripRevisionMixin
+from .models import ItineraryType, ItineraryItem, ItineraryStatus
 from .serializers import ItineraryTypeSerializer, ItineraryItemSerializer
 from .permissions import IsItineraryItemAccessible
+from .geo import precision_for_zoom, parse_bbox, decode_geohash_bbox, bbox_geohash_ranges
+from .routing import haversine_matrix, optimize_route, route_distance
+from .schedule import sweep_schedule
+
+DEFAULT_CLUSTER_ZOOM = 12
+DISTANCE_MATRIX_CACHE_TIMEOUT = 60 * 60 * 24
 
 class ItineraryTypeViewSet(viewsets.ReadOnlyModelViewSet):
     """Itinerary types."""
@@ -11,7 +27,7 @@ class ItineraryTypeViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = ItineraryTypeSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     
-class ItineraryItemViewSet(viewsets.ModelViewSet):
+class ItineraryItemViewSet(TripRevisionMixin, BulkModelMixin, viewsets.ModelViewSet):
     """Itinerary items for a specific trip."""
     serializer_class = ItineraryItemSerializer
     permission_classes = [IsItineraryItemAccessible]
@@ -20,7 +36,7 @@ class ItineraryItemViewSet(viewsets.ModelViewSet):
         type_id = self.request.query_params.get("type_id")
         status = self.request.query_params.get("status")
         trip_id = self.kwargs.get('trip_id')
-        queryset = ItineraryItem.objects.filter(trip_id=trip_id)
+        queryset = ItineraryItem.objects.filter(trip_id=trip_id).select_related('type')
         if type_id:
             queryset = queryset.filter(type_id=type_id)
         if status:
@@ -31,29 +47,248 @@ class ItineraryItemViewSet(viewsets.ModelViewSet):
         context = super().get_serializer_context()
         context['trip_id'] = self.kwargs.get('trip_id')
         return context
+
+    def build_bulk_instance(self, validated_data):
+        instance = super().build_bulk_instance(validated_data)
+        instance.update_geohash()
+        instance.update_duration()
+        return instance
+
+    def prepare_bulk_update(self, instance, update_fields):
+        if 'latitude' in update_fields or 'longitude' in update_fields:
+            instance.update_geohash()
+            update_fields.add('geohash')
+        if 'estimated_time' in update_fields:
+            instance.update_duration()
+            update_fields.add('duration_minutes')
     
-class ItineraryOrganizedListViewSet(viewsets.ViewSet):
+class ItineraryOrganizedListViewSet(TripRevisionMixin, viewsets.ViewSet):
     """Itinerary items desc sorted by visit_time & only not skipped items."""
     permission_classes = [IsItineraryItemAccessible]
 
     def list(self, request, trip_id=None):
-        items = ItineraryItem.objects.filter(trip_id=trip_id).exclude(status='SKIPPED').order_by('-visit_time')
+        items = ItineraryItem.objects.filter(trip_id=trip_id).exclude(status='SKIPPED').select_related('type').order_by('-visit_time')
         serializer = ItineraryItemSerializer(items, many=True)
         return Response(serializer.data)
 
-class ItineraryItemStatisticsView(generics.RetrieveAPIView):
+class ItineraryItemStatisticsView(TripRevisionMixin, AsyncAPIView):
     """Statistics for itinerary items in a trip."""
     permission_classes = [IsStatisticAccessible]
 
+    async def get(self, request, trip_id=None):
+        # One pass over the trip's items instead of a count per status
+        counts = await ItineraryItem.objects.filter(trip_id=trip_id).aaggregate(
+            total=Count('id'),
+            visited=Count('id', filter=Q(status=ItineraryStatus.VISITED)),
+            planned=Count('id', filter=Q(status=ItineraryStatus.PLANNED)),
+            skipped=Count('id', filter=Q(status=ItineraryStatus.SKIPPED)),
+        )
+
+        return Response({
+            "total": counts['total'],
+            "visited": counts['visited'],
+            "planned": counts['planned'],
+            "skipped": counts['skipped']
+        })
+
+class ItineraryGeoClusterView(TripRevisionMixin, generics.RetrieveAPIView):
+    """
+    Clustered itinerary map points for a viewport.
+    Points are grouped by geohash prefix, whose length follows the zoom level.
+    Without a trip, points of all public trips are clustered.
+    """
+
+    def get_permissions(self):
+        if self.kwargs.get('trip_id'):
+            return [IsStatisticAccessible()]
+        return []
+
+    def get(self, request, trip_id=None):
+        try:
+            zoom = int(request.query_params.get('zoom', DEFAULT_CLUSTER_ZOOM))
+        except ValueError:
+            return Response({"detail": "zoom must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+        precision = precision_for_zoom(zoom)
+
+        if trip_id:
+            items = ItineraryItem.objects.filter(trip_id=trip_id)
+        else:
+            items = ItineraryItem.objects.filter(trip__is_public=True).exclude(
+                trip__status__in=[TripStatus.DELETED, TripStatus.CANCELLED]
+            )
+        items = items.exclude(geohash='')
+
+        bbox = request.query_params.get('bbox')
+        if bbox:
+            try:
+                min_lng, min_lat, max_lng, max_lat = parse_bbox(bbox)
+            except ValueError as e:
+                return Response({"detail": f"Invalid bbox: {e}"}, status=status.HTTP_400_BAD_REQUEST)
+            # The geohash ranges let the index prune the rows; the coordinates trim the cover to the viewport
+            in_cover = Q()
+            for start, stop in bbox_geohash_ranges(min_lng, min_lat, max_lng, max_lat):
+                in_cover |= Q(geohash__gte=start, geohash__lt=stop) if stop else Q(geohash__gte=start)
+            items = items.filter(in_cover, latitude__gte=min_lat, latitude__lte=max_lat)
+            if min_lng <= max_lng:
+                items = items.filter(longitude__gte=min_lng, longitude__lte=max_lng)
+            else:
+                # Viewport crossing the antimeridian
+                items = items.filter(Q(longitude__gte=min_lng) | Q(longitude__lte=max_lng))
+
+        # For a cell holding one item, the Min aggregates are that item's own fields.
+        # The ids are compared as text because PostgreSQL has no min(uuid).
+        cells = items.annotate(cell=Substr('geohash', 1, precision)).values('cell').annotate(
+            count=Count('id'),
+            latitude=Avg('latitude'),
+            longitude=Avg('longitude'),
+            item_id=Min(Cast('id', CharField())),
+            item_trip_id=Min(Cast('trip_id', CharField())),
+            name=Min('name'),
+            item_status=Min('status'),
+        ).order_by('cell')
+
+        clusters = []
+        points = []
+        for cell in cells:
+            if cell['count'] == 1:
+                points.append({
+                    'id': uuid.UUID(cell['item_id']),
+                    'trip_id': uuid.UUID(cell['item_trip_id']),
+                    'name': cell['name'],
+                    'status': cell['item_status'],
+                    'latitude': float(cell['latitude']),
+                    'longitude': float(cell['longitude']),
+                })
+                continue
+            clusters.append({
+                'geohash': cell['cell'],
+                'count': cell['count'],
+                'latitude': float(cell['latitude']),
+                'longitude': float(cell['longitude']),
+                'bbox': decode_geohash_bbox(cell['cell']),
+            })
+
+        return Response({
+            "zoom": zoom,
+            "precision": precision,
+            "clusters": clusters,
+            "points": points,
+        })
+
+class ItineraryRouteOptimizeView(TripRevisionMixin, generics.RetrieveAPIView):
+    """
+    Proposed visiting order for one day of a trip.
+    Stops with coordinates are ordered with a nearest neighbour + 2-opt heuristic starting from the
+    earliest stop, and the day's existing visit times are reassigned in the new order.
+    """
+    permission_classes = [IsStatisticAccessible]
+
     def get(self, request, trip_id=None):
-        total = ItineraryItem.objects.filter(trip_id=trip_id).count()
-        visited = ItineraryItem.objects.filter(trip_id=trip_id, status='VISITED').count()
-        planned = ItineraryItem.objects.filter(trip_id=trip_id, status='PLANNED').count()
-        skipped = ItineraryItem.objects.filter(trip_id=trip_id, status='SKIPPED').count()
+        day = parse_date(request.query_params.get('date') or '')
+        if day is None:
+            return Response({"detail": "A valid date (YYYY-MM-DD) is required."}, status=status.HTTP_400_BAD_REQUEST)
+
+        items = list(
+            ItineraryItem.objects.filter(trip_id=trip_id, visit_time__date=day)
+            .exclude(status=ItineraryStatus.SKIPPED)
+            .order_by('visit_time')
+            .values('id', 'name', 'latitude', 'longitude', 'visit_time')
+        )
+        stops = [item for item in items if item['latitude'] is not None and item['longitude'] is not None]
+        unrouted = [item['id'] for item in items if item['latitude'] is None or item['longitude'] is None]
+
+        matrix = self.get_distance_matrix(trip_id, day, stops)
+        original = list(range(len(stops)))
+        route = optimize_route(matrix) if stops else []
+        original_distance = route_distance(original, matrix)
+        optimized_distance = route_distance(route, matrix)
+
+        visit_times = [stop['visit_time'] for stop in stops]
+        proposed = []
+        for position, index in enumerate(route):
+            stop = stops[index]
+            previous = route[position - 1] if position else None
+            proposed.append({
+                'id': stop['id'],
+                'name': stop['name'],
+                'latitude': float(stop['latitude']),
+                'longitude': float(stop['longitude']),
+                'original_visit_time': stop['visit_time'],
+                'visit_time': visit_times[position],
+                'leg_distance_km': round(float(matrix[previous, index]), 3) if previous is not None else 0.0,
+            })
+
+        return Response({
+            "date": day,
+            "stops": proposed,
+            "unrouted": unrouted,
+            "original_distance_km": round(original_distance, 3),
+            "optimized_distance_km": round(optimized_distance, 3),
+            "distance_saved_km": round(original_distance - optimized_distance, 3),
+        })
+
+    def get_distance_matrix(self, trip_id, day, stops):
+        """Distance matrix of a day's stops, cached under a key that changes with any stop or coordinate"""
+        revision = hashlib.sha1('|'.join(
+            f"{stop['id']}:{stop['latitude']}:{stop['longitude']}" for stop in stops
+        ).encode()).hexdigest()
+        cache_key = f'itinerary-distance-matrix:{trip_id}:{day.isoformat()}:{revision}'
+        matrix = cache.get(cache_key)
+        if matrix is None:
+            matrix = haversine_matrix(
+                [stop['latitude'] for stop in stops],
+                [stop['longitude'] for stop in stops],
+            )
+            cache.set(cache_key, matrix, DISTANCE_MATRIX_CACHE_TIMEOUT)
+        return matrix
+
+class ItineraryConflictsView(TripRevisionMixin, generics.RetrieveAPIView):
+    """Overlapping stops and free time between stops of a trip, optionally limited to one date."""
+    permission_classes = [IsStatisticAccessible]
+
+    def get(self, request, trip_id=None):
+        items = ItineraryItem.objects.filter(trip_id=trip_id, visit_time__isnull=False).exclude(status=ItineraryStatus.SKIPPED)
+
+        date = request.query_params.get('date')
+        if date:
+            day = parse_date(date)
+            if day is None:
+                return Response({"detail": "date must be formatted as YYYY-MM-DD."}, status=status.HTTP_400_BAD_REQUEST)
+            items = items.filter(visit_time__date=day)
+
+        stops = [
+            {
+                'id': item['id'],
+                'name': item['name'],
+                'start': item['visit_time'],
+                'duration_minutes': item['duration_minutes'],
+            }
+            for item in items.order_by('visit_time').values('id', 'name', 'visit_time', 'duration_minutes')
+        ]
+        conflicts, gaps = sweep_schedule(stops)
+
+        def describe(stop):
+            end = stop['start'] + timedelta(minutes=stop['duration_minutes'] or 0)
+            return {'id': stop['id'], 'name': stop['name'], 'start': stop['start'], 'end': end}
 
         return Response({
-            "total": total,
-            "visited": visited,
-            "planned": planned,
-            "skipped": skipped
+            "conflicts": [
+                {
+                    'first': describe(first),
+                    'second': describe(second),
+                    'overlap_minutes': int(overlap.total_seconds() // 60),
+                }
+                for first, second, overlap in conflicts
+            ],
+            "gaps": [
+                {
+                    'after_id': before['id'],
+                    'before_id': after['id'],
+                    'start': start,
+                    'end': end,
+                    'minutes': int((end - start).total_seconds() // 60),
+                }
+                for before, after, start, end in gaps
+            ],
+            "unknown_duration": [stop['id'] for stop in stops if not stop['duration_minutes']],
         })
@@ -0,0 +1,9 @@
+from django.contrib import admin
+from django.apps import apps
+
+models = apps.get_app_config('notifications').get_models()
+for model in models:
+    try:
+        admin.site.register(model)
+    except admin.sites.AlreadyRegistered:
+        pass
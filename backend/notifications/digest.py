@@ -0,0 +1,84 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Min
+from django.utils import timezone
+from backend.services import send_templated_emails
+from .models import NotificationEvent
+
+
+def queue_notification(recipient, trip, template_name, subject, context=None, actor=None):
+    """
+    Record a notification for the next digest instead of emailing it right away.
+    `context` holds the extra JSON-serializable template variables, such as links.
+    """
+    if not settings.SENDGRID_API_KEY:
+        return None  # Email sending is disabled
+    return NotificationEvent.objects.create(
+        recipient=recipient, actor=actor, trip=trip,
+        template_name=template_name, subject=subject, context=context or {},
+    )
+
+
+def event_email(event):
+    """The original single-event email, rendered from the event's own template"""
+    return {
+        'recipient_email': event.recipient.email,
+        'subject': event.subject,
+        'template_name': event.template_name,
+        'context': {
+            'user': event.recipient,
+            'owner': event.recipient,
+            'requester': event.actor,
+            'trip': event.trip,
+            **event.context,
+        },
+    }
+
+
+def digest_email(recipient, events):
+    return {
+        'recipient_email': recipient.email,
+        'subject': f"{len(events)} updates on your Jelajah trips",
+        'template_name': 'notification_digest',
+        'context': {
+            'user': recipient,
+            'events': events,
+            'login_url': settings.FRONTEND_URL + '/login?redirect=/trips/my',
+        },
+    }
+
+
+@transaction.atomic
+def queue_due_digests(window):
+    """
+    Collapse the pending events of every recipient whose oldest event is older than `window`
+    into one email, queued in the outbox. A lone event keeps its original email.
+    Returns `(emails, events)` counts.
+    """
+    cutoff = timezone.now() - window
+    recipient_ids = (
+        NotificationEvent.objects.filter(digested_at__isnull=True)
+        .values('recipient_id')
+        .annotate(first_event=Min('created_at'))
+        .filter(first_event__lte=cutoff)
+        .values_list('recipient_id', flat=True)
+    )
+    events = list(
+        NotificationEvent.objects.select_for_update(of=('self',))
+        .filter(digested_at__isnull=True, recipient_id__in=list(recipient_ids))
+        .select_related('recipient', 'actor', 'trip')
+        .order_by('recipient_id', 'created_at')
+    )
+    if not events:
+        return 0, 0
+
+    by_recipient = {}
+    for event in events:
+        by_recipient.setdefault(event.recipient_id, []).append(event)
+
+    send_templated_emails([
+        event_email(grouped[0]) if len(grouped) == 1 else digest_email(grouped[0].recipient, grouped)
+        for grouped in by_recipient.values()
+    ])
+    NotificationEvent.objects.filter(id__in=[event.id for event in events]).update(digested_at=timezone.now())
+    return len(by_recipient), len(events)
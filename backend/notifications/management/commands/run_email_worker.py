@@ -0,0 +1,34 @@
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from notifications.outbox import deliver_due_emails, purge_sent_emails
+
+
+class Command(BaseCommand):
+    help = "Deliver queued outbox emails in batches, retrying failures with exponential backoff."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50, help="Emails claimed and sent per batch")
+        parser.add_argument('--max-attempts', type=int, default=5, help="Attempts before an email is marked failed")
+        parser.add_argument('--poll-interval', type=float, default=5.0, help="Seconds to wait when the outbox is empty")
+        parser.add_argument('--keep-sent-days', type=int, default=7, help="Delete sent emails older than this")
+        parser.add_argument('--once', action='store_true', help="Drain the due emails and exit instead of polling")
+
+    def handle(self, *args, **options):
+        purged = purge_sent_emails(timedelta(days=options['keep_sent_days']))
+        if purged:
+            self.stdout.write(f"Purged {purged} sent email(s).")
+
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = deliver_due_emails(options['batch_size'], options['max_attempts'])
+            total_sent += sent
+            total_failed += failed
+            if sent or failed:
+                self.stdout.write(f"Sent {sent} email(s), {failed} failed.")
+                continue
+            if options['once']:
+                break
+            time.sleep(options['poll_interval'])
+
+        self.stdout.write(self.style.SUCCESS(f"Done: {total_sent} sent, {total_failed} failed."))
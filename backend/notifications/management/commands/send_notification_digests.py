@@ -0,0 +1,14 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from notifications.digest import queue_due_digests
+
+
+class Command(BaseCommand):
+    help = "Coalesce pending notifications into one email per recipient and queue them for delivery. Run from cron."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--window', type=int, default=15, help="Minutes to collect notifications before sending")
+
+    def handle(self, *args, **options):
+        emails, events = queue_due_digests(timedelta(minutes=options['window']))
+        self.stdout.write(self.style.SUCCESS(f"Queued {emails} email(s) for {events} notification(s)."))
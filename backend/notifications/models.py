@@ -0,0 +1,61 @@
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+from backend.models import BaseModel
+
+
+class OutboxStatus(models.TextChoices):
+    PENDING = 'PENDING', 'Pending'
+    SENDING = 'SENDING', 'Sending'
+    SENT = 'SENT', 'Sent'
+    FAILED = 'FAILED', 'Failed'
+
+
+class EmailOutbox(BaseModel):
+    """A rendered email waiting to be delivered by the `run_email_worker` command"""
+    recipient = models.EmailField(max_length=255)
+    from_email = models.CharField(max_length=255, blank=True)
+    subject = models.CharField(max_length=255)
+    body_text = models.TextField()
+    body_html = models.TextField(blank=True)
+    status = models.CharField(max_length=10, choices=OutboxStatus.choices, default=OutboxStatus.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.recipient} - {self.subject} ({self.status})"
+
+    class Meta:
+        ordering = ['next_attempt_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_status_due_idx'),
+        ]
+
+
+class NotificationEvent(BaseModel):
+    """
+    A notification waiting to be coalesced with others for the same recipient
+    by the `send_notification_digests` command.
+    """
+    recipient = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='notification_events')
+    actor = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    trip = models.ForeignKey('trips.Trip', on_delete=models.CASCADE, related_name='notification_events')
+    template_name = models.CharField(max_length=100)
+    subject = models.CharField(max_length=255)
+    context = models.JSONField(default=dict, blank=True)
+    digested_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.recipient} - {self.subject}"
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(
+                fields=['recipient', 'created_at'],
+                name='notification_pending_idx',
+                condition=models.Q(digested_at__isnull=True),
+            ),
+        ]
@@ -0,0 +1,94 @@
+from datetime import timedelta
+from django.core.mail import EmailMultiAlternatives
+from django.db import transaction
+from django.utils import timezone
+from backend.services import send_email_batch
+from .models import EmailOutbox, OutboxStatus
+
+# Delay before the first retry; it doubles with every failed attempt up to the cap
+RETRY_BASE_DELAY = timedelta(minutes=1)
+RETRY_MAX_DELAY = timedelta(hours=6)
+# How long a claimed batch may take to send before other workers may claim it again
+SEND_LEASE = timedelta(minutes=10)
+
+
+def retry_delay(attempts):
+    return min(RETRY_BASE_DELAY * (2 ** (attempts - 1)), RETRY_MAX_DELAY)
+
+
+def describe_error(exc):
+    return f'{type(exc).__name__}: {exc}'
+
+
+def to_message(entry):
+    message = EmailMultiAlternatives(
+        entry.subject, entry.body_text, entry.from_email or None, [entry.recipient],
+        reply_to=[entry.from_email] if entry.from_email else None,
+    )
+    if entry.body_html:
+        message.attach_alternative(entry.body_html, 'text/html')
+    return message
+
+
+def deliver_due_emails(batch_size=50, max_attempts=5):
+    """
+    Send one batch of due outbox emails over a single connection.
+    Rows are claimed with SKIP LOCKED and marked SENDING in a short transaction, so several workers
+    can run side by side without holding row locks while the provider is called. A claim that is not
+    resolved within SEND_LEASE, because its worker died, becomes due again.
+    A failed email is retried with exponential backoff until `max_attempts` is reached.
+    Returns `(sent, failed)` counts.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        entries = list(
+            EmailOutbox.objects.select_for_update(skip_locked=True)
+            .filter(status__in=[OutboxStatus.PENDING, OutboxStatus.SENDING], next_attempt_at__lte=now)
+            .order_by('next_attempt_at')[:batch_size]
+        )
+        if not entries:
+            return 0, 0
+        EmailOutbox.objects.filter(id__in=[entry.id for entry in entries]).update(
+            status=OutboxStatus.SENDING, next_attempt_at=now + SEND_LEASE, updated_at=now,
+        )
+
+    sent = failed = 0
+    # Every claimed row gets a result, so a row is never left to be re-claimed without an attempt recorded
+    results, messages = {}, {}
+    for entry in entries:
+        try:
+            messages[entry.id] = to_message(entry)
+        except Exception as exc:
+            results[entry.id] = {'sent': False, 'error': describe_error(exc)}
+    try:
+        batch = send_email_batch(list(messages.values()))
+    except Exception as exc:
+        # Opening the connection failed, e.g. the provider is down
+        batch = [{'sent': False, 'error': describe_error(exc)}] * len(messages)
+    results.update(zip(messages, batch))
+
+    for entry in entries:
+        result = results[entry.id]
+        entry.attempts += 1
+        if result['sent']:
+            sent += 1
+            entry.status = OutboxStatus.SENT
+            entry.sent_at = timezone.now()
+        else:
+            failed += 1
+            entry.last_error = result['error']
+            if entry.attempts >= max_attempts:
+                entry.status = OutboxStatus.FAILED
+            else:
+                entry.status = OutboxStatus.PENDING
+                entry.next_attempt_at = now + retry_delay(entry.attempts)
+        entry.updated_at = timezone.now()
+
+    EmailOutbox.objects.bulk_update(
+        entries, ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at', 'updated_at']
+    )
+    return sent, failed
+
+
+def purge_sent_emails(older_than):
+    return EmailOutbox.objects.filter(status=OutboxStatus.SENT, sent_at__lt=timezone.now() - older_than).delete()[0]
@@ -0,0 +1,130 @@
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from io import StringIO
+from rest_framework import status
+from rest_framework.test import APIClient
+from datetime import timedelta
+from trips.models import Trip, TripMember, MemberRole, MemberStatus
+from users.models import User
+from .digest import queue_due_digests
+from .models import EmailOutbox, OutboxStatus
+from .outbox import deliver_due_emails
+
+
+class FailingBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise ConnectionError("provider unavailable")
+
+
+class UnreachableBackend(BaseEmailBackend):
+    def open(self):
+        raise ConnectionRefusedError("smtp down")
+
+    def send_messages(self, email_messages):
+        raise AssertionError("messages must not be sent without a connection")
+
+
+class StatusRecordingBackend(BaseEmailBackend):
+    statuses = []
+
+    def send_messages(self, email_messages):
+        self.statuses.extend(EmailOutbox.objects.values_list("status", flat=True))
+        return len(email_messages)
+
+
+@override_settings(SENDGRID_API_KEY="test-key", EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend")
+class EmailOutboxTests(TestCase):
+    """Tests for queuing emails in the outbox and delivering them from the worker"""
+
+    def register(self):
+        data = {"email": "outbox@example.com", "password": "Test12#$", "password2": "Test12#$", "first_name": "Out"}
+        return APIClient().post(reverse("register"), data, format="json")
+
+    def test_request_queues_email_and_worker_delivers_it(self):
+        self.assertEqual(self.register().status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(mail.outbox), 0)
+        entry = EmailOutbox.objects.get()
+        self.assertEqual((entry.recipient, entry.status), ("outbox@example.com", OutboxStatus.PENDING))
+
+        call_command("run_email_worker", once=True, stdout=StringIO())
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["outbox@example.com"])
+        entry.refresh_from_db()
+        self.assertEqual((entry.status, entry.attempts), (OutboxStatus.SENT, 1))
+
+    @override_settings(EMAIL_BACKEND="notifications.tests.FailingBackend")
+    def test_failures_back_off_until_max_attempts(self):
+        self.register()
+        entry = EmailOutbox.objects.get()
+
+        self.assertEqual(deliver_due_emails(max_attempts=2), (0, 1))
+        entry.refresh_from_db()
+        self.assertEqual((entry.status, entry.attempts), (OutboxStatus.PENDING, 1))
+        self.assertGreater(entry.next_attempt_at, timezone.now())
+        self.assertIn("provider unavailable", entry.last_error)
+
+        EmailOutbox.objects.update(next_attempt_at=timezone.now())
+        deliver_due_emails(max_attempts=2)
+        entry.refresh_from_db()
+        self.assertEqual((entry.status, entry.attempts), (OutboxStatus.FAILED, 2))
+
+    @override_settings(EMAIL_BACKEND="notifications.tests.UnreachableBackend")
+    def test_connection_failure_counts_as_failed_attempt(self):
+        self.register()
+        entry = EmailOutbox.objects.get()
+
+        self.assertEqual(deliver_due_emails(), (0, 1))
+        entry.refresh_from_db()
+        self.assertEqual((entry.status, entry.attempts), (OutboxStatus.PENDING, 1))
+        self.assertIn("smtp down", entry.last_error)
+        self.assertGreater(entry.next_attempt_at, timezone.now())
+
+    @override_settings(EMAIL_BACKEND="notifications.tests.StatusRecordingBackend")
+    def test_claim_is_recorded_before_sending_and_expires(self):
+        self.register()
+        StatusRecordingBackend.statuses = []
+        # A batch claimed by a worker that died mid-send is picked up again once its lease is over
+        EmailOutbox.objects.update(status=OutboxStatus.SENDING, next_attempt_at=timezone.now() - timedelta(seconds=1))
+
+        self.assertEqual(deliver_due_emails(), (1, 0))
+        self.assertEqual(StatusRecordingBackend.statuses, [OutboxStatus.SENDING])
+        self.assertEqual(EmailOutbox.objects.get().status, OutboxStatus.SENT)
+
+
+@override_settings(SENDGRID_API_KEY="test-key")
+class NotificationDigestTests(TestCase):
+    """Tests for coalescing notifications into one email per recipient"""
+
+    def setUp(self):
+        self.owner = User.objects.create_user(email="owner@example.com", password="Test12#$", first_name="Olga")
+        self.trip = Trip.objects.create(owner=self.owner, title="Busy Trip", destination="Bali", start_date="2030-01-01", end_date="2030-01-05", is_joinable=True, member_spots=50)
+        TripMember.objects.create(trip=self.trip, user=self.owner, role=MemberRole.ORGANIZER, status=MemberStatus.ACCEPTED)
+
+    def join(self, email):
+        client = APIClient()
+        client.force_authenticate(user=User.objects.create_user(email=email, password="Test12#$"))
+        return client.post(reverse("join-trip", kwargs={"trip_id": self.trip.id}))
+
+    def test_burst_of_join_requests_becomes_one_digest(self):
+        for index in range(3):
+            self.assertEqual(self.join(f"joiner{index}@example.com").status_code, status.HTTP_201_CREATED)
+        self.assertFalse(EmailOutbox.objects.exists())
+
+        self.assertEqual(queue_due_digests(timedelta(minutes=15)), (0, 0))
+        self.assertEqual(queue_due_digests(timedelta(0)), (1, 3))
+
+        entry = EmailOutbox.objects.get()
+        self.assertEqual((entry.recipient, entry.subject), ("owner@example.com", "3 updates on your Jelajah trips"))
+        self.assertEqual(entry.body_text.count("New Join Request for Trip: Busy Trip"), 3)
+        self.assertEqual(queue_due_digests(timedelta(0)), (0, 0))
+
+    def test_single_event_keeps_its_own_template(self):
+        self.join("solo@example.com")
+        queue_due_digests(timedelta(0))
+        entry = EmailOutbox.objects.get()
+        self.assertEqual(entry.subject, "New Join Request for Trip: Busy Trip")
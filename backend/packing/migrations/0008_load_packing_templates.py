@@ -0,0 +1,101 @@
+from django.db import migrations
+
+TEMPLATES = {
+    'Beach Holiday': (
+        'Sun, sand and swimming essentials.',
+        [
+            ('Documents', 'Passport / ID card', 1),
+            ('Documents', 'Travel insurance', 1),
+            ('Clothing', 'T-shirts', 4),
+            ('Clothing', 'Shorts', 3),
+            ('Clothing', 'Swimwear', 2),
+            ('Footwear', 'Sandals', 1),
+            ('Toiletries', 'Sunscreen', 1),
+            ('Toiletries', 'Toothbrush & toothpaste', 1),
+            ('Beach Gear', 'Beach towel', 1),
+            ('Beach Gear', 'Sunglasses', 1),
+            ('Beach Gear', 'Hat', 1),
+            ('Electronics', 'Phone charger', 1),
+            ('Medical Supplies', 'After-sun lotion', 1),
+        ],
+    ),
+    'Mountain Hiking': (
+        'Day hikes and multi-day treks.',
+        [
+            ('Documents', 'Passport / ID card', 1),
+            ('Documents', 'Hiking permit', 1),
+            ('Clothing', 'Moisture-wicking shirts', 3),
+            ('Clothing', 'Fleece jacket', 1),
+            ('Weather-Specific Items', 'Rain jacket', 1),
+            ('Footwear', 'Hiking boots', 1),
+            ('Footwear', 'Hiking socks', 3),
+            ('Hiking Gear', 'Daypack', 1),
+            ('Hiking Gear', 'Water bottle', 2),
+            ('Hiking Gear', 'Headlamp', 1),
+            ('Safety Items', 'Whistle', 1),
+            ('Medical Supplies', 'First aid kit', 1),
+            ('Snacks', 'Energy bars', 6),
+        ],
+    ),
+    'Camping Trip': (
+        'Nights outdoors under the stars.',
+        [
+            ('Camping Gear', 'Tent', 1),
+            ('Camping Gear', 'Sleeping bag', 1),
+            ('Camping Gear', 'Sleeping mat', 1),
+            ('Camping Gear', 'Camping stove', 1),
+            ('Hiking Gear', 'Headlamp', 1),
+            ('Clothing', 'Warm layers', 2),
+            ('Footwear', 'Trail shoes', 1),
+            ('Toiletries', 'Biodegradable soap', 1),
+            ('Medical Supplies', 'Insect repellent', 1),
+            ('Safety Items', 'Multi-tool', 1),
+            ('Snacks', 'Trail mix', 3),
+        ],
+    ),
+    'City Break': (
+        'A few days exploring a city.',
+        [
+            ('Documents', 'Passport / ID card', 1),
+            ('Documents', 'Hotel booking', 1),
+            ('Clothing', 'Casual outfits', 3),
+            ('Footwear', 'Walking shoes', 1),
+            ('Toiletries', 'Toiletry bag', 1),
+            ('Electronics', 'Phone charger', 1),
+            ('Electronics', 'Power bank', 1),
+            ('Travel Accessories', 'Travel adapter', 1),
+            ('Travel Accessories', 'Day bag', 1),
+            ('Entertainment', 'Book', 1),
+        ],
+    ),
+}
+
+
+def load_packing_templates(apps, schema_editor):
+    PackingCategory = apps.get_model('packing', 'PackingCategory')
+    PackingTemplate = apps.get_model('packing', 'PackingTemplate')
+    PackingTemplateItem = apps.get_model('packing', 'PackingTemplateItem')
+
+    categories = {category.name: category for category in PackingCategory.objects.all()}
+    for template_name, (description, items) in TEMPLATES.items():
+        template = PackingTemplate.objects.create(name=template_name, description=description, is_system=True)
+        PackingTemplateItem.objects.bulk_create([
+            PackingTemplateItem(template=template, category=categories.get(category_name), name=name, quantity=quantity)
+            for category_name, name, quantity in items
+        ])
+
+
+def unload_packing_templates(apps, schema_editor):
+    PackingTemplate = apps.get_model('packing', 'PackingTemplate')
+    PackingTemplate.objects.filter(is_system=True, name__in=TEMPLATES.keys()).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('packing', '0007_packingtemplate'),
+    ]
+
+    operations = [
+        migrations.RunPython(load_packing_templates, unload_packing_templates),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.conf import settings
 from backend.models import BaseModel
 from trips.models import Trip, TripMember
 
@@ -27,3 +28,31 @@ class PackingItem(BaseModel):
     
     class Meta:
         ordering = ['-created_at']
+
+
+class PackingTemplate(BaseModel):
+    """Reusable packing list, either provided by the system or saved by a user"""
+    name = models.CharField(max_length=100)
+    description = models.TextField(blank=True, max_length=2000)
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True, blank=True, related_name='packing_templates')
+    is_system = models.BooleanField(default=False)
+
+    def __str__(self):
+        return self.name
+
+    class Meta:
+        ordering = ['-is_system', 'name']
+
+
+class PackingTemplateItem(BaseModel):
+    """Item of a packing template"""
+    template = models.ForeignKey(PackingTemplate, on_delete=models.CASCADE, related_name='items')
+    name = models.CharField(max_length=100)
+    category = models.ForeignKey(PackingCategory, on_delete=models.SET_NULL, null=True)
+    quantity = models.PositiveIntegerField(default=1)
+
+    def __str__(self):
+        return self.name
+
+    class Meta:
+        ordering = ['category__name', 'name']
@@ -6,6 +6,7 @@ class IsPackingItemAccessible(permissions.BasePermission):
     - Only trip owners or members with accepted status or is_public can view packing items.
     - Trip owners and members with roles other than 'MEMBER' can create, update, and delete packing items.
     - Members with 'MEMBER' role can view packing items and create, update, delete packing items with assigned_to themselves.
+    - Bulk batches follow the same rules; every item in a MEMBER batch must be assigned to themselves.
     """
     
     def has_permission(self, request, view):
@@ -51,6 +52,44 @@ class IsPackingItemAccessible(permissions.BasePermission):
                     elif view.action == 'create':
                         assigned_to_id = request.data.get('assigned_to')
                         return assigned_to_id == member.id
+                    elif view.action == 'bulk':
+                        return view.is_bulk_assigned_to(member)
                     
         
         return False
+
+
+class IsPackingTemplateAccessible(permissions.BasePermission):
+    """
+    - Authenticated users can view system templates and their own templates.
+    - Only the owner can update or delete a template; system templates are read-only.
+    """
+
+    def has_permission(self, request, view):
+        return request.user.is_authenticated
+
+    def has_object_permission(self, request, view, obj):
+        if request.method in permissions.SAFE_METHODS:
+            return obj.is_system or obj.owner_id == request.user.id
+        return not obj.is_system and obj.owner_id == request.user.id
+
+
+class CanApplyPackingTemplate(permissions.BasePermission):
+    """
+    - Only trip owners and accepted members with roles other than 'MEMBER' can apply a template to a trip.
+    """
+
+    def has_permission(self, request, view):
+        trip_id = view.kwargs.get('trip_id')
+        if not trip_id or not request.user.is_authenticated:
+            return False
+
+        trip = Trip.objects.filter(id=trip_id).only('owner_id').first()
+        if not trip:
+            return False
+        if trip.owner_id == request.user.id:
+            return True
+        return trip.trip_members.filter(
+            user=request.user,
+            status=MemberStatus.ACCEPTED
+        ).exclude(role=MemberRole.MEMBER).exists()
@@ -1,8 +1,9 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
-from .models import PackingCategory, PackingItem
+from django.db import transaction
+from .models import PackingCategory, PackingItem, PackingTemplate, PackingTemplateItem
 from trips.serializers import TripMemberSerializer
-from trips.models import TripMember, MemberStatus
+from trips.models import Trip, TripMember, MemberStatus
 
 User = get_user_model()
 
@@ -38,3 +39,60 @@ class PackingItemSerializer(serializers.ModelSerializer):
         trip_id = self.context['trip_id']
         validated_data['trip_id'] = trip_id
         return super().create(validated_data)
+
+
+class PackingTemplateItemSerializer(serializers.ModelSerializer):
+    category = PackingCategorySerializer(read_only=True)
+
+    class Meta:
+        model = PackingTemplateItem
+        fields = ['id', 'name', 'category', 'quantity']
+
+
+class PackingTemplateSerializer(serializers.ModelSerializer):
+    """Packing template; on create the items are captured from the packing list of `trip_id`"""
+    items = PackingTemplateItemSerializer(many=True, read_only=True)
+    trip_id = serializers.PrimaryKeyRelatedField(queryset=Trip.objects.all(), write_only=True, required=False)
+
+    class Meta:
+        model = PackingTemplate
+        fields = ['id', 'name', 'description', 'is_system', 'items', 'trip_id', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'is_system', 'created_at', 'updated_at']
+
+    def validate_trip_id(self, value):
+        user = self.context['request'].user
+        is_member = value.owner_id == user.id or value.trip_members.filter(user=user, status=MemberStatus.ACCEPTED).exists()
+        if not is_member:
+            raise serializers.ValidationError("You can only save templates from trips you belong to.")
+        return value
+
+    def validate(self, attrs):
+        if self.instance is None and 'trip_id' not in attrs:
+            raise serializers.ValidationError({"trip_id": "A trip to capture the packing list from is required."})
+        return attrs
+
+    @transaction.atomic
+    def create(self, validated_data):
+        trip = validated_data.pop('trip_id')
+        template = PackingTemplate.objects.create(owner=self.context['request'].user, **validated_data)
+        PackingTemplateItem.objects.bulk_create([
+            PackingTemplateItem(template=template, name=item['name'], category_id=item['category_id'], quantity=item['quantity'])
+            for item in PackingItem.objects.filter(trip=trip).order_by('created_at').values('name', 'category_id', 'quantity')
+        ])
+        return template
+
+    def update(self, instance, validated_data):
+        validated_data.pop('trip_id', None)
+        return super().update(instance, validated_data)
+
+
+class ApplyPackingTemplateSerializer(serializers.Serializer):
+    template_id = serializers.PrimaryKeyRelatedField(queryset=PackingTemplate.objects.all())
+    assign_round_robin = serializers.BooleanField(default=False)
+    skip_existing = serializers.BooleanField(default=True)
+
+    def validate_template_id(self, value):
+        user = self.context['request'].user
+        if not value.is_system and value.owner_id != user.id:
+            raise serializers.ValidationError("Template not found.")
+        return value
@@ -5,7 +5,7 @@ from django.contrib.auth import get_user_model
 from datetime import date, timedelta
 from django.urls import reverse
 
-from .models import PackingItem, PackingCategory
+from .models import PackingItem, PackingCategory, PackingTemplate
 from trips.models import Trip, TripMember, MemberRole, MemberStatus
 
 User = get_user_model()
@@ -53,3 +53,36 @@ class PackingAPITests(APITestCase):
         resp = self.client.get(reverse("packing-statistics", kwargs={"trip_id": self.trip.id}))
         self.assertEqual(resp.status_code, status.HTTP_200_OK)
         self.assertIn("total_items", resp.data)
+
+    def test_bulk_mark_packed(self):
+        items = [PackingItem.objects.create(trip=self.trip, name=f"Item {i}", category=self.cat) for i in range(5)]
+        data = [{"id": str(item.id), "packed": True} for item in items]
+        resp = self.client.patch(reverse("packing-item-bulk", kwargs={"trip_id": self.trip.id}), data, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(resp.data), 5)
+        self.assertEqual(PackingItem.objects.filter(trip=self.trip, packed=True).count(), 5)
+
+    def test_save_and_apply_template(self):
+        PackingItem.objects.create(trip=self.trip, name="Charger", category=self.cat, quantity=1)
+        PackingItem.objects.create(trip=self.trip, name="Headphones", category=self.cat, quantity=1)
+        resp = self.client.post(reverse("packing-template-list"), {"name": "My Gadgets", "trip_id": str(self.trip.id)}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(resp.data["items"]), 2)
+        template_id = resp.data["id"]
+
+        other_trip = Trip.objects.create(owner=self.user, title="Next Trip", destination="Q", start_date=date.today()+timedelta(days=10), end_date=date.today()+timedelta(days=12))
+        member = TripMember.objects.create(trip=other_trip, user=self.user, role=MemberRole.ORGANIZER, status=MemberStatus.ACCEPTED)
+        PackingItem.objects.create(trip=other_trip, name="charger", category=self.cat)
+        url = reverse("packing-apply-template", kwargs={"trip_id": other_trip.id})
+        resp = self.client.post(url, {"template_id": template_id, "assign_round_robin": True}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(resp.data["created"], 1)
+        self.assertEqual(PackingItem.objects.get(trip=other_trip, name="Headphones").assigned_to, member)
+
+    def test_system_templates_are_read_only(self):
+        template = PackingTemplate.objects.filter(is_system=True).first()
+        resp = self.client.get(reverse("packing-template-list"))
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertTrue(any(item["id"] == str(template.id) for item in resp.data))
+        resp = self.client.delete(reverse("packing-template-detail", kwargs={"pk": template.id}))
+        self.assertEqual(resp.status_code, status.HTTP_403_FORBIDDEN)
@@ -1,9 +1,10 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import PackingCategoryViewSet, PackingItemViewSet, PackingItemStatisticsView
+from .views import PackingCategoryViewSet, PackingItemViewSet, PackingItemStatisticsView, PackingTemplateViewSet, ApplyPackingTemplateView
 
 router = DefaultRouter()
 router.register(r'packing/categories', PackingCategoryViewSet, basename='packing-category')
+router.register(r'packing/templates', PackingTemplateViewSet, basename='packing-template')
 
 trip_router = DefaultRouter()
 trip_router.register(r'items', PackingItemViewSet, basename='packing-item')
@@ -12,4 +13,5 @@ urlpatterns = [
     path('', include(router.urls)),
     path('trips/<uuid:trip_id>/packing/', include(trip_router.urls)),
     path('trips/<uuid:trip_id>/packing/statistics/', PackingItemStatisticsView.as_view(), name='packing-statistics'),
+    path('trips/<uuid:trip_id>/packing/apply-template/', ApplyPackingTemplateView.as_view(), name='packing-apply-template'),
 ]
@@ -1,10 +1,15 @@
-from rest_framework import viewsets, permissions, generics
-from .models import PackingCategory, PackingItem
-from .serializers import PackingCategorySerializer, PackingItemSerializer
+from rest_framework import viewsets, permissions, generics, status
+from .models import PackingCategory, PackingItem, PackingTemplate
+from .serializers import PackingCategorySerializer, PackingItemSerializer, PackingTemplateSerializer, ApplyPackingTemplateSerializer
+from backend.async_views import AsyncAPIView
 from backend.permissions import IsStatisticAccessible
+from backend.mixins import BulkModelMixin, TripRevisionMixin
 from rest_framework.response import Response
-from django.db.models import Count, Case, When
-from .permissions import IsPackingItemAccessible
+from django.db import transaction
+from django.db.models import Count, Case, When, Q, Prefetch
+from django.db.models.functions import Lower
+from trips.models import TripMember, MemberStatus
+from .permissions import IsPackingItemAccessible, IsPackingTemplateAccessible, CanApplyPackingTemplate
 
 class PackingCategoryViewSet(viewsets.ReadOnlyModelViewSet):
     """Packing categories."""
@@ -12,7 +17,7 @@ class PackingCategoryViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = PackingCategorySerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
-class PackingItemViewSet(viewsets.ModelViewSet):
+class PackingItemViewSet(TripRevisionMixin, BulkModelMixin, viewsets.ModelViewSet):
     """Packing items for a specific trip."""
     serializer_class = PackingItemSerializer
     permission_classes = [IsPackingItemAccessible]
@@ -20,7 +25,9 @@ class PackingItemViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         category_id = self.request.query_params.get("category_id")
         trip_id = self.kwargs.get('trip_id')
-        queryset = PackingItem.objects.filter(trip_id=trip_id)
+        queryset = PackingItem.objects.filter(trip_id=trip_id).select_related('category').prefetch_related(
+            Prefetch('assigned_to', queryset=TripMember.objects.with_expenses())
+        )
         if category_id:
             queryset = queryset.filter(category_id=category_id)
         return queryset
@@ -30,18 +37,19 @@ class PackingItemViewSet(viewsets.ModelViewSet):
         context['trip_id'] = self.kwargs.get('trip_id')
         return context
 
-class PackingItemStatisticsView(generics.RetrieveAPIView):
+class PackingItemStatisticsView(TripRevisionMixin, AsyncAPIView):
     """Statistics for packing items in a trip."""
     permission_classes = [IsStatisticAccessible]
 
-    def get(self, request, trip_id=None):
-        total_items = PackingItem.objects.filter(trip_id=trip_id).count()
-        packed_items = PackingItem.objects.filter(trip_id=trip_id, packed=True).count()
-        
-        # list of categories with counts of total and packed items
-        category_stats = PackingItem.objects.filter(trip_id=trip_id).values('category__name', 'category__id').annotate(
-            total=Count('id'),
-            packed=Count(Case(When(packed=True, then=1)))
+    async def get(self, request, trip_id=None):
+        items = PackingItem.objects.filter(trip_id=trip_id)
+        counts, category_stats = await self.gather(
+            lambda: items.aggregate(total=Count('id'), packed=Count('id', filter=Q(packed=True))),
+            # list of categories with counts of total and packed items
+            lambda: list(items.values('category__name', 'category__id').annotate(
+                total=Count('id'),
+                packed=Count(Case(When(packed=True, then=1)))
+            )),
         )
         
         # Transform the values to have nested category object
@@ -58,8 +66,65 @@ class PackingItemStatisticsView(generics.RetrieveAPIView):
         ]
 
         return Response({
-            "total_items": total_items,
-            "packed_items": packed_items,
-            "unpacked_items": total_items - packed_items,
+            "total_items": counts['total'],
+            "packed_items": counts['packed'],
+            "unpacked_items": counts['total'] - counts['packed'],
             "category_stats": category_stats
         })
+
+
+class PackingTemplateViewSet(viewsets.ModelViewSet):
+    """System packing templates and the templates saved by the current user."""
+    serializer_class = PackingTemplateSerializer
+    permission_classes = [IsPackingTemplateAccessible]
+
+    def get_queryset(self):
+        return PackingTemplate.objects.filter(
+            Q(is_system=True) | Q(owner=self.request.user)
+        ).prefetch_related('items__category')
+
+
+class ApplyPackingTemplateView(TripRevisionMixin, generics.CreateAPIView):
+    """
+    Materialize a packing template into the packing list of a trip with a single bulk_create.
+    Items can be assigned round-robin to accepted members, and items whose name already exists are skipped by default.
+    """
+    serializer_class = ApplyPackingTemplateSerializer
+    permission_classes = [CanApplyPackingTemplate]
+
+    def create(self, request, trip_id=None):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        template = serializer.validated_data['template_id']
+
+        template_items = list(template.items.order_by('category__name', 'name').values('name', 'category_id', 'quantity'))
+        if serializer.validated_data['skip_existing']:
+            existing_names = set(
+                PackingItem.objects.filter(trip_id=trip_id).annotate(lower_name=Lower('name')).values_list('lower_name', flat=True)
+            )
+            template_items = [item for item in template_items if item['name'].lower() not in existing_names]
+
+        members = []
+        if serializer.validated_data['assign_round_robin']:
+            members = list(
+                TripMember.objects.filter(trip_id=trip_id, status=MemberStatus.ACCEPTED).order_by('joined_at').values_list('id', flat=True)
+            )
+
+        items = [
+            PackingItem(
+                trip_id=trip_id,
+                name=item['name'],
+                category_id=item['category_id'],
+                quantity=item['quantity'],
+                assigned_to_id=members[index % len(members)] if members else None,
+            )
+            for index, item in enumerate(template_items)
+        ]
+        with transaction.atomic():
+            PackingItem.objects.bulk_create(items)
+
+        return Response({
+            "template_id": template.id,
+            "created": len(items),
+            "item_ids": [item.id for item in items],
+        }, status=status.HTTP_201_CREATED)
@@ -0,0 +1,144 @@
+from datetime import timedelta, timezone
+from django.core import signing
+
+CALENDAR_TOKEN_SALT = 'trips.calendar'
+DEFAULT_EVENT_DURATION = timedelta(hours=1)
+
+
+def make_calendar_token(trip_id, user_id):
+    """Sign a calendar feed token for a user on a trip"""
+    return signing.dumps({'trip': str(trip_id), 'user': str(user_id)}, salt=CALENDAR_TOKEN_SALT)
+
+
+def read_calendar_token(token):
+    """Return the (trip_id, user_id) pair of a calendar token, or None if it is invalid"""
+    try:
+        payload = signing.loads(token, salt=CALENDAR_TOKEN_SALT)
+    except signing.BadSignature:
+        return None
+    return payload.get('trip'), payload.get('user')
+
+
+def escape_text(value):
+    """Escape a TEXT property value as defined in RFC 5545 section 3.3.11"""
+    return (
+        str(value)
+        .replace('\\', '\\\\')
+        .replace(';', '\\;')
+        .replace(',', '\\,')
+        .replace('\r\n', '\\n')
+        .replace('\n', '\\n')
+    )
+
+
+def fold_line(line):
+    """Fold a content line to 75 octets with CRLF line endings"""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return line + '\r\n'
+
+    parts = []
+    limit = 75
+    while encoded:
+        cut = min(limit, len(encoded))
+        # Never split a multi-byte character
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode('utf-8'))
+        encoded = encoded[cut:]
+        limit = 74  # continuation lines start with a space
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def format_datetime(value):
+    return value.astimezone(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def format_date(value):
+    return value.strftime('%Y%m%d')
+
+
+def itinerary_event(item, trip_title):
+    """VEVENT lines for an itinerary item values() row"""
+    start = item['visit_time']
+    duration = timedelta(minutes=item['duration_minutes']) if item.get('duration_minutes') else DEFAULT_EVENT_DURATION
+    lines = [
+        'BEGIN:VEVENT',
+        f"UID:itinerary-{item['id']}@jelajah",
+        f"DTSTAMP:{format_datetime(item['updated_at'])}",
+        f"DTSTART:{format_datetime(start)}",
+        f"DTEND:{format_datetime(start + duration)}",
+        f"SUMMARY:{escape_text(item['name'])}",
+        f"CATEGORIES:{escape_text(trip_title)}",
+    ]
+    if item['address']:
+        lines.append(f"LOCATION:{escape_text(item['address'])}")
+    if item['latitude'] is not None and item['longitude'] is not None:
+        lines.append(f"GEO:{item['latitude']};{item['longitude']}")
+    if item['description']:
+        lines.append(f"DESCRIPTION:{escape_text(item['description'])}")
+    lines.append('END:VEVENT')
+    return lines
+
+
+def checklist_event(item, trip_title):
+    """All-day VEVENT lines for a checklist item values() row"""
+    due_date = item['due_date']
+    title = item['title'] if not item['is_completed'] else f"[Done] {item['title']}"
+    lines = [
+        'BEGIN:VEVENT',
+        f"UID:checklist-{item['id']}@jelajah",
+        f"DTSTAMP:{format_datetime(item['updated_at'])}",
+        f"DTSTART;VALUE=DATE:{format_date(due_date)}",
+        f"DTEND;VALUE=DATE:{format_date(due_date + timedelta(days=1))}",
+        f"SUMMARY:{escape_text(title)}",
+        f"CATEGORIES:{escape_text(trip_title)}",
+        'TRANSP:TRANSPARENT',
+    ]
+    if item['description']:
+        lines.append(f"DESCRIPTION:{escape_text(item['description'])}")
+    lines.append('END:VEVENT')
+    return lines
+
+
+def calendar_header(trip):
+    return [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        'PRODID:-//Jelajah//Trip Calendar//EN',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f"X-WR-CALNAME:{escape_text(trip.title)}",
+    ]
+
+
+def generate_calendar(trip, itinerary_rows, checklist_rows):
+    """Yield the folded lines of a VCALENDAR for a trip, one event at a time"""
+    for line in calendar_header(trip):
+        yield fold_line(line)
+
+    for item in itinerary_rows:
+        for line in itinerary_event(item, trip.title):
+            yield fold_line(line)
+
+    for item in checklist_rows:
+        for line in checklist_event(item, trip.title):
+            yield fold_line(line)
+
+    yield fold_line('END:VCALENDAR')
+
+
+async def agenerate_calendar(trip, itinerary_rows, checklist_rows):
+    """`generate_calendar` over async iterators, so ASGI servers stream it instead of buffering it"""
+    for line in calendar_header(trip):
+        yield fold_line(line)
+
+    async for item in itinerary_rows:
+        for line in itinerary_event(item, trip.title):
+            yield fold_line(line)
+
+    async for item in checklist_rows:
+        for line in checklist_event(item, trip.title):
+            yield fold_line(line)
+
+    yield fold_line('END:VCALENDAR')
@@ -0,0 +1,294 @@
+import http.client
+import json
+import random
+import threading
+import time
+from collections import defaultdict
+from http.cookies import SimpleCookie
+from urllib.parse import urlsplit
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Requests the trip page issues when it opens, in the order the frontend sends them
+TRIP_PAGE = [
+    ('trip page: detail', 'trips/{id}/'),
+    ('trip page: members', 'trips/{id}/members/items/'),
+    ('trip page: member statistics', 'trips/{id}/members/statistics/'),
+    ('trip page: itinerary summary', 'trips/{id}/itineraries/summary/'),
+    ('trip page: itinerary items', 'trips/{id}/itineraries/items/'),
+    ('trip page: expenses', 'trips/{id}/expenses/items/'),
+    ('trip page: expense statistics', 'trips/{id}/expenses/statistics/'),
+    ('trip page: packing items', 'trips/{id}/packing/items/'),
+    ('trip page: checklist items', 'trips/{id}/checklist/items/'),
+]
+SCENARIOS = ('trip_list', 'trip_page', 'create_expense', 'join_request')
+DEFAULT_MIX = 'trip_list=50,trip_page=30,create_expense=10,join_request=10'
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(fraction * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def is_error(status):
+    """Connection failures and every 4xx or 5xx response, including throttled ones"""
+    return status == 0 or status >= 400
+
+
+def parse_mix(value):
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        if name not in SCENARIOS or not weight.isdigit():
+            raise CommandError(f"Invalid --mix entry '{part}'.")
+        mix[name] = int(weight)
+    return mix
+
+
+class Client:
+    """One keep-alive connection per virtual user, authenticated with the access cookie of a login"""
+
+    def __init__(self, base_url, timeout):
+        parts = urlsplit(base_url)
+        connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        self.connection = connection_class(parts.hostname, parts.port, timeout=timeout)
+        self.prefix = parts.path.rstrip('/') + '/api/'
+        self.headers = {'Content-Type': 'application/json', 'Accept': 'application/json'}
+
+    def request(self, method, path, payload=None):
+        """Returns `(status, parsed body, seconds)`; connection failures are reported as status 0"""
+        body = json.dumps(payload) if payload is not None else None
+        started = time.perf_counter()
+        try:
+            self.connection.request(method, self.prefix + path, body=body, headers=self.headers)
+            response = self.connection.getresponse()
+            content = response.read()
+        except (OSError, http.client.HTTPException):
+            self.connection.close()
+            return 0, None, time.perf_counter() - started
+        elapsed = time.perf_counter() - started
+        self.last_response = response
+        try:
+            data = json.loads(content) if content else None
+        except ValueError:
+            data = None
+        return response.status, data, elapsed
+
+    def login(self, email, password):
+        status, _, _ = self.request('POST', 'auth/token/', {'email': email, 'password': password})
+        if status != 200:
+            return False
+        cookies = SimpleCookie()
+        for header in self.last_response.headers.get_all('Set-Cookie') or []:
+            cookies.load(header)
+        access = cookies.get(settings.SIMPLE_JWT['AUTH_COOKIE'])
+        if access is None:
+            return False
+        self.headers['Authorization'] = f'Bearer {access.value}'
+        return True
+
+
+class VirtualUser(threading.Thread):
+    def __init__(self, harness, number):
+        super().__init__(daemon=True)
+        self.harness = harness
+        self.number = number
+        self.rng = random.Random(harness.seed + number)
+        self.samples = []
+        self.error = None
+        self.member_ids = {}
+
+    def record(self, label, status, seconds):
+        self.samples.append((label, status, seconds))
+
+    def call(self, label, method, path, payload=None):
+        status, data, seconds = self.client.request(method, path, payload)
+        if self.harness.measuring:
+            self.record(label, status, seconds)
+        return status, data
+
+    def setup(self):
+        harness = self.harness
+        self.client = Client(harness.base_url, harness.timeout)
+        email = f'{harness.prefix}-{self.number % harness.user_count}@example.com'
+        if not self.client.login(email, harness.password):
+            raise RuntimeError(f"Could not log in as {email}; run seed_benchmark_data first.")
+        _, me = self.client.request('GET', 'auth/me/')[:2]
+        self.user_id = me['id']
+        _, trips = self.client.request('GET', 'trips/')[:2]
+        self.trip_ids = [trip['id'] for trip in trips]
+        _, categories = self.client.request('GET', 'expenses/categories/')[:2]
+        self.category_ids = [category['id'] for category in categories or []]
+
+    def run(self):
+        try:
+            self.setup()
+        except Exception as exc:
+            self.error = exc
+            return
+        harness = self.harness
+        harness.ready.wait()
+        scenarios, weights = zip(*harness.mix.items())
+        try:
+            while time.monotonic() < harness.deadline:
+                getattr(self, self.rng.choices(scenarios, weights)[0])()
+        except Exception as exc:
+            self.error = exc
+
+    def trip_list(self):
+        self.call('trip list', 'GET', 'trips/')
+
+    def trip_page(self):
+        if not self.trip_ids:
+            return self.trip_list()
+        trip_id = self.rng.choice(self.trip_ids)
+        started = time.perf_counter()
+        statuses = [self.call(label, 'GET', path.format(id=trip_id))[0] for label, path in TRIP_PAGE]
+        if self.harness.measuring:
+            # The page counts as failed with the status of its first failed request
+            status = next((status for status in statuses if is_error(status)), 200)
+            self.record('trip page (all requests)', status, time.perf_counter() - started)
+
+    def create_expense(self):
+        if not self.trip_ids or not self.category_ids:
+            return self.trip_list()
+        trip_id = self.rng.choice(self.trip_ids)
+        if trip_id not in self.member_ids:
+            _, members = self.client.request('GET', f'trips/{trip_id}/members/items/')[:2]
+            self.member_ids[trip_id] = next(
+                (
+                    member['id'] for member in members or []
+                    if member['user']['id'] == self.user_id and member['status'] == 'ACCEPTED' and member['role'] != 'MEMBER'
+                ),
+                None
+            )
+        # Only organizers and co-organizers may add expenses
+        member_id = self.member_ids[trip_id]
+        if member_id is None:
+            return self.trip_list()
+        amount = f'{self.rng.randint(1000, 50000) / 100:.2f}'
+        self.call('create expense', 'POST', f'trips/{trip_id}/expenses/items/', {
+            'title': 'Load test expense',
+            'amount': amount,
+            'category_id': self.rng.choice(self.category_ids),
+            'paid_by_id': member_id,
+            'splits': [{'member_id': member_id, 'amount': amount, 'paid': True}],
+        })
+
+    def join_request(self):
+        candidates = self.harness.join_candidates(self)
+        if not candidates:
+            return self.trip_list()
+        self.call('join request', 'POST', f'trips/{self.rng.choice(candidates)}/join/')
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay a mix of trip list, trip page, expense creation and join request traffic against a running server "
+        "as the users of seed_benchmark_data, and report throughput and latency percentiles per endpoint. "
+        "The server must run with throttling disabled (empty THROTTLE_USER_RATE and THROTTLE_ANON_RATE); "
+        "the command fails when any request is throttled."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://localhost:8000', help="Server to load, without the /api/ suffix")
+        parser.add_argument('--concurrency', type=int, default=8, help="Virtual users sending requests in parallel")
+        parser.add_argument('--duration', type=float, default=30, help="Measured seconds")
+        parser.add_argument('--warmup', type=float, default=5, help="Seconds of traffic sent before measuring")
+        parser.add_argument('--mix', default=DEFAULT_MIX, help=f"Scenario weights, default '{DEFAULT_MIX}'")
+        parser.add_argument('--prefix', default='bench', help="Email prefix used by seed_benchmark_data")
+        parser.add_argument('--password', default='Bench12#$', help="Password used by seed_benchmark_data")
+        parser.add_argument('--users', type=int, default=100, help="Seeded users to log in as, round-robin across virtual users")
+        parser.add_argument('--timeout', type=float, default=30, help="Socket timeout per request in seconds")
+        parser.add_argument('--seed', type=int, default=0, help="Random seed for scenario and trip choice")
+        parser.add_argument('--json', dest='json_path', help="Also write the report to this file as JSON")
+
+    def handle(self, *args, **options):
+        self.base_url = options['base_url']
+        self.prefix = options['prefix']
+        self.password = options['password']
+        self.user_count = options['users']
+        self.timeout = options['timeout']
+        self.seed = options['seed']
+        self.mix = parse_mix(options['mix'])
+        self.measuring = False
+        self.ready = threading.Event()
+        self.deadline = float('inf')
+
+        self.virtual_users = [VirtualUser(self, number) for number in range(options['concurrency'])]
+        for user in self.virtual_users:
+            user.start()
+        # Logins and trip lookups are not part of the measurement
+        while any(user.is_alive() and not hasattr(user, 'trip_ids') and user.error is None for user in self.virtual_users):
+            time.sleep(0.05)
+        errors = [user.error for user in self.virtual_users if user.error]
+        if errors:
+            self.ready.set()
+            raise CommandError(str(errors[0]))
+
+        self.deadline = time.monotonic() + options['warmup'] + options['duration']
+        self.ready.set()
+        time.sleep(options['warmup'])
+        self.measuring = True
+        started = time.monotonic()
+        for user in self.virtual_users:
+            user.join()
+        elapsed = time.monotonic() - started
+
+        for user in self.virtual_users:
+            if user.error:
+                self.stderr.write(f"Virtual user {user.number} stopped early: {user.error!r}")
+        report = self.build_report([sample for user in self.virtual_users for sample in user.samples], elapsed)
+        self.print_report(report, elapsed, options['concurrency'])
+        if options['json_path']:
+            with open(options['json_path'], 'w') as file:
+                json.dump({'duration': elapsed, 'concurrency': options['concurrency'], 'endpoints': report}, file, indent=2)
+
+        throttled = sum(row['throttled'] for row in report if not row['endpoint'].endswith('(all requests)'))
+        if throttled:
+            raise CommandError(
+                f"{throttled} requests were throttled with 429, so the results do not measure the server. "
+                "Restart the server with empty THROTTLE_USER_RATE and THROTTLE_ANON_RATE to disable throttling."
+            )
+
+    def join_candidates(self, user):
+        """Trips of the other virtual users, which this user is usually not a member of yet"""
+        return [trip_id for other in self.virtual_users if other is not user for trip_id in getattr(other, 'trip_ids', [])]
+
+    def build_report(self, samples, elapsed):
+        grouped = defaultdict(list)
+        for label, status, seconds in samples:
+            grouped[label].append((status, seconds))
+        report = []
+        for label, results in sorted(grouped.items()):
+            # Failed requests are counted as errors but kept out of the latencies, a fast 429 is not a fast response
+            durations = sorted(seconds * 1000 for status, seconds in results if not is_error(status))
+            statuses = defaultdict(int)
+            for status, _ in results:
+                statuses[status] += 1
+            report.append({
+                'endpoint': label,
+                'requests': len(results),
+                'throughput': len(results) / elapsed if elapsed else 0,
+                'errors': sum(count for status, count in statuses.items() if is_error(status)),
+                'throttled': statuses.get(429, 0),
+                'statuses': dict(sorted(statuses.items())),
+                'p50_ms': percentile(durations, 0.50),
+                'p95_ms': percentile(durations, 0.95),
+                'p99_ms': percentile(durations, 0.99),
+            })
+        return report
+
+    def print_report(self, report, elapsed, concurrency):
+        total = sum(row['requests'] for row in report if not row['endpoint'].endswith('(all requests)'))
+        self.stdout.write(f"{total} requests in {elapsed:.1f}s with {concurrency} virtual users: {total / max(elapsed, 1e-9):.1f} req/s")
+        self.stdout.write(f"{'endpoint':<32} {'requests':>8} {'req/s':>8} {'errors':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}  statuses")
+        for row in report:
+            statuses = ' '.join(f"{status}:{count}" for status, count in row['statuses'].items())
+            self.stdout.write(
+                f"{row['endpoint']:<32} {row['requests']:>8} {row['throughput']:>8.1f} {row['errors']:>6} "
+                f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f}  {statuses}"
+            )
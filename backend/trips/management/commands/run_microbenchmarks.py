@@ -0,0 +1,74 @@
+import json
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from backend import benchmarks
+from backend.test_runner import TestRunner
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / 'backend' / 'benchmark_baseline.json'
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the serializer, permission, itinerary summary and renderer microbenchmarks against an in-memory SQLite fixture "
+        "and compare ops/sec, peak memory and query counts with the stored baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--filter', default='', help="Only run benchmarks whose name contains this text")
+        parser.add_argument('--min-time', type=float, default=1.0, help="Seconds each benchmark is timed for")
+        parser.add_argument('--baseline', default=str(DEFAULT_BASELINE), help="Baseline JSON file")
+        parser.add_argument('--save-baseline', action='store_true', help="Write the results to the baseline file")
+        parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed ops/sec loss and peak memory growth, as a fraction")
+        parser.add_argument('--check', action='store_true', help="Exit with an error when a benchmark regressed against the baseline")
+        parser.add_argument('--json', dest='json_path', help="Also write the results to this file")
+
+    def handle(self, *args, **options):
+        selected = {name: factory for name, factory in benchmarks.BENCHMARKS.items() if options['filter'] in name}
+        if not selected:
+            raise CommandError(f"No benchmark matches '{options['filter']}'.")
+        if settings.DATABASES['default']['ENGINE'] != 'django.db.backends.sqlite3':
+            raise CommandError("Microbenchmarks run against in-memory SQLite; unset DATABASE_URL and DB_ENGINE.")
+
+        # The test runner's environment: a fresh in-memory database and process-local caches
+        runner = TestRunner(verbosity=0, interactive=False)
+        runner.setup_test_environment()
+        old_config = runner.setup_databases()
+        try:
+            self.stdout.write("Building fixture...")
+            fixture = benchmarks.build_fixture()
+            results = {}
+            for name, factory in selected.items():
+                results[name] = benchmarks.measure(factory(fixture), min_time=options['min_time'])
+                self.stdout.write(f"  {name}: {results[name]['ops_per_sec']} ops/sec")
+        finally:
+            runner.teardown_databases(old_config)
+            runner.teardown_test_environment()
+
+        baseline = benchmarks.load_baseline(options['baseline'])
+        rows = benchmarks.compare(results, baseline, options['tolerance'])
+        self.print_table(rows)
+
+        if options['json_path']:
+            with open(options['json_path'], 'w') as file:
+                json.dump(rows, file, indent=2)
+        if options['save_baseline']:
+            benchmarks.save_baseline(options['baseline'], {**baseline, **results})
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {options['baseline']}."))
+
+        regressed = [row for row in rows if row['regressions']]
+        if regressed and options['check']:
+            raise CommandError(f"{len(regressed)} benchmark(s) regressed against {options['baseline']}.")
+
+    def print_table(self, rows):
+        self.stdout.write(f"\n{'benchmark':<52} {'ops/sec':>10} {'vs base':>8} {'median ms':>9} {'peak KiB':>9} {'queries':>7}")
+        for row in rows:
+            previous = row['baseline']
+            change = f"{(row['ops_per_sec'] / previous['ops_per_sec'] - 1) * 100:+.0f}%" if previous else 'new'
+            queries = str(row['queries'])
+            if previous and previous['queries'] != row['queries']:
+                queries += f" ({previous['queries']})"
+            line = f"{row['name']:<52} {row['ops_per_sec']:>10} {change:>8} {row['median_ms']:>9} {row['peak_kib']:>9} {queries:>7}"
+            if row['regressions']:
+                line = self.style.ERROR(f"{line}  regressed: {', '.join(row['regressions'])}")
+            self.stdout.write(line)
@@ -0,0 +1,212 @@
+import random
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from checklist.models import ChecklistItem, ChecklistPriority, get_checklist_category
+from checklist.ranking import RANK_GAP
+from expenses.models import Expense, ExpenseCategory, ExpenseSplit
+from itineraries.models import ItineraryItem, ItineraryStatus, ItineraryType
+from packing.models import PackingCategory, PackingItem
+from trips.models import MemberRole, MemberStatus, Trip, TripDifficulty, TripMember, TripStatus
+
+User = get_user_model()
+
+DESTINATIONS = ['Bali', 'Lombok', 'Yogyakarta', 'Bandung', 'Labuan Bajo', 'Raja Ampat', 'Malang', 'Toba']
+ESTIMATED_TIMES = ['30 minutes', '1 hour', '2 hours', '2-3 hours', 'Half Day', 'Full Day', None]
+CENT = Decimal('0.01')
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate synthetic users and trips with members, itinerary items, expenses with splits, "
+        "packing and checklist items for load testing. Rows are written with bulk_create, one chunk of trips per transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100, help="Users to create")
+        parser.add_argument('--trips', type=int, default=50, help="Trips to create, owned round-robin by the users")
+        parser.add_argument('--members', type=int, default=6, help="Members per trip, including the organizer")
+        parser.add_argument('--itinerary-items', type=int, default=20, help="Itinerary items per trip")
+        parser.add_argument('--expenses', type=int, default=20, help="Expenses per trip, each split between the accepted members")
+        parser.add_argument('--packing-items', type=int, default=20, help="Packing items per trip")
+        parser.add_argument('--checklist-items', type=int, default=20, help="Checklist items per trip")
+        parser.add_argument('--prefix', default='bench', help="Seeded users get emails like <prefix>-<n>@example.com")
+        parser.add_argument('--password', default='Bench12#$', help="Password of every seeded user")
+        parser.add_argument('--chunk-size', type=int, default=200, help="Trips written per transaction")
+        parser.add_argument('--batch-size', type=int, default=2000, help="Rows per INSERT statement")
+        parser.add_argument('--seed', type=int, default=0, help="Random seed, so runs are reproducible")
+        parser.add_argument('--flush', action='store_true', help="Delete users seeded earlier with the same prefix, and their trips, first")
+
+    def handle(self, *args, **options):
+        if options['users'] < options['members']:
+            raise CommandError("--users must be at least --members.")
+
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        prefix = options['prefix']
+        seeded = User.objects.filter(email__startswith=f'{prefix}-', email__endswith='@example.com')
+        if seeded.exists():
+            if not options['flush']:
+                raise CommandError(f"Users with the '{prefix}' prefix already exist; pass --flush or another --prefix.")
+            Trip.objects.filter(owner__in=seeded).delete()
+            seeded.delete()
+
+        self.expense_categories = list(ExpenseCategory.objects.values_list('id', flat=True)) or [None]
+        self.itinerary_types = list(ItineraryType.objects.values_list('id', flat=True)) or [None]
+        self.packing_categories = list(PackingCategory.objects.values_list('id', flat=True)) or [None]
+        self.counts = dict.fromkeys(['users', 'trips', 'members', 'itinerary items', 'expenses', 'splits', 'packing items', 'checklist items'], 0)
+        started = time.monotonic()
+
+        # Hashing is deliberately slow, so every user shares one hash
+        password = make_password(options['password'])
+        user_ids = []
+        for start in range(0, options['users'], self.batch_size):
+            users = [
+                User(email=f'{prefix}-{index}@example.com', password=password, first_name='Bench', last_name=str(index))
+                for index in range(start, min(start + self.batch_size, options['users']))
+            ]
+            User.objects.bulk_create(users, batch_size=self.batch_size)
+            user_ids.extend(user.id for user in users)
+        self.counts['users'] = len(user_ids)
+
+        for start in range(0, options['trips'], options['chunk_size']):
+            with transaction.atomic():
+                self.create_trips(range(start, min(start + options['chunk_size'], options['trips'])), user_ids, options)
+
+        elapsed = time.monotonic() - started
+        rows = sum(self.counts.values())
+        summary = ', '.join(f"{count} {name}" for name, count in self.counts.items())
+        self.stdout.write(self.style.SUCCESS(f"Created {summary} ({rows} rows in {elapsed:.1f}s, {rows / max(elapsed, 1e-9):.0f} rows/s)."))
+
+    def bulk_create(self, model, objs, label):
+        model.objects.bulk_create(objs, batch_size=self.batch_size)
+        self.counts[label] += len(objs)
+
+    def create_trips(self, indexes, user_ids, options):
+        rng = self.rng
+        today = timezone.localdate()
+        trips, members, itinerary_items, expenses, splits, packing_items, checklist_items = [], [], [], [], [], [], []
+
+        for index in indexes:
+            start_date = today + timedelta(days=rng.randint(-60, 180))
+            days = rng.randint(2, 14)
+            end_date = start_date + timedelta(days=days - 1)
+            if end_date < today:
+                trip_status = TripStatus.COMPLETED
+            elif start_date <= today:
+                trip_status = TripStatus.ONGOING
+            else:
+                trip_status = TripStatus.PLANNING
+            owner_id = user_ids[index % len(user_ids)]
+            trip = Trip(
+                owner_id=owner_id,
+                title=f"Benchmark trip {index}",
+                destination=rng.choice(DESTINATIONS),
+                start_date=start_date,
+                end_date=end_date,
+                duration=days,
+                is_public=rng.random() < 0.6,
+                is_joinable=rng.random() < 0.7,
+                member_spots=options['members'] + rng.randint(0, 4),
+                budget=Decimal(rng.randint(100, 5000) * 10),
+                status=trip_status,
+                difficulty=rng.choice(TripDifficulty.values),
+            )
+            trips.append(trip)
+
+            # Sampling one extra id and dropping the owner avoids copying the user list for every trip
+            others = [user_id for user_id in rng.sample(user_ids, min(options['members'], len(user_ids))) if user_id != owner_id]
+            others = others[:options['members'] - 1]
+            trip_members = [TripMember(trip=trip, user_id=owner_id, role=MemberRole.ORGANIZER, status=MemberStatus.ACCEPTED)]
+            trip_members.extend(
+                TripMember(
+                    trip=trip,
+                    user_id=user_id,
+                    role=MemberRole.CO_ORGANIZER if rng.random() < 0.2 else MemberRole.MEMBER,
+                    status=MemberStatus.ACCEPTED if rng.random() < 0.9 else MemberStatus.PENDING,
+                )
+                for user_id in others
+            )
+            members.extend(trip_members)
+            accepted = [member for member in trip_members if member.status == MemberStatus.ACCEPTED]
+
+            for number in range(options['itinerary_items']):
+                day = start_date + timedelta(days=rng.randrange(days))
+                item = ItineraryItem(
+                    trip=trip,
+                    name=f"Stop {number}",
+                    address=f"Jalan Benchmark {number}, {trip.destination}",
+                    type_id=rng.choice(self.itinerary_types),
+                    latitude=Decimal(rng.uniform(-9, -6)).quantize(Decimal('0.000001')),
+                    longitude=Decimal(rng.uniform(106, 120)).quantize(Decimal('0.000001')),
+                    estimated_time=rng.choice(ESTIMATED_TIMES),
+                    visit_time=timezone.make_aware(datetime.combine(day, datetime.min.time()) + timedelta(minutes=rng.randrange(7 * 60, 21 * 60, 15))),
+                    status=rng.choice(ItineraryStatus.values),
+                )
+                item.update_geohash()
+                item.update_duration()
+                itinerary_items.append(item)
+
+            for number in range(options['expenses']):
+                paid_by = rng.choice(accepted)
+                amount = Decimal(rng.randint(1000, 100000)) / 100
+                expense = Expense(
+                    trip=trip,
+                    title=f"Expense {number}",
+                    amount=amount,
+                    date=start_date + timedelta(days=rng.randrange(days)),
+                    paid_by=paid_by,
+                    category_id=rng.choice(self.expense_categories),
+                )
+                expenses.append(expense)
+                # Even shares, with the rounding remainder on the payer so the splits add up to the amount
+                share = (amount / len(accepted)).quantize(CENT)
+                remainder = amount - share * len(accepted)
+                splits.extend(
+                    ExpenseSplit(
+                        expense=expense,
+                        member=member,
+                        amount=share + remainder if member is paid_by else share,
+                        paid=member is paid_by or rng.random() < 0.3,
+                    )
+                    for member in accepted
+                )
+
+            packing_items.extend(
+                PackingItem(
+                    trip=trip,
+                    name=f"Item {number}",
+                    category_id=rng.choice(self.packing_categories),
+                    quantity=rng.randint(1, 4),
+                    packed=rng.random() < 0.4,
+                    assigned_to=rng.choice(accepted) if rng.random() < 0.7 else None,
+                )
+                for number in range(options['packing_items'])
+            )
+
+            for number in range(options['checklist_items']):
+                due_date = start_date + timedelta(days=rng.randint(-21, days - 1))
+                checklist_items.append(ChecklistItem(
+                    trip=trip,
+                    title=f"Task {number}",
+                    priority=rng.choice(ChecklistPriority.values),
+                    due_date=due_date,
+                    category=get_checklist_category(due_date, start_date, end_date),
+                    is_completed=rng.random() < 0.3,
+                    assigned_to=rng.choice(accepted) if rng.random() < 0.7 else None,
+                    position=(number + 1) * RANK_GAP,
+                ))
+
+        # Parents first; primary keys are UUIDs generated here, so children can point at them right away
+        self.bulk_create(Trip, trips, 'trips')
+        self.bulk_create(TripMember, members, 'members')
+        self.bulk_create(ItineraryItem, itinerary_items, 'itinerary items')
+        self.bulk_create(Expense, expenses, 'expenses')
+        self.bulk_create(ExpenseSplit, splits, 'splits')
+        self.bulk_create(PackingItem, packing_items, 'packing items')
+        self.bulk_create(ChecklistItem, checklist_items, 'checklist items')
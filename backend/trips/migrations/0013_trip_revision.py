@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 18:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trips', '0012_alter_tripmember_options'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trip',
+            name='revision',
+            field=models.PositiveBigIntegerField(default=0, editable=False, help_text='Bumped by every write to the trip or its items'),
+        ),
+    ]
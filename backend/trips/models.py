@@ -25,6 +25,16 @@ class MemberRole(models.TextChoices):
     CO_ORGANIZER = 'CO_ORGANIZER', 'Co-Organizer'
     MEMBER = 'MEMBER', 'Member'
 
+class TripMemberQuerySet(models.QuerySet):
+    def with_expenses(self):
+        """Load the user and annotate `expenses_total`, the sum of the member's expense shares"""
+        # A correlated subquery, so the user columns do not end up in a GROUP BY over every split
+        ExpenseSplit = self.model._meta.get_field('expense_shares').related_model
+        shares = ExpenseSplit.objects.filter(member=models.OuterRef('pk')).order_by().values('member').annotate(
+            total=models.Sum('amount')
+        ).values('total')
+        return self.select_related('user').annotate(expenses_total=models.Subquery(shares))
+
 class TripMember(BaseModel):
     trip = models.ForeignKey('Trip', on_delete=models.CASCADE, related_name='trip_members')
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
@@ -34,6 +44,8 @@ class TripMember(BaseModel):
     emergency_contact_name = models.CharField(max_length=255, blank=True)
     emergency_contact_phone = models.CharField(max_length=20, blank=True)
     dietary_restrictions = models.TextField(blank=True)
+
+    objects = TripMemberQuerySet.as_manager()
     
     def __str__(self):
         return f"{self.user.email} - {self.trip.title} ({self.role})"
@@ -65,9 +77,21 @@ class Trip(BaseModel):
     difficulty = models.CharField(max_length=15, choices=TripDifficulty.choices, default=TripDifficulty.EASY)
     tags = models.ManyToManyField(Tag, related_name='trips', blank=True)
     is_joinable = models.BooleanField(default=True)
+    revision = models.PositiveBigIntegerField(default=0, editable=False, help_text="Bumped by every write to the trip or its items")
 
     def __str__(self):
         return self.title
+
+    def save(self, *args, **kwargs):
+        # Written as revision + 1 in the same UPDATE, so saving a stale instance can never move it backwards
+        if not self._state.adding:
+            self.revision = models.F('revision') + 1
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'revision'}
+        super().save(*args, **kwargs)
+        if isinstance(self.revision, models.Expression):
+            # Deferred, so the new value is loaded on access
+            del self.revision
     
     class Meta:
         ordering = ['-start_date']
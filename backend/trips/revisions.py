@@ -0,0 +1,58 @@
+"""
+Per-trip revision counter behind the ETags of trip-scoped endpoints.
+`Trip.save` moves it forward itself; writes to members, expenses, splits, itinerary,
+packing and checklist items bump it through `bump_trip_revision`.
+Profile changes bump every trip of the user through `bump_user_trip_revisions`, since members
+and owners are embedded in trip responses.
+"""
+import uuid
+from django.db.models import F, OuterRef, Q, Subquery
+from django.utils import timezone
+from django.utils.crypto import salted_hmac
+from django.utils.http import quote_etag
+from .models import Trip, TripMember
+
+
+def bump_trip_revision(*trip_ids):
+    """Move the revision of the given trips forward with a single UPDATE"""
+    trip_ids = [trip_id for trip_id in trip_ids if trip_id]
+    if trip_ids:
+        Trip.objects.filter(id__in=trip_ids).update(revision=F('revision') + 1)
+
+
+def bump_user_trip_revisions(user_id):
+    """Move the revision of every trip the user owns or belongs to forward with a single UPDATE"""
+    member_trips = TripMember.objects.filter(user_id=user_id).values('trip_id')
+    Trip.objects.filter(Q(owner_id=user_id) | Q(id__in=member_trips)).update(revision=F('revision') + 1)
+
+
+def trip_revision_etag(request, trip_id):
+    """
+    ETag of a trip-scoped GET, read with one query: the trip's revision, the caller's role in the trip,
+    the URL and the negotiated media type. The date is included for lists filtered relative to today.
+    Returns None for unknown trips.
+    """
+    try:
+        trip_id = uuid.UUID(str(trip_id))
+    except ValueError:
+        return None
+    trips = Trip.objects.filter(id=trip_id)
+    user_id = request.user.pk if request.user.is_authenticated else None
+    if user_id:
+        membership = TripMember.objects.filter(trip=OuterRef('pk'), user_id=user_id).order_by()
+        trips = trips.annotate(
+            member_role=Subquery(membership.values('role')[:1]),
+            member_status=Subquery(membership.values('status')[:1]),
+        )
+        row = trips.values_list('revision', 'owner_id', 'member_role', 'member_status').first()
+    else:
+        row = trips.values_list('revision', 'owner_id').first()
+    if row is None:
+        return None
+
+    revision, owner_id, *membership = row
+    role = 'OWNER' if user_id and owner_id == user_id else ':'.join(value or '' for value in membership)
+    fingerprint = '|'.join(str(value) for value in [
+        trip_id, revision, role, request.get_full_path(), request.accepted_media_type, timezone.localdate(),
+    ])
+    return quote_etag(salted_hmac('trips.revision_etag', fingerprint).hexdigest()[:32])
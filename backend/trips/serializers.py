@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 from django.utils.dateparse import parse_date
 from django.utils.text import slugify
@@ -7,13 +7,17 @@ from django.contrib.auth import get_user_model
 from .models import Trip, TripMember, MemberStatus, MemberRole, TripStatus, Tag
 from expenses.models import ExpenseSplit, Expense
 from itineraries.models import ItineraryItem, ItineraryStatus
+from checklist.models import recategorize_checklist_items
+from users.serializers import AvatarVariantsField
 
 User = get_user_model()
 
 class UserSerializer(serializers.ModelSerializer):
+    avatar_variants = AvatarVariantsField()
+
     class Meta:
         model = User
-        fields = ['id', 'email', 'first_name', 'last_name', 'phone']
+        fields = ['id', 'email', 'first_name', 'last_name', 'phone', 'avatar_variants']
         read_only_fields = ['id']
         
 class TagSerializer(serializers.ModelSerializer):
@@ -86,7 +90,7 @@ class TripMemberSerializer(serializers.ModelSerializer):
             if not email:
                 raise serializers.ValidationError("Either user_id or email must be provided.")
             try:
-                user_obj = User.objects.get(email=email)
+                user_obj = User.objects.get_by_email(email)
             except User.DoesNotExist:
                 user_obj = User.objects.create(
                     email=email,
@@ -137,11 +141,14 @@ class TripMemberSerializer(serializers.ModelSerializer):
         return super().update(instance, validated_data)
     
     def to_representation(self, instance):
-        """Add expenses field to the representation"""
+        """Add expenses field to the representation, annotated by `TripMember.objects.with_expenses()` when available"""
         representation = super().to_representation(instance)
-        expenses = ExpenseSplit.objects.filter(
-            member=instance
-        ).aggregate(total=models.Sum('amount'))['total'] or 0
+        if hasattr(instance, 'expenses_total'):
+            expenses = instance.expenses_total or 0
+        else:
+            expenses = ExpenseSplit.objects.filter(
+                member=instance
+            ).aggregate(total=models.Sum('amount'))['total'] or 0
         representation['expenses'] = expenses
         return representation
 
@@ -237,9 +244,14 @@ class TripSerializer(serializers.ModelSerializer):
 
         return trip
     
+    @transaction.atomic
     def update(self, instance, validated_data):
         """Remove owner because we don't want to update it"""
         validated_data.pop('owner', None)
+        dates_changed = (
+            validated_data.get('start_date', instance.start_date) != instance.start_date
+            or validated_data.get('end_date', instance.end_date) != instance.end_date
+        )
         
         # Handle new tag ids
         tags = list(instance.tags.all())
@@ -271,17 +283,32 @@ class TripSerializer(serializers.ModelSerializer):
 
         instance = super().update(instance, validated_data)
         instance.tags.set(tags)
+
+        # Checklist categories are relative to the trip dates
+        if dates_changed:
+            recategorize_checklist_items(instance)
         return instance
     
+    def get_membership(self, obj):
+        """The caller's accepted membership of the trip, read from `trip_members` so a prefetch is reused"""
+        request = self.context.get('request')
+        if not request or not request.user.is_authenticated:
+            return None
+        return next(
+            (member for member in obj.trip_members.all() if member.user_id == request.user.id and member.status == MemberStatus.ACCEPTED),
+            None
+        )
+
     def get_is_editable(self, obj):
         request = self.context.get('request')
         if not request or not request.user.is_authenticated:
             return False
         
         user = request.user
-        if user == obj.owner and obj.status != TripStatus.DELETED:
+        if user.id == obj.owner_id and obj.status != TripStatus.DELETED:
             return True
-        elif obj.trip_members.filter(user=user, status=MemberStatus.ACCEPTED).exclude(role=MemberRole.MEMBER).exists() and obj.status != TripStatus.DELETED:
+        membership = self.get_membership(obj)
+        if membership and membership.role != MemberRole.MEMBER and obj.status != TripStatus.DELETED:
             return True
         return False
 
@@ -291,42 +318,37 @@ class TripSerializer(serializers.ModelSerializer):
             return False
         
         user = request.user
-        if user == obj.owner and obj.status != TripStatus.DELETED:
+        if user.id == obj.owner_id and obj.status != TripStatus.DELETED:
             return True
         return False
 
     def get_is_member(self, obj):
-        request = self.context.get('request')
-        if not request or not request.user.is_authenticated:
-            return False
-        
-        user = request.user
-        return obj.trip_members.filter(user=user, status=MemberStatus.ACCEPTED).exists()
+        return self.get_membership(obj) is not None
     
     def to_representation(self, instance):
-        """Add highlights field to the representation"""
+        """
+        Add highlights, budget and membership fields to the representation.
+        `TripViewSet` prefetches and annotates them; other callers fall back to querying.
+        """
         representation = super().to_representation(instance)
-        highlights = ItineraryItem.objects.filter(
-            trip=instance
-        ).exclude(
-            status=ItineraryStatus.SKIPPED
-        ).values_list('name', flat=True)
-        spent_budget = Expense.objects.filter(
-            trip=instance
-        ).aggregate(total=models.Sum('amount'))['total'] or 0
-        members_count = TripMember.objects.filter(
-            trip=instance,
-            status=MemberStatus.ACCEPTED
-        ).count()
-        user_role = None
-        if self.context and self.context.get('request') and self.context['request'].user.is_authenticated:
-            user_role = TripMember.objects.filter(
-                trip=instance,
-                user=self.context['request'].user,
-                status=MemberStatus.ACCEPTED
-            ).values_list('role', flat=True).first()
+        if hasattr(instance, 'highlight_items'):
+            highlights = [item.name for item in instance.highlight_items]
+        else:
+            highlights = ItineraryItem.objects.filter(
+                trip=instance
+            ).exclude(
+                status=ItineraryStatus.SKIPPED
+            ).values_list('name', flat=True)
+        if hasattr(instance, 'spent_budget'):
+            spent_budget = instance.spent_budget or 0
+        else:
+            spent_budget = Expense.objects.filter(
+                trip=instance
+            ).aggregate(total=models.Sum('amount'))['total'] or 0
+        members_count = sum(1 for member in instance.trip_members.all() if member.status == MemberStatus.ACCEPTED)
+        membership = self.get_membership(instance)
         representation['spent_budget'] = spent_budget
         representation['highlights'] = list(highlights)
         representation['members_count'] = members_count
-        representation['user_role'] = user_role
+        representation['user_role'] = membership.role if membership else None
         return representation
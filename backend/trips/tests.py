@@ -1,12 +1,23 @@
-from django.test import TestCase
+import warnings
+from django.test import AsyncClient, TestCase
 from django.urls import reverse
 from rest_framework.test import APIClient, APITestCase
 from rest_framework import status
 from django.contrib.auth import get_user_model
 from datetime import date, timedelta
 from decimal import Decimal
+from django.utils import timezone
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Sum
+from django.test.utils import CaptureQueriesContext
+from io import StringIO
 
 from .models import Trip, TripMember, TripStatus, MemberStatus, MemberRole
+from .revisions import bump_trip_revision
+from itineraries.models import ItineraryItem
+from checklist.models import ChecklistItem
+from expenses.models import Expense
 
 User = get_user_model()
 
@@ -152,3 +163,129 @@ class TripAPITests(APITestCase):
         self.assertEqual(resp.status_code, status.HTTP_200_OK)
         member.refresh_from_db()
         self.assertEqual(member.status, MemberStatus.ACCEPTED)
+
+
+class TripCalendarFeedTests(APITestCase):
+    """Tests for the tokenized iCalendar feed"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.owner = User.objects.create_user(email="calendar@example.com", password="testpass123")
+        self.trip = Trip.objects.create(
+            owner=self.owner,
+            title="Calendar Trip",
+            destination="Ubud",
+            start_date=date.today() + timedelta(days=3),
+            end_date=date.today() + timedelta(days=5),
+        )
+        ItineraryItem.objects.create(
+            trip=self.trip, name="Monkey Forest, Ubud", visit_time=timezone.now() + timedelta(days=4)
+        )
+        ChecklistItem.objects.create(trip=self.trip, title="Book driver", due_date=date.today() + timedelta(days=2))
+        self.client.force_authenticate(user=self.owner)
+        resp = self.client.get(reverse("trip-calendar", kwargs={"trip_id": self.trip.id}))
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.feed_url = resp.data["url"]
+        self.client.force_authenticate(user=None)
+
+    def test_feed_renders_events_and_supports_conditional_get(self):
+        resp = self.client.get(self.feed_url, HTTP_ACCEPT="text/calendar")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        body = b"".join(resp.streaming_content).decode()
+        self.assertTrue(body.startswith("BEGIN:VCALENDAR\r\n"))
+        self.assertIn("SUMMARY:Monkey Forest\\, Ubud", body)
+        self.assertIn("SUMMARY:Book driver", body)
+
+        resp = self.client.get(self.feed_url, HTTP_IF_NONE_MATCH=resp["ETag"])
+        self.assertEqual(resp.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    async def test_feed_streams_asynchronously_under_asgi(self):
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            resp = await AsyncClient().get(self.feed_url, HTTP_ACCEPT="text/calendar")
+            chunks = [chunk async for chunk in resp]
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertTrue(resp.is_async)
+        self.assertGreater(len(chunks), 1)
+        self.assertIn("SUMMARY:Book driver", b"".join(chunks).decode())
+        self.assertFalse([warning for warning in caught if "iterators" in str(warning.message)])
+
+    def test_feed_rejects_invalid_token(self):
+        url = reverse("trip-calendar-feed", kwargs={"trip_id": self.trip.id}) + "?token=invalid"
+        resp = self.client.get(url)
+        self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class TripRevisionETagTests(APITestCase):
+    """Tests for conditional GETs keyed on the trip revision"""
+
+    def setUp(self):
+        self.owner = User.objects.create_user(email="revision-owner@example.com", password="testpass123")
+        self.member = User.objects.create_user(email="revision-member@example.com", password="testpass123")
+        self.trip = Trip.objects.create(
+            owner=self.owner, title="Revision Trip", destination="Flores",
+            start_date=date.today() + timedelta(days=10), end_date=date.today() + timedelta(days=12),
+        )
+        self.organizer = TripMember.objects.create(trip=self.trip, user=self.owner, role=MemberRole.ORGANIZER, status=MemberStatus.ACCEPTED)
+        TripMember.objects.create(trip=self.trip, user=self.member, status=MemberStatus.ACCEPTED)
+        self.client.force_authenticate(user=self.owner)
+
+    def test_unchanged_statistics_return_304_until_the_trip_is_written(self):
+        url = reverse("expense-statistics", kwargs={"trip_id": self.trip.id})
+        etag = self.client.get(url)["ETag"]
+
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(resp["ETag"], etag)
+        self.assertFalse([query for query in queries if "expenses_expense" in query["sql"]])
+
+        resp = self.client.post(reverse("checklist-item-list", kwargs={"trip_id": self.trip.id}), {"title": "Book ferry", "assigned_to_id": str(self.organizer.id)}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+        resp = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(resp["ETag"], etag)
+
+    def test_profile_change_invalidates_trip_etags(self):
+        url = reverse("trip-member-list", kwargs={"trip_id": self.trip.id})
+        etag = self.client.get(url)["ETag"]
+
+        self.client.force_authenticate(user=self.member)
+        self.assertEqual(self.client.patch(reverse("user_detail"), {"first_name": "Renamed"}, format="json").status_code, status.HTTP_200_OK)
+
+        self.client.force_authenticate(user=self.owner)
+        resp = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertIn("Renamed", [member["user"]["first_name"] for member in resp.data])
+
+    def test_etag_depends_on_role_and_revision_never_moves_backwards(self):
+        url = reverse("trip-detail", kwargs={"pk": self.trip.id})
+        owner_etag = self.client.get(url)["ETag"]
+        self.client.force_authenticate(user=self.member)
+        self.assertNotEqual(self.client.get(url)["ETag"], owner_etag)
+
+        stale = Trip.objects.get(id=self.trip.id)
+        bump_trip_revision(self.trip.id)
+        bump_trip_revision(self.trip.id)
+        stale.title = "Renamed"
+        stale.save()
+        self.trip.refresh_from_db()
+        self.assertEqual(self.trip.revision, 3)
+        self.assertEqual(stale.revision, 3)
+
+
+class SeedBenchmarkDataTests(TestCase):
+    def test_seeds_requested_rows_with_balanced_splits(self):
+        call_command(
+            "seed_benchmark_data", users=10, trips=4, members=3, itinerary_items=2, expenses=3,
+            packing_items=2, checklist_items=2, chunk_size=3, stdout=StringIO(),
+        )
+
+        self.assertEqual(User.objects.filter(email__startswith="bench-").count(), 10)
+        self.assertEqual(Trip.objects.count(), 4)
+        self.assertEqual(TripMember.objects.count(), 12)
+        self.assertEqual(ItineraryItem.objects.count(), 8)
+        self.assertEqual(ChecklistItem.objects.count(), 8)
+        for expense in Expense.objects.annotate(split_total=Sum("splits__amount")):
+            self.assertEqual(expense.split_total, expense.amount)
+        self.assertTrue(self.client.login(email="bench-0@example.com", password="Bench12#$"))
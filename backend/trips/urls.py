@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import TripViewSet, TripMemberViewSet, TripMemberStatisticsView, TripItinerarySummaryView, TripStatisticsView, TagListView, JoinTripView
+from .views import TripViewSet, TripMemberViewSet, TripMemberStatisticsView, TripItinerarySummaryView, TripStatisticsView, TagListView, JoinTripView, TripCalendarLinkView, TripCalendarFeedView
 
 router = DefaultRouter()
 router.register(r'trips', TripViewSet, basename='trip')
@@ -16,4 +16,6 @@ urlpatterns = [
     path('trips/<uuid:trip_id>/members/statistics/', TripMemberStatisticsView.as_view(), name='trip-member-statistics'),
     path('trips/<uuid:trip_id>/itineraries/summary/', TripItinerarySummaryView.as_view(), name='trip-itinerary-summary'),
     path('trips/<uuid:trip_id>/join/', JoinTripView.as_view(), name='join-trip'),
+    path('trips/<uuid:trip_id>/calendar/', TripCalendarLinkView.as_view(), name='trip-calendar'),
+    path('trips/<uuid:trip_id>/calendar.ics', TripCalendarFeedView.as_view(), name='trip-calendar-feed'),
 ]
@@ -2,28 +2,41 @@ from rest_framework import status, generics
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
-from django.db.models import Q
+from django.db.models import Count, OuterRef, Prefetch, Q, Subquery, Sum
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.tokens import default_token_generator
 
 from .models import Trip, TripStatus, MemberStatus, TripMember, Tag
 from .serializers import TripSerializer, TripMemberSerializer, TagSerializer
 from .permissions import IsTripAccessible, IsMemberAccessible
-from expenses.models import ExpenseSplit
-from itineraries.models import ItineraryItem
+from expenses.models import Expense, ExpenseSplit
+from itineraries.models import ItineraryItem, ItineraryStatus
 from checklist.models import ChecklistItem
 from datetime import timedelta
 from backend.services import send_templated_email
+from notifications.digest import queue_notification
+from backend.async_views import AsyncAPIView
+from backend.mixins import TripRevisionMixin
+from backend.permissions import IsStatisticAccessible
 from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils import timezone
+from django.utils.http import http_date, quote_etag, urlencode
+import hashlib
+from .calendar import make_calendar_token, read_calendar_token, agenerate_calendar, generate_calendar
 
 User = get_user_model()
 
-class TripViewSet(ModelViewSet):
+class TripViewSet(TripRevisionMixin, ModelViewSet):
     """
     ViewSet for Trip CRUD operations with custom actions
     """
     serializer_class = TripSerializer
+    revision_trip_kwarg = 'pk'
     
     def get_permissions(self):
         if self.action in ['list', 'retrieve']:
@@ -33,7 +46,16 @@ class TripViewSet(ModelViewSet):
         return [permission() for permission in permission_classes]
 
     def get_queryset(self):
-        qs = Trip.objects.select_related('owner').prefetch_related('trip_members__user').all()
+        spent_budget = Expense.objects.filter(trip=OuterRef('pk')).order_by().values('trip').annotate(total=Sum('amount')).values('total')
+        qs = Trip.objects.select_related('owner').prefetch_related(
+            'trip_members__user',
+            'tags',
+            Prefetch(
+                'itinerary_items',
+                queryset=ItineraryItem.objects.exclude(status=ItineraryStatus.SKIPPED).only('id', 'trip_id', 'name', 'visit_time'),
+                to_attr='highlight_items'
+            ),
+        ).annotate(spent_budget=Subquery(spent_budget))
         
         if self.action == "list":
             is_public = self.request.query_params.get("is_public")
@@ -73,7 +95,7 @@ class TripViewSet(ModelViewSet):
         trip.save()
         return Response(status=204)
     
-class TripMemberViewSet(ModelViewSet):
+class TripMemberViewSet(TripRevisionMixin, ModelViewSet):
     """
     ViewSet for TripMember CRUD operations
     """
@@ -81,7 +103,7 @@ class TripMemberViewSet(ModelViewSet):
     permission_classes = [IsAuthenticated, IsMemberAccessible]
 
     def get_queryset(self):
-        qs = TripMember.objects.filter(trip_id=self.kwargs.get('trip_id'))
+        qs = TripMember.objects.with_expenses().filter(trip_id=self.kwargs.get('trip_id'))
         
         if self.action == "list":
             status = self.request.query_params.get("status")
@@ -95,6 +117,7 @@ class TripMemberViewSet(ModelViewSet):
         context['trip'] = self.kwargs.get('trip_id')
         return context
 
+    @transaction.atomic
     def perform_create(self, serializer):
         instance = serializer.save()
         
@@ -126,42 +149,40 @@ class TripMemberViewSet(ModelViewSet):
         
         return super().perform_create(serializer)
     
+    @transaction.atomic
     def perform_update(self, serializer):
         old_instance = self.get_object()
         new_instance = serializer.save()
-        # Notify member via email if status changed
+        # Notify member of status changes; bursts of changes are coalesced into a digest
         if old_instance.status != new_instance.status:
             if new_instance.status == MemberStatus.ACCEPTED:
-                send_templated_email(
-                    recipient_email=new_instance.user.email,
+                queue_notification(
+                    recipient=new_instance.user,
+                    trip=new_instance.trip,
                     subject=f"You've Been Accepted to Join Trip: {new_instance.trip.title}",
                     template_name='trip_membership_accepted',
                     context={
-                        'user': new_instance.user,
-                        'trip': new_instance.trip,
                         'login_url': settings.FRONTEND_URL + '/login?redirect=/trips/' + str(new_instance.trip.id) + '/manage',
                     }
                 )
             elif new_instance.status == MemberStatus.DECLINED:
-                send_templated_email(
-                    recipient_email=new_instance.user.email,
+                queue_notification(
+                    recipient=new_instance.user,
+                    trip=new_instance.trip,
                     subject=f"Your Request to Join Trip: {new_instance.trip.title} has Been Declined",
                     template_name='trip_membership_declined',
                     context={
-                        'user': new_instance.user,
-                        'trip': new_instance.trip,
                         'login_url': settings.FRONTEND_URL + '/login?redirect=/trips/' + str(new_instance.trip.id),
                         'trips_url': settings.FRONTEND_URL + '/login',
                     }
                 )
             elif new_instance.status == MemberStatus.BLOCKED:
-                send_templated_email(
-                    recipient_email=new_instance.user.email,
+                queue_notification(
+                    recipient=new_instance.user,
+                    trip=new_instance.trip,
                     subject=f"You've Been Blocked from Trip: {new_instance.trip.title}",
                     template_name='trip_membership_blocked',
                     context={
-                        'user': new_instance.user,
-                        'trip': new_instance.trip,
                         'login_url': settings.FRONTEND_URL + '/login?redirect=/trips/' + str(new_instance.trip.id),
                     }
                 )
@@ -170,31 +191,34 @@ class TripMemberViewSet(ModelViewSet):
                 pass
         super().perform_update(serializer)
     
-class TripMemberStatisticsView(generics.RetrieveAPIView):
+class TripMemberStatisticsView(TripRevisionMixin, AsyncAPIView):
     """
     View to get statistics of trip members by their status
     """
     permission_classes = [IsAuthenticated, IsTripAccessible]
 
-    def get(self, request, trip_id=None):
-        total = TripMember.objects.filter(trip_id=trip_id).count()
-        pending = TripMember.objects.filter(trip_id=trip_id, status=MemberStatus.PENDING).count()
-        accepted = TripMember.objects.filter(trip_id=trip_id, status=MemberStatus.ACCEPTED).count()
-        declined = TripMember.objects.filter(trip_id=trip_id, status=MemberStatus.DECLINED).count()
-        blocked = TripMember.objects.filter(trip_id=trip_id, status=MemberStatus.BLOCKED).count()
-        # Calculate total expenses for all accepted members
-        accepted_members = TripMember.objects.filter(trip_id=trip_id, status=MemberStatus.ACCEPTED)
-        total_expenses = sum(
-            ExpenseSplit.objects.filter(
-            expense__trip_id=trip_id,
-            member=member
-            ).aggregate(total=models.Sum('amount'))['total'] or 0
-            for member in accepted_members
+    async def get(self, request, trip_id=None):
+        counts, total_expenses = await self.gather(
+            lambda: TripMember.objects.filter(trip_id=trip_id).aggregate(
+                total=Count('id'),
+                pending=Count('id', filter=Q(status=MemberStatus.PENDING)),
+                accepted=Count('id', filter=Q(status=MemberStatus.ACCEPTED)),
+                declined=Count('id', filter=Q(status=MemberStatus.DECLINED)),
+                blocked=Count('id', filter=Q(status=MemberStatus.BLOCKED)),
+            ),
+            # Calculate total expenses for all accepted members
+            lambda: ExpenseSplit.objects.filter(
+                expense__trip_id=trip_id,
+                member__trip_id=trip_id,
+                member__status=MemberStatus.ACCEPTED
+            ).aggregate(total=models.Sum('amount'))['total'] or 0,
+        )
+        total, pending, accepted, declined, blocked = (
+            counts['total'], counts['pending'], counts['accepted'], counts['declined'], counts['blocked']
         )
         
         # Calculate average expense
-        accepted_count = accepted_members.count()
-        average_expense = total_expenses / accepted_count if accepted_count > 0 else 0
+        average_expense = total_expenses / accepted if accepted > 0 else 0
 
         return Response({
             "total": total,
@@ -206,7 +230,7 @@ class TripMemberStatisticsView(generics.RetrieveAPIView):
             "total_expenses": total_expenses,
         })
         
-class TripItinerarySummaryView(generics.RetrieveAPIView):
+class TripItinerarySummaryView(TripRevisionMixin, generics.RetrieveAPIView):
     """
     View to get itinerary summary for a trip
     """
@@ -219,9 +243,20 @@ class TripItinerarySummaryView(generics.RetrieveAPIView):
         if not start_date or not end_date:
             return Response({"detail": "Trip dates are not set."}, status=status.HTTP_400_BAD_REQUEST)
 
-        allChecklistItems = ChecklistItem.objects.filter(trip_id=trip_id)
-        allLocations = ItineraryItem.objects.filter(trip_id=trip_id)
-
+        # One grouped query per domain, bucketed by day in Python
+        task_counts = {
+            row['due_date']: row
+            for row in ChecklistItem.objects.filter(
+                trip_id=trip_id, due_date__range=(start_date, end_date)
+            ).order_by().values('due_date').annotate(
+                tasks=Count('id'), tasks_completed=Count('id', filter=Q(is_completed=True))
+            )
+        }
+        locations_by_day = {}
+        for loc in ItineraryItem.objects.filter(
+            trip_id=trip_id, visit_time__date__range=(start_date, end_date)
+        ).only('name', 'address', 'status', 'visit_time'):
+            locations_by_day.setdefault(timezone.localtime(loc.visit_time).date(), []).append(loc)
 
         summary = []
         day_count = (end_date - start_date).days + 1
@@ -231,23 +266,16 @@ class TripItinerarySummaryView(generics.RetrieveAPIView):
             # "Month Day" label like "March 17"
             date_label = f"{d.strftime('%B')} {d.day}"
 
-            tasks = allChecklistItems.filter(due_date=d).count()
-            tasks_completed = allChecklistItems.filter(
-                due_date=d, is_completed=True
-            ).count()
-            
-            locations = allLocations.filter(
-                visit_time__date=d
-            ).only('name', 'address', 'status')
-            locations_visited = locations.filter(status='VISITED').count()
+            counts = task_counts.get(d, {})
+            locations = locations_by_day.get(d, [])
 
             summary.append({
                 "date": date_label,
                 "locations": [loc.address for loc in locations],
                 "itineraries": [loc.name for loc in locations],
-                "tasks": tasks,
-                "locations_visited": locations_visited,
-                "tasks_completed": tasks_completed,
+                "tasks": counts.get('tasks', 0),
+                "locations_visited": sum(1 for loc in locations if loc.status == 'VISITED'),
+                "tasks_completed": counts.get('tasks_completed', 0),
             })
         
         
@@ -264,12 +292,9 @@ class TripStatisticsView(generics.RetrieveAPIView):
         total = tripObjects.count()
         average_budget = tripObjects.aggregate(models.Avg('budget'))['budget__avg'] or 0
         
-        joinable = 0
-        joinableTrips = tripObjects.filter(is_joinable=True)
-        for trip in joinableTrips:
-            accepted_members_count = TripMember.objects.filter(trip=trip, status=MemberStatus.ACCEPTED).count()
-            if accepted_members_count < trip.member_spots:
-                joinable += 1
+        joinable = tripObjects.filter(is_joinable=True).annotate(
+            accepted_members_count=Count('trip_members', filter=Q(trip_members__status=MemberStatus.ACCEPTED))
+        ).filter(accepted_members_count__lt=models.F('member_spots')).count()
         
         destinations = set()
         for destination in tripObjects.values_list('destination', flat=True).distinct():
@@ -307,12 +332,13 @@ class TagListView(generics.ListAPIView):
     queryset = Tag.objects.all()
 
 
-class JoinTripView(generics.CreateAPIView):
+class JoinTripView(TripRevisionMixin, generics.CreateAPIView):
     """
     View to handle joining a trip
     """
     permission_classes = [IsAuthenticated]
 
+    @transaction.atomic
     def post(self, request, trip_id=None):
         user = request.user
         trip = Trip.objects.filter(id=trip_id, is_joinable=True).first()
@@ -331,17 +357,98 @@ class JoinTripView(generics.CreateAPIView):
         
         TripMember.objects.create(trip=trip, user=user, status=MemberStatus.PENDING)
         
-        # Notify trip owner via email
-        send_templated_email(
-            recipient_email=trip.owner.email,
+        # Notify trip owner; many join requests in a short time arrive as one digest
+        queue_notification(
+            recipient=trip.owner,
+            actor=user,
+            trip=trip,
             subject=f"New Join Request for Trip: {trip.title}",
             template_name='join_trip_request',
             context={
-                'owner': trip.owner,
-                'trip': trip,
-                'requester': user,
                 'login_url': settings.FRONTEND_URL + '/login?redirect=/trips/' + str(trip.id) + '/manage?tab=members',
             }
         )
         
         return Response({"detail": "Join request sent."}, status=status.HTTP_201_CREATED)
+
+
+class TripCalendarLinkView(generics.RetrieveAPIView):
+    """
+    View to get the personal iCalendar feed URL of a trip
+    """
+    permission_classes = [IsAuthenticated, IsStatisticAccessible]
+
+    def get(self, request, trip_id=None):
+        token = make_calendar_token(trip_id, request.user.id)
+        path = reverse('trip-calendar-feed', kwargs={'trip_id': trip_id})
+        url = request.build_absolute_uri(path) + '?' + urlencode({'token': token})
+        return Response({"url": url})
+
+
+class TripCalendarFeedView(generics.GenericAPIView):
+    """
+    View to serve a trip itinerary and checklist as an iCalendar feed.
+    Access is granted by the signed token, since calendar clients cannot send the JWT cookie.
+    """
+    authentication_classes = []
+    permission_classes = []
+
+    def perform_content_negotiation(self, request, force=False):
+        # Calendar clients ask for text/calendar; the streamed feed bypasses renderers and errors fall back to JSON
+        return super().perform_content_negotiation(request, force=True)
+
+    def get(self, request, trip_id=None):
+        payload = read_calendar_token(request.query_params.get('token', ''))
+        if payload is None or payload[0] != str(trip_id):
+            return Response({"detail": "Calendar not found."}, status=status.HTTP_404_NOT_FOUND)
+        user_id = payload[1]
+
+        trip = Trip.objects.filter(id=trip_id).exclude(status=TripStatus.DELETED).only('title', 'owner_id', 'is_public', 'updated_at').first()
+        if not trip:
+            return Response({"detail": "Calendar not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        is_member = str(trip.owner_id) == user_id or TripMember.objects.filter(
+            trip=trip, user_id=user_id, status=MemberStatus.ACCEPTED
+        ).exists()
+        if not is_member and not trip.is_public:
+            return Response({"detail": "Calendar not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        itinerary_items = ItineraryItem.objects.filter(trip=trip, visit_time__isnull=False)
+        checklist_items = ChecklistItem.objects.filter(trip=trip, due_date__isnull=False) if is_member else ChecklistItem.objects.none()
+
+        # Item counts catch deletions, which do not move the latest updated_at
+        itinerary_state = itinerary_items.aggregate(count=models.Count('id'), last=models.Max('updated_at'))
+        checklist_state = checklist_items.aggregate(count=models.Count('id'), last=models.Max('updated_at'))
+        last_modified = max(
+            value for value in [trip.updated_at, itinerary_state['last'], checklist_state['last']] if value is not None
+        )
+        fingerprint = '|'.join(str(value) for value in [
+            trip.id, trip.updated_at.isoformat(), is_member,
+            itinerary_state['count'], itinerary_state['last'],
+            checklist_state['count'], checklist_state['last'],
+        ])
+        etag = quote_etag(hashlib.sha256(fingerprint.encode()).hexdigest()[:32])
+        last_modified_timestamp = int(last_modified.timestamp())
+
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified_timestamp)
+        if not_modified is not None:
+            return not_modified
+
+        itinerary_rows = itinerary_items.order_by('visit_time').values(
+            'id', 'name', 'address', 'description', 'latitude', 'longitude', 'visit_time', 'duration_minutes', 'updated_at'
+        )
+        checklist_rows = checklist_items.order_by('due_date').values(
+            'id', 'title', 'description', 'due_date', 'is_completed', 'updated_at'
+        )
+        # ASGI servers buffer synchronous iterators in full, WSGI servers cannot run asynchronous ones
+        if isinstance(request._request, ASGIRequest):
+            content = agenerate_calendar(trip, itinerary_rows.aiterator(), checklist_rows.aiterator())
+        else:
+            content = generate_calendar(trip, itinerary_rows.iterator(), checklist_rows.iterator())
+
+        response = StreamingHttpResponse(content, content_type='text/calendar; charset=utf-8')
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified_timestamp)
+        response['Cache-Control'] = 'private, no-cache'
+        response['Content-Disposition'] = 'inline; filename="trip.ics"'
+        return response
@@ -0,0 +1,59 @@
+import hashlib
+import os
+from io import BytesIO
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+# Square edge length in pixels of each variant, sized for 2x displays
+AVATAR_VARIANTS = {
+    'small': 96,
+    'medium': 320,
+}
+AVATAR_FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+
+def generate_avatar_variants(avatar):
+    """
+    Decode an uploaded avatar once and store a resized WebP and JPEG copy per variant next to it.
+    Variant names carry a digest of the original, so a new upload never reuses a cached URL.
+    Returns `{variant: {format: name}}`.
+    """
+    avatar.open('rb')
+    try:
+        data = avatar.read()
+    finally:
+        avatar.close()
+
+    digest = hashlib.sha256(data).hexdigest()[:12]
+    stem = os.path.splitext(os.path.basename(avatar.name))[0]
+    directory = os.path.join(os.path.dirname(avatar.name), 'variants')
+
+    with Image.open(BytesIO(data)) as source:
+        image = ImageOps.exif_transpose(source).convert('RGB')
+
+    variants = {}
+    for variant, edge in AVATAR_VARIANTS.items():
+        resized = ImageOps.fit(image, (edge, edge), Image.Resampling.LANCZOS)
+        variants[variant] = {}
+        for extension, (image_format, options) in AVATAR_FORMATS.items():
+            buffer = BytesIO()
+            resized.save(buffer, image_format, **options)
+            name = os.path.join(directory, f'{stem}-{digest}-{variant}.{extension}')
+            variants[variant][extension] = avatar.storage.save(name, ContentFile(buffer.getvalue()))
+    return variants
+
+
+def delete_avatar_variants(storage, variants):
+    for names in variants.values():
+        for name in names.values():
+            storage.delete(name)
+
+
+def delete_avatar(storage, name, variants):
+    """Delete a stored original and its variants"""
+    if name:
+        storage.delete(name)
+    delete_avatar_variants(storage, variants or {})
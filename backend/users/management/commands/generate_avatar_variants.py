@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from users.avatars import generate_avatar_variants
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = "Create resized avatar variants for users whose avatar was uploaded before variants existed."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help="Regenerate variants for every avatar")
+
+    def handle(self, *args, **options):
+        users = User.objects.exclude(avatar='').exclude(avatar__isnull=True)
+        if not options['all']:
+            users = users.filter(avatar_variants={})
+
+        count = 0
+        for user in users.only('id', 'avatar', 'avatar_variants').iterator():
+            user.avatar_variants = generate_avatar_variants(user.avatar)
+            user.save(update_fields=['avatar_variants'])
+            count += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Generated avatar variants for {count} user(s)."))
@@ -1,16 +1,29 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
 from django.conf import settings
 
 class JWTCookieToAuthHeaderMiddleware:
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        self.add_auth_header(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        self.add_auth_header(request)
+        return await self.get_response(request)
+
+    def add_auth_header(self, request):
         # Get JWT token from cookies
         jwt_token = request.COOKIES.get(settings.SIMPLE_JWT['AUTH_COOKIE'])
 
         # If found, add to Authorization header
         if jwt_token:
             request.META['HTTP_AUTHORIZATION'] = f'Bearer {jwt_token}'
-            
-        response = self.get_response(request)
-        return response
@@ -1,6 +1,8 @@
 from django.contrib.auth.models import AbstractUser, BaseUserManager
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Lower
 from backend.models import BaseModel
+from .avatars import delete_avatar, generate_avatar_variants
 
 class UserManager(BaseUserManager):
     def create_user(self, email, password=None, **extra_fields):
@@ -23,11 +25,27 @@ class UserManager(BaseUserManager):
 
         return self.create_user(email, password, **extra_fields)
 
+    def filter_by_email(self, email):
+        """Case-insensitive email match that can seek the `Lower(email)` index"""
+        return self.alias(email_lower=Lower('email')).filter(email_lower=email.lower())
+
+    def get_by_email(self, email):
+        """
+        The user with this email in any letter case. Accounts created before emails were matched
+        case-insensitively can differ only in case; the exact match, else the oldest, wins then.
+        Raises DoesNotExist when there is none.
+        """
+        users = list(self.filter_by_email(email).order_by('date_joined'))
+        if not users:
+            raise self.model.DoesNotExist(f"No user with email {email!r}.")
+        return next((user for user in users if user.email == email), users[0])
+
 class User(AbstractUser, BaseModel):
     """Extended user model for Jelajah"""
     username = None  # Remove username field
     bio = models.TextField(blank=True)
     avatar = models.ImageField(upload_to='avatars/', null=True, blank=True)
+    avatar_variants = models.JSONField(default=dict, blank=True, editable=False)
     email = models.EmailField(unique=True, max_length=255)
     phone = models.CharField(max_length=20, blank=True)
 
@@ -36,5 +54,41 @@ class User(AbstractUser, BaseModel):
     
     objects = UserManager()
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(Lower('email'), name='user_email_lower_idx'),
+            models.Index(Lower('first_name'), name='user_first_name_lower_idx'),
+            models.Index(Lower('last_name'), name='user_last_name_lower_idx'),
+        ]
+
     def __str__(self):
         return self.email
+
+    def update_avatar_variants(self):
+        """
+        Store a new upload and its resized variants, or drop the variants of a removed avatar.
+        The files of the avatar being replaced or removed are deleted once the change commits.
+        """
+        replaced = bool(self.avatar) and not self.avatar._committed
+        removed = not self.avatar and bool(self.avatar_variants)
+        if not (replaced or removed):
+            return False
+
+        previous = None
+        if not self._state.adding:
+            previous = type(self).objects.filter(pk=self.pk).values_list('avatar', 'avatar_variants').first()
+        if replaced:
+            self.avatar.save(self.avatar.name, self.avatar.file, save=False)
+            self.avatar_variants = generate_avatar_variants(self.avatar)
+        else:
+            self.avatar_variants = {}
+        if previous:
+            storage = self.avatar.storage
+            transaction.on_commit(lambda: delete_avatar(storage, *previous), using=self._state.db)
+        return True
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if self.update_avatar_variants() and update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'avatar', 'avatar_variants'}
+        super().save(*args, **kwargs)
@@ -3,16 +3,41 @@ from django.contrib.auth import get_user_model
 
 User = get_user_model()
 
+class AvatarVariantsField(serializers.ReadOnlyField):
+    """URLs of the resized avatar variants, as `{variant: {format: url}}`"""
+
+    def to_representation(self, variants):
+        storage = User._meta.get_field('avatar').storage
+        request = self.context.get('request')
+        representation = {}
+        for variant, names in variants.items():
+            urls = {extension: storage.url(name) for extension, name in names.items()}
+            if request is not None:
+                urls = {extension: request.build_absolute_uri(url) for extension, url in urls.items()}
+            representation[variant] = urls
+        return representation
+
 class UserSerializer(serializers.ModelSerializer):
+    avatar_variants = AvatarVariantsField()
+
     class Meta:
         model = User
-        fields = ['id', 'email', 'first_name', 'last_name', 'bio', 'avatar']
+        fields = ['id', 'email', 'first_name', 'last_name', 'bio', 'avatar', 'avatar_variants']
         read_only_fields = ['id', 'email']
 
+class UserAutocompleteSerializer(serializers.ModelSerializer):
+    avatar_variants = AvatarVariantsField()
+
+    class Meta:
+        model = User
+        fields = ['id', 'email', 'first_name', 'last_name', 'avatar_variants']
+
 class UserDetailSerializer(serializers.ModelSerializer):
+    avatar_variants = AvatarVariantsField()
+
     class Meta:
         model = User
-        fields = ['id', 'email', 'first_name', 'last_name', 'bio', 'avatar', 'date_joined', 'phone']
+        fields = ['id', 'email', 'first_name', 'last_name', 'bio', 'avatar', 'avatar_variants', 'date_joined', 'phone']
         read_only_fields = ['id', 'email', 'date_joined']
 
 class RegisterSerializer(serializers.ModelSerializer):
@@ -32,7 +57,8 @@ class RegisterSerializer(serializers.ModelSerializer):
         return attrs
     
     def validate_email(self, value):
-        user = User.objects.filter(email=value).first()
+        # Case-insensitive, so no new account differs from an existing one only in case
+        user = User.objects.filter_by_email(value).first()
         if user and user.has_usable_password() == False:
             raise serializers.ValidationError("User with this email already exists. Please set your password to activate your account.")
         elif user:
@@ -0,0 +1,31 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from .authentication import invalidate_cached_user
+from .models import User
+from .tokens import remember_revoked_jti
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def drop_cached_user(sender, instance, **kwargs):
+    invalidate_cached_user(instance.pk)
+
+
+# Fields of the user that trip, member and expense responses embed
+EMBEDDED_USER_FIELDS = {'email', 'first_name', 'last_name', 'phone', 'bio', 'avatar', 'avatar_variants'}
+
+
+@receiver(post_save, sender=User)
+def bump_trips_of_changed_user(sender, instance, created, update_fields=None, **kwargs):
+    # Logins only save last_login, which no trip response shows
+    if created or (update_fields is not None and not EMBEDDED_USER_FIELDS & set(update_fields)):
+        return
+    from trips.revisions import bump_user_trip_revisions
+    bump_user_trip_revisions(instance.pk)
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def cache_revoked_token(sender, instance, created, **kwargs):
+    if created:
+        remember_revoked_jti(instance.token.jti, instance.token.expires_at)
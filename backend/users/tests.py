@@ -3,6 +3,22 @@ from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from django.core.management import call_command
+from django.utils import timezone
+from datetime import timedelta
+from io import BytesIO, StringIO
+import shutil
+import tempfile
+from PIL import Image
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from .tokens import CachedBlacklistRefreshToken
 
 User = get_user_model()
 
@@ -58,6 +74,18 @@ class UserRegistrationTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn("password", str(response.data))
 
+    def test_emails_differing_only_in_case(self):
+        """Registration rejects a case variant, and lookups survive legacy duplicates."""
+        data = {"email": "LOGIN@example.com", "password": "Test12#$", "password2": "Test12#$", "first_name": "Test", "last_name": "User"}
+        response = self.client.post(reverse("register"), data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        legacy = User.objects.create_user(email="Login@example.com", password="Test12#$")
+        self.assertEqual(User.objects.get_by_email("Login@example.com"), legacy)
+        self.assertEqual(User.objects.get_by_email("LOGIN@EXAMPLE.COM"), self.user)
+        response = self.client.post(reverse("resend_set_password_email"), {"email": "LOGIN@example.com"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
     def test_login_user_success(self):
         """Login (token obtain) using email should succeed for valid credentials."""
         data = {
@@ -83,3 +111,168 @@ class UserRegistrationTests(TestCase):
         response = self.client.get(reverse("user_detail"))
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data.get("email"), self.user.email)
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    """Tests for resolving JWT users from the cache"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(email="cached@example.com", password="Test12#$")
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def user_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("user_detail"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [query["sql"] for query in queries if User._meta.db_table in query["sql"]]
+
+    def test_repeated_requests_skip_the_users_table(self):
+        self.assertEqual(len(self.user_queries()), 1)
+        self.assertEqual(self.user_queries(), [])
+
+    def test_deactivation_invalidates_cached_user(self):
+        self.user_queries()
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(reverse("user_detail"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class RefreshTokenRevocationTests(TestCase):
+    """Tests for the cached revocation set and blacklist pruning"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(email="rotate@example.com", password="Test12#$")
+
+    def test_replayed_refresh_token_is_rejected_from_cache(self):
+        refresh = str(RefreshToken.for_user(self.user))
+        response = self.client.post(reverse("token_refresh"), {"refresh": refresh}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.client.cookies.clear()
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse("token_refresh"), {"refresh": refresh}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertFalse([query for query in queries if BlacklistedToken._meta.db_table in query["sql"]])
+
+    def test_rotated_refresh_token_skips_blacklist_lookup(self):
+        response = self.client.post(reverse("token_refresh"), {"refresh": str(CachedBlacklistRefreshToken.for_user(self.user))}, format="json")
+        rotated = response.cookies["refresh"].value
+        self.client.cookies.clear()
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse("token_refresh"), {"refresh": rotated}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Blacklisting the rotated token still writes; only the membership check is skipped
+        checks = [query for query in queries if query["sql"].startswith(f'SELECT 1 AS "a" FROM "{BlacklistedToken._meta.db_table}"')]
+        self.assertEqual(checks, [])
+
+        # Blacklisting replaces the valid marker, so the rotated token is refused from now on
+        self.client.cookies.clear()
+        response = self.client.post(reverse("token_refresh"), {"refresh": rotated}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_prune_removes_only_expired_tokens(self):
+        live = RefreshToken.for_user(self.user)
+        expired = RefreshToken.for_user(self.user)
+        expired.blacklist()
+        OutstandingToken.objects.filter(jti=expired["jti"]).update(expires_at=timezone.now() - timedelta(days=1))
+
+        call_command("prune_jwt_tokens", batch_size=1, stdout=StringIO())
+
+        self.assertEqual(list(OutstandingToken.objects.values_list("jti", flat=True)), [live["jti"]])
+        self.assertFalse(BlacklistedToken.objects.exists())
+
+
+class AvatarVariantTests(TestCase):
+    """Tests for the resized avatar variants"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.client = APIClient()
+        self.user = User.objects.create_user(email="avatar@example.com", password="Test12#$")
+        self.client.force_authenticate(user=self.user)
+
+    def upload(self):
+        buffer = BytesIO()
+        Image.new("RGB", (1200, 800), "teal").save(buffer, "PNG")
+        avatar = SimpleUploadedFile("me.png", buffer.getvalue(), content_type="image/png")
+        return self.client.patch(reverse("user_detail"), {"avatar": avatar}, format="multipart")
+
+    def test_upload_creates_resized_variants(self):
+        response = self.upload()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data["avatar_variants"]), {"small", "medium"})
+        self.assertTrue(response.data["avatar_variants"]["small"]["webp"].startswith("http://testserver/media/avatars/variants/"))
+
+        self.user.refresh_from_db()
+        with self.user.avatar.storage.open(self.user.avatar_variants["small"]["webp"]) as variant:
+            image = Image.open(variant)
+            self.assertEqual((image.format, image.size), ("WEBP", (96, 96)))
+
+    def stored_names(self):
+        self.user.refresh_from_db()
+        return [self.user.avatar.name] + [name for formats in self.user.avatar_variants.values() for name in formats.values()]
+
+    def test_clearing_avatar_removes_variants(self):
+        self.upload()
+        names = self.stored_names()
+        self.user.avatar = None
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        self.assertEqual(self.user.avatar_variants, {})
+        self.assertFalse(any(default_storage.exists(name) for name in names))
+
+    def test_replacing_avatar_deletes_previous_files(self):
+        self.upload()
+        previous = self.stored_names()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.upload()
+        current = self.stored_names()
+        self.assertFalse(any(default_storage.exists(name) for name in previous))
+        self.assertTrue(all(default_storage.exists(name) for name in current))
+
+
+class UserAutocompleteTests(TestCase):
+    """Tests for the invite autocomplete endpoint"""
+
+    def setUp(self):
+        from trips.models import Trip, TripMember, MemberStatus, MemberRole
+        self.client = APIClient()
+        self.user = User.objects.create_user(email="me@example.com", password="Test12#$")
+        self.client.force_authenticate(user=self.user)
+        trip = Trip.objects.create(owner=self.user, title="Shared", destination="X", start_date="2030-01-01", end_date="2030-01-05")
+        self.other_trip = Trip.objects.create(owner=self.user, title="Other", destination="Y", start_date="2030-02-01", end_date="2030-02-05")
+        TripMember.objects.create(trip=trip, user=self.user, role=MemberRole.ORGANIZER, status=MemberStatus.ACCEPTED)
+        TripMember.objects.create(trip=self.other_trip, user=self.user, role=MemberRole.ORGANIZER, status=MemberStatus.ACCEPTED)
+        for index in range(3):
+            friend = User.objects.create_user(email=f"Anna{index}@example.com", password="Test12#$", first_name="Zed")
+            TripMember.objects.create(trip=trip, user=friend, status=MemberStatus.ACCEPTED)
+        TripMember.objects.create(trip=self.other_trip, user=User.objects.get(email="Anna0@example.com"), status=MemberStatus.ACCEPTED)
+        User.objects.create_user(email="anna.stranger@example.com", password="Test12#$")
+
+    def test_prefix_search_is_scoped_and_keyset_paged(self):
+        url = reverse("user_autocomplete")
+        response = self.client.get(url, {"q": "ANN", "limit": 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([user["email"] for user in response.data["results"]], ["Anna0@example.com", "Anna1@example.com"])
+
+        response = self.client.get(response.data["next"])
+        self.assertEqual([user["email"] for user in response.data["results"]], ["Anna2@example.com"])
+        self.assertIsNone(response.data["next"])
+
+        response = self.client.get(url, {"q": "zed", "trip": str(self.other_trip.id)})
+        self.assertEqual([user["email"] for user in response.data["results"]], ["Anna1@example.com", "Anna2@example.com"])
+
+    def test_query_is_required(self):
+        response = self.client.get(reverse("user_autocomplete"))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,83 @@
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import (
+    TokenBlacklistSerializer, TokenObtainPairSerializer, TokenRefreshSerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+REVOKED = 'revoked'
+VALID = 'valid'
+
+
+def jti_state_key(jti):
+    return f'users:jti:{jti}'
+
+
+def jti_timeout(expires_at):
+    return int((expires_at - timezone.now()).total_seconds())
+
+
+def remember_revoked_jti(jti, expires_at):
+    """Mark a jti revoked until the token would have expired anyway, replacing a valid marker"""
+    timeout = jti_timeout(expires_at)
+    if timeout > 0:
+        cache.set(jti_state_key(jti), REVOKED, timeout)
+
+
+def remember_valid_jti(jti, expires_at):
+    """
+    Mark a jti as not blacklisted. `add` never replaces an existing marker, so a revocation
+    written while the blacklist was being read is not overwritten.
+    """
+    timeout = jti_timeout(expires_at)
+    if timeout > 0:
+        cache.add(jti_state_key(jti), VALID, timeout)
+
+
+def cached_jti_state(jti):
+    return cache.get(jti_state_key(jti))
+
+
+class CachedBlacklistRefreshToken(RefreshToken):
+    """
+    Refresh token whose blacklist state is cached per jti.
+    Tokens issued or already checked are known to be valid and revoked tokens are known to be
+    revoked, so only a cache miss reaches the blacklist tables.
+    """
+
+    def check_blacklist(self):
+        jti = self.payload[api_settings.JTI_CLAIM]
+        state = cached_jti_state(jti)
+        if state == REVOKED:
+            raise TokenError(_("Token is blacklisted"))
+        if state != VALID:
+            super().check_blacklist()
+            remember_valid_jti(jti, datetime_from_epoch(self.payload['exp']))
+
+    def outstand(self):
+        # Called for the new token of a rotation, which cannot be blacklisted yet
+        token = super().outstand()
+        remember_valid_jti(self.payload[api_settings.JTI_CLAIM], datetime_from_epoch(self.payload['exp']))
+        return token
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        remember_valid_jti(token[api_settings.JTI_CLAIM], datetime_from_epoch(token['exp']))
+        return token
+
+
+class CachedTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = CachedBlacklistRefreshToken
+
+
+class CachedTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = CachedBlacklistRefreshToken
+
+
+class CachedTokenBlacklistSerializer(TokenBlacklistSerializer):
+    token_class = CachedBlacklistRefreshToken
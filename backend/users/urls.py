@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import RegisterView, UserDetailView, UserProfileView, CookieTokenObtainPairView, CookieTokenRefreshView, CookieTokenBlacklistView, SetPasswordView, ResendSetPasswordEmailView
+from .views import RegisterView, UserDetailView, UserProfileView, CookieTokenObtainPairView, CookieTokenRefreshView, CookieTokenBlacklistView, SetPasswordView, ResendSetPasswordEmailView, UserAutocompleteView
 
 urlpatterns = [
     path('register/', RegisterView.as_view(), name='register'),
@@ -7,6 +7,7 @@ urlpatterns = [
     path('token/refresh/', CookieTokenRefreshView.as_view(), name='token_refresh'),
     path('token/blacklist/', CookieTokenBlacklistView.as_view(), name='token_blacklist'),
     path('me/', UserDetailView.as_view(), name='user_detail'),
+    path('users/autocomplete/', UserAutocompleteView.as_view(), name='user_autocomplete'),
     path('profile/<uuid:user_id>/', UserProfileView.as_view(), name='user_profile'),
     path('set-password/<uuid:user_id>/<str:token>/', SetPasswordView.as_view(), name='set_password'),
     path('resend-set-password-email/', ResendSetPasswordEmailView.as_view(), name='resend_set_password_email'),
@@ -1,3 +1,4 @@
+import uuid
 from rest_framework import generics, permissions, status
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView, TokenBlacklistView
 from django.contrib.auth import get_user_model
@@ -6,8 +7,13 @@ from django.conf import settings
 from backend.services import send_templated_email
 from rest_framework.response import Response
 from django.contrib.auth.tokens import default_token_generator
-from .serializers import SetPasswordSerializer, ResendSetPasswordEmailSerializer
-from rest_framework.throttling import ScopedRateThrottle
+from .serializers import SetPasswordSerializer, ResendSetPasswordEmailSerializer, UserAutocompleteSerializer
+from backend.throttling import ScopedRateThrottle
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.db.models.functions import Lower
+from rest_framework.pagination import CursorPagination
+from trips.models import TripMember, MemberStatus
 
 User = get_user_model()
 
@@ -16,6 +22,7 @@ class RegisterView(generics.CreateAPIView):
     permission_classes = [permissions.AllowAny]
     serializer_class = RegisterSerializer
     
+    @transaction.atomic
     def perform_create(self, serializer):
         user = serializer.save()
         
@@ -43,8 +50,69 @@ class UserProfileView(generics.RetrieveAPIView):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     lookup_field = 'id'
+    lookup_url_kwarg = 'user_id'
     permission_classes = [permissions.IsAuthenticated]
 
+class UserAutocompletePagination(CursorPagination):
+    ordering = ('email_lower', 'id')
+    page_size = 10
+    page_size_query_param = 'limit'
+    max_page_size = 50
+
+def prefix_match(users, prefix):
+    """Ids of `users` whose aliased `key` starts with `prefix`; the range bounds let the database seek its index"""
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return users.filter(key__gte=prefix, key__lt=upper, key__startswith=prefix).values('id')
+
+class UserAutocompleteView(generics.ListAPIView):
+    """
+    Prefix search on email and name among users who share a trip with the caller.
+    `?q=` is the typed prefix, `?trip=` leaves out users already on that trip.
+    Candidates come from range scans of the `Lower` indexes on email, first and last name;
+    results are keyset paged in `Lower(email)` order.
+    """
+    serializer_class = UserAutocompleteSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = UserAutocompletePagination
+
+    def list(self, request, *args, **kwargs):
+        if not request.query_params.get('q', '').strip():
+            return Response({"detail": "Query parameter 'q' is required."}, status=status.HTTP_400_BAD_REQUEST)
+        trip_id = request.query_params.get('trip')
+        if trip_id:
+            try:
+                uuid.UUID(trip_id)
+            except ValueError:
+                return Response({"detail": "Invalid trip id."}, status=status.HTTP_400_BAD_REQUEST)
+        return super().list(request, *args, **kwargs)
+
+    def get_queryset(self):
+        prefix = self.request.query_params.get('q', '').strip().lower()
+        own_trips = TripMember.objects.filter(user=self.request.user, status=MemberStatus.ACCEPTED).values('trip_id')
+        shares_trip = TripMember.objects.filter(
+            user=OuterRef('pk'),
+            trip_id__in=own_trips,
+            status__in=[MemberStatus.PENDING, MemberStatus.ACCEPTED],
+        )
+
+        # One range scan per functional index; OR'ing the three in one WHERE would defeat all of them
+        candidates = prefix_match(User.objects.alias(key=Lower('email')), prefix).union(
+            prefix_match(User.objects.alias(key=Lower('first_name')), prefix),
+            prefix_match(User.objects.alias(key=Lower('last_name')), prefix),
+        )
+
+        queryset = (
+            User.objects.annotate(email_lower=Lower('email'))
+            .filter(id__in=candidates)
+            .filter(Exists(shares_trip))
+            .exclude(id=self.request.user.id)
+        )
+
+        trip_id = self.request.query_params.get('trip')
+        if trip_id:
+            queryset = queryset.exclude(Exists(TripMember.objects.filter(user=OuterRef('pk'), trip_id=trip_id)))
+        return queryset
+
 class CookieTokenObtainPairView(TokenObtainPairView):
     def post(self, request, *args, **kwargs):
         response = super().post(request, *args, **kwargs)
@@ -175,7 +243,7 @@ class ResendSetPasswordEmailView(generics.GenericAPIView):
         email = serializer.validated_data['email']
         
         try:
-            user = User.objects.get(email__iexact=email)
+            user = User.objects.get_by_email(email)
         except User.DoesNotExist:
             return Response({'message': 'If an account with that email exists, a set password email has been sent'}, status=status.HTTP_200_OK)
         
@@ -35,7 +35,7 @@ import { useAuth } from "@/hooks/useAuth";
 import { useMembers } from "@/hooks/useMembers";
 import { useTrip } from "@/hooks/useTrip";
 import { getMemberRoleColor, getMemberStatusColor } from "@/lib/colors";
-import { formatCurrency, getInitials } from "@/lib/utils";
+import { formatCurrency, getAvatarUrl, getInitials } from "@/lib/utils";
 
 const getFullName = (user) => {
   return `${user.first_name} ${user.last_name}`;
@@ -195,7 +195,7 @@ export function MembersManager() {
                     >
                       <div className="flex flex-col sm:flex-row flex-wrap items-center space-x-4 gap-2">
                         <Avatar className="mr-auto">
-                          <AvatarImage src={member.user?.avatar} />
+                          <AvatarImage src={getAvatarUrl(member.user)} />
                           <AvatarFallback>
                             {getInitials(getFullName(member.user))}
                           </AvatarFallback>
@@ -303,7 +303,7 @@ export function MembersManager() {
                   >
                     <div className="flex items-center space-x-3">
                       <Avatar className="w-8 h-8">
-                        <AvatarImage src={member.user?.avatar} />
+                        <AvatarImage src={getAvatarUrl(member.user)} />
                         <AvatarFallback className="text-xs">
                           {getInitials(getFullName(member.user))}
                         </AvatarFallback>
@@ -363,7 +363,7 @@ export function MembersManager() {
                     >
                       <div className="flex items-center space-x-3">
                         <Avatar className="w-8 h-8">
-                          <AvatarImage src={member.user?.avatar} />
+                          <AvatarImage src={getAvatarUrl(member.user)} />
                           <AvatarFallback className="text-xs">
                             {getInitials(getFullName(member.user))}
                           </AvatarFallback>
@@ -10,7 +10,7 @@ import {
   DropdownMenuTrigger,
 } from "@/components/ui/dropdown-menu";
 import { useAuth } from "@/hooks/useAuth";
-import { getInitials } from "@/lib/utils";
+import { getAvatarUrl, getInitials } from "@/lib/utils";
 
 export function UserAvatar({ className = "" }) {
   const { user, logout } = useAuth();
@@ -26,7 +26,7 @@ export function UserAvatar({ className = "" }) {
         <DropdownMenuTrigger asChild>
           <Button variant="ghost" className="relative h-10 w-10 rounded-full">
             <Avatar className="h-10 w-10">
-              <AvatarImage src={user.avatar} alt={name} />
+              <AvatarImage src={getAvatarUrl(user)} alt={name} />
               <AvatarFallback>{getInitials(name)}</AvatarFallback>
             </Avatar>
           </Button>
@@ -107,11 +107,8 @@ export const ChecklistProvider = ({ children }) => {
         data
       );
 
-      setChecklistItems((prev) =>
-        [response.data, ...prev].sort(
-          (a, b) => new Date(b.due_date) - new Date(a.due_date)
-        )
-      );
+      // The list follows the manual order, and new items are appended to it
+      setChecklistItems((prev) => [...prev, response.data]);
       setStatistics((prev) => ({
         ...prev,
         total_items: prev.total_items + 1,
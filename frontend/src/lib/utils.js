@@ -181,6 +181,11 @@ export const getInitials = (name) => {
     .toUpperCase();
 };
 
+export const getAvatarUrl = (user, variant = "small") => {
+  const urls = user?.avatar_variants?.[variant];
+  return urls?.webp || urls?.jpeg || user?.avatar;
+};
+
 export const calculateDuration = (startDate, endDate) => {
   const start = new Date(startDate);
   const end = new Date(endDate);